@@ -1,13 +1,21 @@
 import os
+import json
 import logging
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 from typing import Dict, List, Optional
 from .session_manager import session_manager
 from .models.game_state import GameState
-from .models.questions import question_manager, QuestionSet
+from .models.questions import DEFAULT_SET_ID, question_manager, QuestionSet
+from .services.audience import AudienceManager
 from .services.auto_gm import auto_gm
+from .services.roster import RosterNotifier
+from .services.scheduler import timer_wheel
+from .services.session_actor import session_actors
+from .services.session_gc import SessionSweeper
+from .services.vote_ingest import VoteIngestor
 from .websocket import WebSocketManager
 
 # Configure logging
@@ -46,6 +54,52 @@ app.add_middleware(
 # WebSocket manager
 websocket_manager = WebSocketManager()
 
+# Evicts sessions nobody has used for a while
+session_sweeper = SessionSweeper(session_manager, websocket_manager)
+
+# Joins and connection changes, coalesced into periodic ROSTER_DELTA broadcasts
+roster = RosterNotifier(session_manager, websocket_manager)
+websocket_manager.on_presence_change = roster.presence_changed
+
+# Players listed per roster page in join responses and GET /roster
+ROSTER_PAGE_SIZE = int(os.getenv("ROSTER_PAGE_SIZE", "100"))
+
+# Spectator votes, flushed as one AUDIENCE_TALLY per interval
+audience = AudienceManager(session_manager, websocket_manager)
+session_sweeper.on_evict = audience.forget_session
+
+async def show_results(session):
+    """Score the round and announce the results once every player has voted"""
+    await audience.flush(session.session_id)
+    # The round may have been closed while the last batch was being applied
+    if session.game_state != GameState.VOTING_PHASE:
+        return
+    
+    session.game_state = GameState.RESULTS_PHASE
+    round_scores = session.calculate_scores()
+    session_manager.save_session(session)
+    results = session.get_results()
+    
+    await websocket_manager.broadcast_to_session(session.session_id, {
+        "type": "RESULTS_READY",
+        "data": {
+            "game_state": session.game_state.value,  # Convert enum to string
+            "results": results,
+            "round_scores": round_scores
+        }
+    })
+
+# Player votes, applied in micro-batches with one VOTE_SUBMITTED per batch
+vote_ingest = VoteIngestor(session_manager, websocket_manager, on_all_voted=show_results)
+
+async def close_voting(session_id: str):
+    """Count player votes and audience votes still waiting in their buffers"""
+    await vote_ingest.flush(session_id)
+    await audience.flush(session_id)
+
+auto_gm.before_voting_ends = close_voting
+auto_gm.on_session_changed = session_manager.save_session
+
 # Request/Response models
 class CreateSessionRequest(BaseModel):
     game_master_pseudonym: str
@@ -61,6 +115,9 @@ class JoinSessionResponse(BaseModel):
     player_id: str
     session_state: Dict
 
+class AddPlayersRequest(BaseModel):
+    pseudonyms: List[str]
+
 class SubmitQuestionRequest(BaseModel):
     question: str
     answer: str
@@ -69,11 +126,17 @@ class SubmitAnswerRequest(BaseModel):
     fake_answer: str
 
 class SubmitVoteRequest(BaseModel):
-    voted_answer: str
+    answer_index: Optional[int] = None  # Position in the round's answer list
+    voted_answer: Optional[str] = None  # Older clients vote by answer text
+
+class SubmitAudienceVoteRequest(BaseModel):
+    answer_index: int
 
 class EnableAutoModeRequest(BaseModel):
     question_set_id: str
     timers: Optional[Dict[str, int]] = None
+    legacy_progress: bool = False  # Opt in to per-second AUTO_MODE_PROGRESS broadcasts
+    seed: Optional[int] = None  # Replays the question order of an earlier game
 
 class EditQuestionRequest(BaseModel):
     question: str
@@ -96,39 +159,28 @@ async def create_session(request: CreateSessionRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/join", response_model=JoinSessionResponse)
+@session_actors.serialized
 async def join_session(session_id: str, request: JoinSessionRequest):
     """Join an existing session"""
     try:
         session, player = session_manager.join_session(session_id, request.pseudonym)
         logger.info(f"Player {request.pseudonym} joined session {session_id}")
         
-        # Notify other players via WebSocket
-        await websocket_manager.broadcast_to_session(session_id, {
-            "type": "PLAYER_JOINED",
-            "data": {
-                "player": {
-                    "player_id": player.player_id,
-                    "pseudonym": player.pseudonym,
-                    "is_game_master": player.is_game_master
-                },
-                "total_players": len(session.players)
-            }
-        })
+        # The room hears about joins in the next ROSTER_DELTA batch
+        roster.roster_changed(session)
         
+        # Only the first page of the roster; the rest comes from GET /roster
+        page = session.get_roster_page(0, ROSTER_PAGE_SIZE)
         return JoinSessionResponse(
             player_id=player.player_id,
             session_state={
                 "session_id": session.session_id,
                 "game_state": session.game_state,
-                "players": [
-                    {
-                        "player_id": p.player_id,
-                        "pseudonym": p.pseudonym,
-                        "is_game_master": p.is_game_master
-                    }
-                    for p in session.players.values()
-                ],
-                "scores": session.scores,
+                "roster_version": session.roster_version,
+                "total_players": len(session.players),
+                "players": [p.roster_entry() for p in page],
+                "next_offset": ROSTER_PAGE_SIZE if len(session.players) > ROSTER_PAGE_SIZE else None,
+                "scores": {p.player_id: session.scores.get(p.player_id, 0) for p in page},
                 "round_number": session.round_number
             }
         )
@@ -139,25 +191,59 @@ async def join_session(session_id: str, request: JoinSessionRequest):
         logger.error(f"Error joining session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/sessions/{session_id}/state")
-async def get_session_state(session_id: str):
-    """Get current session state"""
+@app.post("/sessions/{session_id}/players")
+@session_actors.serialized
+async def add_players(session_id: str, player_id: str, request: AddPlayersRequest):
+    """Pre-register a list of players, e.g. a class roster (game master only)"""
     session = session_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    if not session.is_game_master(player_id):
+        raise HTTPException(status_code=403, detail="Only game master can add players")
+    
+    try:
+        session, players = session_manager.add_players(session_id, request.pseudonyms)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Added {len(players)} players to session {session_id}")
+    
+    if players:
+        roster.roster_changed(session)
+    return {
+        "roster_version": session.roster_version,
+        "players": [{"player_id": p.player_id, "pseudonym": p.pseudonym} for p in players]
+    }
+
+@app.delete("/sessions/{session_id}/players/{target_id}")
+@session_actors.serialized
+async def remove_player(session_id: str, target_id: str, player_id: str):
+    """Leave the session, or remove a player from it (game master)"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if player_id != target_id and not session.is_game_master(player_id):
+        raise HTTPException(status_code=403, detail="Only game master can remove other players")
+    
+    try:
+        session, player = session_manager.remove_player(session_id, target_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"Player {player.pseudonym} left session {session_id}")
+    
+    roster.roster_changed(session)
+    await websocket_manager.close_player(session_id, target_id)
+    return {"message": "Player removed", "roster_version": session.roster_version}
+
+def build_session_state(session) -> bytes:
+    """Serialize the state returned by GET /sessions/{id}/state"""
     response = {
         "session_id": session.session_id,
-        "game_state": session.game_state,
-        "players": [
-            {
-                "player_id": p.player_id,
-                "pseudonym": p.pseudonym,
-                "is_game_master": p.is_game_master,
-                "connected": p.connected
-            }
-            for p in session.players.values()
-        ],
+        "version": session.version,
+        "game_state": session.game_state.value,
+        "roster_version": session.roster_version,
+        "players": [p.roster_entry() for p in session.players.values()],
         "scores": session.scores,
         "round_number": session.round_number
     }
@@ -179,9 +265,62 @@ async def get_session_state(session_id: str):
         elif session.game_state == GameState.RESULTS_PHASE:
             response["results"] = session.get_results()
     
-    return response
+    return json.dumps(response).encode("utf-8")
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+@app.get("/sessions/{session_id}/state")
+async def get_session_state(session_id: str, request: Request):
+    """Get current session state (304 when the client's ETag is still current)"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # The version changes with every saved mutation, so it doubles as the ETag
+    etag = f'"{session.version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(session.get_snapshot(build_session_state), media_type="application/json", headers=headers)
+
+@app.get("/sessions/{session_id}/roster")
+async def get_roster(session_id: str, since: Optional[int] = None, offset: int = 0, limit: Optional[int] = None):
+    """Get the roster changes after version `since`, or one page of the roster"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if since is not None:
+        if not 0 <= since <= session.roster_version:
+            raise HTTPException(status_code=400, detail="Unknown roster version")
+        added, removed = session.get_roster_changes(since)
+        return {
+            "from_version": since,
+            "version": session.roster_version,
+            "added": [p.roster_entry() for p in added],
+            "removed": removed,
+            "total_players": len(session.players)
+        }
+    
+    limit = min(limit or ROSTER_PAGE_SIZE, ROSTER_PAGE_SIZE)
+    if offset < 0 or limit < 1:
+        raise HTTPException(status_code=400, detail="Invalid page")
+    page = session.get_roster_page(offset, limit)
+    return {
+        "version": session.roster_version,
+        "total_players": len(session.players),
+        "players": [p.roster_entry() for p in page],
+        "next_offset": offset + limit if offset + limit < len(session.players) else None
+    }
 
 @app.post("/sessions/{session_id}/questions")
+@session_actors.serialized
 async def submit_question(session_id: str, player_id: str, request: SubmitQuestionRequest):
     """Submit a question (game master only)"""
     session = session_manager.get_session(session_id)
@@ -193,6 +332,7 @@ async def submit_question(session_id: str, player_id: str, request: SubmitQuesti
     
     try:
         session.start_question_phase(request.question, request.answer)
+        session_manager.save_session(session)
         
         # Broadcast question to all players
         message = {
@@ -211,6 +351,7 @@ async def submit_question(session_id: str, player_id: str, request: SubmitQuesti
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/answers")
+@session_actors.serialized
 async def submit_answer(session_id: str, player_id: str, request: SubmitAnswerRequest):
     """Submit a fake answer"""
     session = session_manager.get_session(session_id)
@@ -219,25 +360,25 @@ async def submit_answer(session_id: str, player_id: str, request: SubmitAnswerRe
     
     try:
         session.submit_fake_answer(player_id, request.fake_answer)
+        session_manager.save_session(session)
         
         # Check if all players have submitted
-        non_gm_players = [p for p in session.players.values() if not p.is_game_master]
-        # Ensure we have at least 1 non-GM player and all have submitted
-        all_submitted = len(non_gm_players) > 0 and len(session.current_question.fake_answers) == len(non_gm_players)
+        all_submitted = session.all_submitted()
         
         # Broadcast submission update
         await websocket_manager.broadcast_to_session(session_id, {
             "type": "ANSWER_SUBMITTED",
             "data": {
                 "submissions_count": len(session.current_question.fake_answers),
-                "total_expected": len(non_gm_players),
+                "total_expected": session.non_gm_player_count,
                 "all_submitted": all_submitted
             }
         })
         
-        # If all submitted, move to voting phase
-        if all_submitted:
-            session.game_state = GameState.VOTING_PHASE
+        # If all submitted, move to voting phase (auto mode advances through its own timer)
+        if all_submitted and not session.is_automatic_mode:
+            session.start_voting_phase()
+            session_manager.save_session(session)
             await websocket_manager.broadcast_to_session(session_id, {
                 "type": "VOTING_PHASE_STARTED",
                 "data": {
@@ -251,6 +392,7 @@ async def submit_answer(session_id: str, player_id: str, request: SubmitAnswerRe
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/votes")
+@session_actors.serialized
 async def submit_vote(session_id: str, player_id: str, request: SubmitVoteRequest):
     """Submit a vote"""
     session = session_manager.get_session(session_id)
@@ -258,43 +400,45 @@ async def submit_vote(session_id: str, player_id: str, request: SubmitVoteReques
         raise HTTPException(status_code=404, detail="Session not found")
     
     try:
-        session.submit_vote(player_id, request.voted_answer)
-        
-        # Check if all non-game-master players have voted
-        non_gm_players = [p for p in session.players.values() if not p.is_game_master]
-        # Ensure we have at least 1 non-GM player and all have voted
-        all_voted = len(non_gm_players) > 0 and len(session.current_question.votes) == len(non_gm_players)
-        
-        # Broadcast vote update
-        await websocket_manager.broadcast_to_session(session_id, {
-            "type": "VOTE_SUBMITTED",
-            "data": {
-                "votes_count": len(session.current_question.votes),
-                "total_players": len(non_gm_players),
-                "all_voted": all_voted
-            }
-        })
-        
-        # If all voted, show results
-        if all_voted:
-            session.game_state = GameState.RESULTS_PHASE
-            round_scores = session.calculate_scores()
-            results = session.get_results()
-            
-            await websocket_manager.broadcast_to_session(session_id, {
-                "type": "RESULTS_READY",
-                "data": {
-                    "game_state": session.game_state.value,  # Convert enum to string
-                    "results": results,
-                    "round_scores": round_scores
-                }
-            })
-        
+        # Counted with the rest of its batch; VOTE_SUBMITTED and results follow from the flush
+        vote_ingest.submit(
+            session, player_id, request.answer_index if request.answer_index is not None else request.voted_answer
+        )
         return {"message": "Vote submitted successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/sessions/{session_id}/spectators")
+async def join_audience(session_id: str):
+    """Join a session as a spectator (no pseudonym, not part of the roster)"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {
+        "spectator_id": audience.new_spectator_id(session_id),
+        "spectators": websocket_manager.get_audience_size(session_id)
+    }
+
+@app.post("/sessions/{session_id}/audience-votes")
+async def submit_audience_vote(session_id: str, spectator_id: str, request: SubmitAudienceVoteRequest):
+    """Submit a spectator vote; tallies are broadcast in batches, not per vote"""
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if not audience.is_spectator(session_id, spectator_id):
+        raise HTTPException(status_code=403, detail="Unknown spectator")
+    
+    try:
+        counted = audience.record_vote(session, spectator_id, request.answer_index)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"message": "Vote recorded" if counted else "Already voted this round"}
+
 @app.post("/sessions/{session_id}/end-submissions")
+@session_actors.serialized
 async def end_submissions(session_id: str, player_id: str):
     """End submission phase early and start voting (game master only)"""
     session = session_manager.get_session(session_id)
@@ -309,7 +453,8 @@ async def end_submissions(session_id: str, player_id: str):
     
     try:
         # Force end submissions and start voting
-        session.game_state = GameState.VOTING_PHASE
+        session.start_voting_phase()
+        session_manager.save_session(session)
         
         await websocket_manager.broadcast_to_session(session_id, {
             "type": "SUBMISSIONS_ENDED_EARLY",
@@ -320,11 +465,15 @@ async def end_submissions(session_id: str, player_id: str):
             }
         })
         
+        # Let an automatic session move straight on to its voting timer
+        auto_gm.complete_phase(session_id, "submission")
+        
         return {"message": "Submissions ended successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/end-voting")
+@session_actors.serialized
 async def end_voting(session_id: str, player_id: str):
     """End voting phase early (game master only)"""
     session = session_manager.get_session(session_id)
@@ -337,10 +486,22 @@ async def end_voting(session_id: str, player_id: str):
     if session.game_state != GameState.VOTING_PHASE:
         raise HTTPException(status_code=400, detail="Not in voting phase")
     
+    # Count votes still waiting in the buffers before closing the round
+    await close_voting(session_id)
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if session.game_state == GameState.RESULTS_PHASE:
+        # The buffered votes completed the round, and its results are already out
+        return {"message": "Voting ended successfully"}
+    if session.game_state != GameState.VOTING_PHASE:
+        raise HTTPException(status_code=400, detail="Not in voting phase")
+    
     try:
         # Force end voting and show results
         session.game_state = GameState.RESULTS_PHASE
         round_scores = session.calculate_scores()
+        session_manager.save_session(session)
         results = session.get_results()
         
         await websocket_manager.broadcast_to_session(session_id, {
@@ -353,11 +514,15 @@ async def end_voting(session_id: str, player_id: str):
             }
         })
         
+        # Let an automatic session move straight on to its results timer
+        auto_gm.complete_phase(session_id, "voting")
+        
         return {"message": "Voting ended successfully"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/next-round")
+@session_actors.serialized
 async def start_next_round(session_id: str, player_id: str):
     """Start next round (game master only)"""
     session = session_manager.get_session(session_id)
@@ -368,6 +533,7 @@ async def start_next_round(session_id: str, player_id: str):
         raise HTTPException(status_code=403, detail="Only game master can start next round")
     
     session.reset_for_next_round()
+    session_manager.save_session(session)
     
     await websocket_manager.broadcast_to_session(session_id, {
         "type": "NEXT_ROUND_STARTED",
@@ -388,10 +554,8 @@ async def upload_question_set(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="File must be a CSV")
     
     try:
-        content = await file.read()
-        file_content = content.decode('utf-8')
-        
-        question_set = question_manager.parse_csv(file_content, file.filename)
+        # Parse on a worker thread so large files do not stall live games
+        question_set = await run_in_threadpool(question_manager.parse_csv_file, file.file, file.filename)
         
         return {
             "message": "Question set uploaded successfully",
@@ -399,7 +563,7 @@ async def upload_question_set(file: UploadFile = File(...)):
                 "set_id": question_set.set_id,
                 "name": question_set.name,
                 "category": question_set.category,
-                "question_count": len(question_set.questions),
+                "question_count": question_set.question_count,
                 "created_at": question_set.created_at
             }
         }
@@ -418,7 +582,7 @@ async def list_question_sets():
                 "set_id": qs.set_id,
                 "name": qs.name,
                 "category": qs.category,
-                "question_count": len(qs.questions),
+                "question_count": qs.question_count,
                 "created_at": qs.created_at
             }
             for qs in question_sets
@@ -443,16 +607,17 @@ async def get_question_set(set_id: str):
                 "category": q.category,
                 "difficulty": q.difficulty
             }
-            for q in question_set.questions[:10]  # Preview first 10 questions
+            for q in question_manager.get_questions(set_id, 0, 10)  # Preview first 10 questions
         ],
-        "total_questions": len(question_set.questions),
+        "total_questions": question_set.question_count,
         "created_at": question_set.created_at
     }
 
 @app.delete("/question-sets/{set_id}")
 async def delete_question_set(set_id: str):
     """Delete a question set"""
-    success = question_manager.delete_question_set(set_id)
+    # Waits for any upload the store is writing, so it stays off the event loop
+    success = await run_in_threadpool(question_manager.delete_question_set, set_id)
     if not success:
         raise HTTPException(status_code=404, detail="Question set not found")
     
@@ -461,6 +626,7 @@ async def delete_question_set(set_id: str):
 # Automatic Mode Endpoints
 
 @app.post("/sessions/{session_id}/auto-mode")
+@session_actors.serialized
 async def enable_auto_mode(session_id: str, player_id: str, request: EnableAutoModeRequest):
     """Enable automatic game master mode"""
     session = session_manager.get_session(session_id)
@@ -481,14 +647,16 @@ async def enable_auto_mode(session_id: str, player_id: str, request: EnableAutoM
         
         # Start automatic mode
         await auto_gm.start_automatic_session(
-            session_id, request.question_set_id, websocket_manager, request.timers
+            session_id, request.question_set_id, websocket_manager, request.timers,
+            request.legacy_progress, request.seed
         )
         
-        return {"message": "Automatic mode enabled successfully"}
+        return {"message": "Automatic mode enabled successfully", "seed": session.question_seed}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/dice-question")
+@session_actors.serialized
 async def get_dice_question(session_id: str, player_id: str):
     """Get a random question using dice functionality"""
     session = session_manager.get_session(session_id)
@@ -498,19 +666,21 @@ async def get_dice_question(session_id: str, player_id: str):
     if not session.is_game_master(player_id):
         raise HTTPException(status_code=403, detail="Only game master can use dice")
     
-    # For dice mode, we need a question set to be selected
-    # This could be from a default set or previously selected set
-    available_sets = question_manager.list_question_sets()
-    if not available_sets:
-        raise HTTPException(status_code=400, detail="No question sets available")
-    
-    # Use first available set for now (could be enhanced to let GM choose)
-    question_set_id = available_sets[0].set_id
+    # Dice draws from the bundled default set, whatever has been uploaded since
+    if question_manager.get_question_set(DEFAULT_SET_ID):
+        question_set_id = DEFAULT_SET_ID
+    else:
+        # Without the default pack, fall back to the first available set (could be enhanced to let GM choose)
+        available_sets = question_manager.list_question_sets()
+        if not available_sets:
+            raise HTTPException(status_code=400, detail="No question sets available")
+        question_set_id = available_sets[0].set_id
     
     try:
         question_data, question_index = question_manager.get_random_question(
-            question_set_id, session.used_questions
+            question_set_id, session.question_deck(question_set_id)
         )
+        session_manager.save_session(session)
         
         # Broadcast dice question selection
         await websocket_manager.broadcast_to_session(session_id, {
@@ -534,6 +704,7 @@ async def get_dice_question(session_id: str, player_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.put("/sessions/{session_id}/edit-question")
+@session_actors.serialized
 async def edit_current_question(session_id: str, player_id: str, request: EditQuestionRequest):
     """Edit the current question (for dice mode)"""
     session = session_manager.get_session(session_id)
@@ -552,6 +723,7 @@ async def edit_current_question(session_id: str, player_id: str, request: EditQu
             original_text=session.current_question.text if session.current_question else None,
             original_answer=session.current_question.correct_answer if session.current_question else None
         )
+        session_manager.save_session(session)
         
         # Broadcast edited question
         await websocket_manager.broadcast_to_session(session_id, {
@@ -569,6 +741,7 @@ async def edit_current_question(session_id: str, player_id: str, request: EditQu
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/sessions/{session_id}/cancel-auto-timer")
+@session_actors.serialized
 async def cancel_auto_timer(session_id: str, player_id: str):
     """Cancel automatic timer for manual intervention"""
     session = session_manager.get_session(session_id)
@@ -589,19 +762,99 @@ async def cancel_auto_timer(session_id: str, player_id: str):
     
     return {"message": "Automatic timer cancelled"}
 
+# Game actions a connected player can send over the socket instead of calling the REST
+# endpoint: message type -> (endpoint, request model for the message's "data")
+SOCKET_ACTIONS = {
+    "SUBMIT_QUESTION": (submit_question, SubmitQuestionRequest),
+    "SUBMIT_ANSWER": (submit_answer, SubmitAnswerRequest),
+    "SUBMIT_VOTE": (submit_vote, SubmitVoteRequest),
+    "END_SUBMISSIONS": (end_submissions, None),
+    "END_VOTING": (end_voting, None),
+    "NEXT_ROUND": (start_next_round, None),
+    "EDIT_QUESTION": (edit_current_question, EditQuestionRequest),
+    "CANCEL_AUTO_TIMER": (cancel_auto_timer, None),
+}
+
+socket_action_stats = {"actions": 0, "errors": 0}
+
+async def handle_socket_action(session_id: str, player_id: str, text: str) -> Optional[dict]:
+    """Run an action sent as {"type", "request_id", "data"} and build its ACK (None for PONG)"""
+    request_id = None
+    try:
+        message = json.loads(text)
+        if not isinstance(message, dict):
+            raise ValueError("Message must be a JSON object")
+        if message.get("type") == "PONG":
+            # Heartbeat replies only prove the client is alive
+            return None
+        request_id = message.get("request_id")
+        if message.get("type") not in SOCKET_ACTIONS:
+            raise HTTPException(status_code=400, detail=f"Unknown action {message.get('type')!r}")
+        
+        endpoint, request_model = SOCKET_ACTIONS[message["type"]]
+        kwargs = {"session_id": session_id, "player_id": player_id}
+        if request_model:
+            kwargs["request"] = request_model(**(message.get("data") or {}))
+        result = await endpoint(**kwargs)
+        socket_action_stats["actions"] += 1
+        return {"type": "ACK", "data": {"request_id": request_id, "ok": True, "result": result}}
+    except HTTPException as e:
+        status, error = e.status_code, e.detail
+    except ValidationError as e:
+        status, error = 422, str(e)
+    except ValueError as e:
+        status, error = 400, f"Invalid message: {e}"
+    except Exception as e:
+        logger.error(f"Error handling socket action in session {session_id}: {str(e)}")
+        status, error = 500, str(e)
+    
+    socket_action_stats["errors"] += 1
+    return {"type": "ACK", "data": {"request_id": request_id, "ok": False, "status": status, "error": error}}
+
 # WebSocket endpoint
 @app.websocket("/ws/{session_id}/{player_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str, player_id: str):
     await websocket_manager.connect(websocket, session_id, player_id)
     try:
         while True:
-            # Keep connection alive and handle any incoming messages
+            # Actions from one socket are handled in the order they were sent
             data = await websocket.receive_text()
-            # Echo back for now (can be extended for client-to-server messages)
-            await websocket.send_text(f"Echo: {data}")
+            websocket_manager.mark_alive(session_id, player_id)
+            ack = await handle_socket_action(session_id, player_id, data)
+            # Queued behind the broadcasts the action caused, so the ACK arrives after them
+            if ack:
+                websocket_manager.reply(session_id, player_id, ack)
     except WebSocketDisconnect:
         await websocket_manager.disconnect(websocket, session_id, player_id)
 
+@app.websocket("/ws/{session_id}/audience/{spectator_id}")
+async def spectator_endpoint(websocket: WebSocket, session_id: str, spectator_id: str):
+    if not audience.is_spectator(session_id, spectator_id):
+        # Spectator IDs come from POST /sessions/{id}/spectators
+        await websocket.close(code=1008)
+        return
+    await websocket_manager.connect_spectator(websocket, session_id, spectator_id)
+    try:
+        while True:
+            # Spectators only listen; anything they send just proves they are alive
+            await websocket.receive_text()
+            websocket_manager.mark_alive(session_id, spectator_id, spectator=True)
+    except WebSocketDisconnect:
+        await websocket_manager.disconnect(websocket, session_id, spectator_id, spectator=True)
+
+@app.on_event("startup")
+async def on_startup():
+    await websocket_manager.start()
+    session_sweeper.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await session_sweeper.stop()
+    await session_actors.shutdown()
+    await websocket_manager.shutdown()
+    session_manager.store.close()
+    question_manager.store.close()
+
 @app.get("/")
 async def root():
     return {"message": "Multiplayer Trivia Game API", "status": "running"}
@@ -613,5 +866,14 @@ async def health_check():
         "status": "healthy",
         "environment": os.getenv("NODE_ENV", "production"),
         "cors_origins": os.getenv("CORS_ORIGINS", "*"),
-        "active_sessions": len(session_manager.sessions)
+        "active_sessions": len(session_manager.sessions),
+        "websocket": websocket_manager.get_stats(),
+        "scheduler": timer_wheel.get_stats(),
+        "actors": session_actors.get_stats(),
+        "session_gc": session_sweeper.get_stats(),
+        "roster": roster.stats,
+        "audience": audience.stats,
+        "votes": vote_ingest.stats,
+        "socket_actions": socket_action_stats,
+        "question_sets": question_manager.get_stats()
     }
\ No newline at end of file
@@ -2,12 +2,41 @@
 Question management models and services for CSV handling and dice functionality.
 """
 import csv
+import hashlib
 import io
-import random
+import os
+import threading
 import uuid
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
-from pydantic import BaseModel, validator
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel, ValidationError, validator
+from .session import QuestionDeck
+from ..services.question_pack import DEFAULT_CSV_PATH, load_pack
+from ..services.question_store import InMemoryQuestionStore, QuestionRow, QuestionStore, create_question_store
+
+
+# Most questions a single uploaded set may hold
+MAX_QUESTIONS_PER_SET = int(os.getenv("QUESTION_SET_MAX_QUESTIONS", "100000"))
+
+# Bad rows listed in an upload error; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+# Bytes read at a time while hashing an upload
+HASH_CHUNK_SIZE = 1 << 16
+
+# Fixed ID of the bundled question pack
+DEFAULT_SET_ID = "default"
+
+
+class QuestionSetError(ValueError):
+    """CSV rows that failed validation, reported together."""
+    
+    def __init__(self, errors: List[str], error_count: int):
+        self.errors = errors
+        self.error_count = error_count
+        more = f" (and {error_count - len(errors)} more)" if error_count > len(errors) else ""
+        super().__init__(f"Failed to parse CSV: {error_count} invalid rows: {'; '.join(errors)}{more}")
 
 
 class QuestionData(BaseModel):
@@ -39,9 +68,10 @@ class QuestionSet(BaseModel):
     set_id: str
     name: str
     category: str
-    questions: List[QuestionData]
+    question_count: int
     created_at: datetime
     file_path: str
+    content_hash: Optional[str] = None  # SHA-256 of the uploaded file
     
     class Config:
         json_encoders = {
@@ -50,127 +80,259 @@ class QuestionSet(BaseModel):
 
 
 class QuestionManager:
-    """Manages CSV question files and random selection."""
+    """Manages CSV question files and random selection; questions are read from the store on demand."""
     
-    def __init__(self):
+    def __init__(self, store: Optional[QuestionStore] = None):
+        self.store = store or InMemoryQuestionStore()
+        # Share the upload store's interned rows when it keeps them in memory
+        self.builtin = InMemoryQuestionStore(getattr(self.store, "interner", None))
         self.question_sets: Dict[str, QuestionSet] = {}
-        self._load_default_questions()
+        # Uploads update the catalog from worker threads while games read it on the event loop
+        self._catalog_lock = threading.RLock()
+        # content hash -> lock held while that file is checked and stored, so identical uploads store one set
+        self._upload_locks: Dict[str, threading.Lock] = {}
+        self._default_loaded = False
+        self.stats = {"upload_hits": 0, "upload_misses": 0}
     
     def parse_csv(self, file_content: str, filename: str) -> QuestionSet:
         """Parse CSV content and create a QuestionSet."""
+        return self.parse_csv_file(io.BytesIO(file_content.encode('utf-8')), filename)
+    
+    def parse_csv_file(self, binary_file: BinaryIO, filename: str) -> QuestionSet:
+        """Parse an uploaded UTF-8 CSV file chunk by chunk, or return the set it was already stored as."""
+        content_hash = self._hash_file(binary_file)
+        with self._catalog_lock:
+            upload_lock = self._upload_locks.setdefault(content_hash, threading.Lock())
+        try:
+            with upload_lock:
+                existing = self._find_by_hash(content_hash)
+                if existing:
+                    self.stats["upload_hits"] += 1
+                    return existing
+                self.stats["upload_misses"] += 1
+                
+                text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+                summary: Dict[str, str] = {}
+                try:
+                    # Rows go to the store in batches as they are validated
+                    return self._add_question_set(str(uuid.uuid4()), filename.replace('.csv', ''),
+                                                  lambda: summary["category"], self._iter_csv(text, summary),
+                                                  content_hash=content_hash)
+                finally:
+                    # Leave the caller's file open
+                    text.detach()
+        finally:
+            with self._catalog_lock:
+                # Later uploads of this file find the stored set without waiting
+                self._upload_locks.pop(content_hash, None)
+    
+    @staticmethod
+    def _hash_file(binary_file: BinaryIO) -> str:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: binary_file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        binary_file.seek(0)
+        return digest.hexdigest()
+    
+    def _find_by_hash(self, content_hash: str) -> Optional[QuestionSet]:
+        for refresh in (False, True):
+            if refresh:
+                # Another worker sharing the store may have stored it
+                self._refresh_catalog()
+            with self._catalog_lock:
+                for question_set in self.question_sets.values():
+                    if question_set.content_hash == content_hash:
+                        return question_set
+        return None
+    
+    def _read_csv(self, lines: Iterable[str]) -> Tuple[List[QuestionRow], str]:
+        """Validate CSV rows into question rows; returns them and the set's most common category."""
+        summary: Dict[str, str] = {}
+        rows = list(self._iter_csv(lines, summary))
+        return rows, summary["category"]
+    
+    def _iter_csv(self, lines: Iterable[str], summary: Dict[str, str]) -> Iterator[QuestionRow]:
+        """Yield valid CSV rows one at a time; bad rows are reported together once every row is read."""
         try:
-            # Parse CSV content
-            csv_reader = csv.DictReader(io.StringIO(file_content))
-            questions = []
+            csv_reader = csv.DictReader(lines)
             
             # Validate headers
             required_headers = {'question', 'answer'}
             headers = set(csv_reader.fieldnames or [])
             if not required_headers.issubset(headers):
                 missing = required_headers - headers
-                raise ValueError(f"Missing required CSV headers: {', '.join(missing)}")
+                raise ValueError(f"Missing required CSV headers: {', '.join(sorted(missing))}")
             
-            # Parse questions
-            for row_num, row in enumerate(csv_reader, start=2):
+            row_count = 0
+            categories = Counter()
+            errors = []
+            error_count = 0
+            for row in csv_reader:
                 try:
                     question_data = QuestionData(
-                        question=row.get('question', ''),
-                        answer=row.get('answer', ''),
-                        category=row.get('category', '').strip() or None,
-                        difficulty=row.get('difficulty', '').strip() or None
+                        question=row.get('question') or '',
+                        answer=row.get('answer') or '',
+                        category=(row.get('category') or '').strip() or None,
+                        difficulty=(row.get('difficulty') or '').strip() or None
                     )
-                    questions.append(question_data)
-                except ValueError as e:
-                    raise ValueError(f"Row {row_num}: {str(e)}")
+                except ValidationError as e:
+                    error_count += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        messages = "; ".join(error["msg"].removeprefix("Value error, ") for error in e.errors())
+                        errors.append(f"Row {csv_reader.line_num}: {messages}")
+                    continue
+                
+                row_count += 1
+                if row_count > MAX_QUESTIONS_PER_SET:
+                    raise ValueError(f"CSV file contains too many questions (max {MAX_QUESTIONS_PER_SET})")
+                if question_data.category:
+                    categories[question_data.category] += 1
+                yield (question_data.question, question_data.answer, question_data.category, question_data.difficulty)
             
-            if not questions:
+            if error_count:
+                raise QuestionSetError(errors, error_count)
+            if not row_count:
                 raise ValueError("CSV file contains no valid questions")
-            
-            if len(questions) > 1000:
-                raise ValueError("CSV file contains too many questions (max 1000)")
-            
-            # Create question set
-            set_id = str(uuid.uuid4())
-            question_set = QuestionSet(
+        except QuestionSetError:
+            raise
+        except UnicodeDecodeError:
+            raise ValueError("Failed to parse CSV: file is not valid UTF-8")
+        except (ValueError, csv.Error) as e:
+            raise ValueError(f"Failed to parse CSV: {str(e)}")
+        
+        summary["category"] = categories.most_common(1)[0][0] if categories else "Mixed"
+    
+    def _add_question_set(self, set_id: str, name: str, category: Union[str, Callable[[], str]],
+                          rows: Iterable[QuestionRow], store: Optional[QuestionStore] = None,
+                          content_hash: Optional[str] = None) -> QuestionSet:
+        store = store or self.store
+        described = []
+        
+        def describe(question_count: int) -> Dict[str, Any]:
+            # A streamed upload only knows its category once every row has been read
+            described.append(QuestionSet(
                 set_id=set_id,
-                name=filename.replace('.csv', ''),
-                category=self._determine_category(questions),
-                questions=questions,
+                name=name,
+                category=category if isinstance(category, str) else category(),
+                question_count=question_count,
                 created_at=datetime.now(),
-                file_path=f"/uploads/{set_id}.csv"
-            )
-            
+                file_path=store.location(set_id),
+                content_hash=content_hash
+            ))
+            return described[0].model_dump()
+        
+        store.add_set(set_id, rows, describe)
+        question_set = described[0]
+        with self._catalog_lock:
             self.question_sets[set_id] = question_set
-            return question_set
-            
-        except Exception as e:
-            raise ValueError(f"Failed to parse CSV: {str(e)}")
+        return question_set
     
     def validate_csv_format(self, file_content: str) -> bool:
         """Validate CSV format without creating a question set."""
         try:
-            self.parse_csv(file_content, "validation.csv")
+            self._read_csv(io.StringIO(file_content, newline=''))
             return True
         except ValueError:
             return False
     
-    def get_random_question(self, set_id: str, exclude_indices: Set[int]) -> Tuple[QuestionData, int]:
-        """Get random question ensuring no repeats within session."""
-        if set_id not in self.question_sets:
+    def _store_for(self, set_id: str) -> QuestionStore:
+        if set_id == DEFAULT_SET_ID:
+            self._load_default_questions()
+            return self.builtin
+        return self.store
+    
+    def get_questions(self, set_id: str, offset: int = 0, limit: int = 10) -> List[QuestionData]:
+        """Read a page of a set's questions, in upload order."""
+        # Rows were validated when the set was stored
+        return [
+            QuestionData.model_construct(question=question, answer=answer, category=category, difficulty=difficulty)
+            for question, answer, category, difficulty in self._store_for(set_id).get_rows(set_id, offset, limit)
+        ]
+    
+    def get_random_question(self, set_id: str, deck: QuestionDeck) -> Tuple[QuestionData, int]:
+        """Deal the next question from a session's deck; no repeats until the set is used up."""
+        question_set = self.get_question_set(set_id)
+        if not question_set:
             raise ValueError(f"Question set {set_id} not found")
         
-        questions = self.question_sets[set_id].questions
-        available_indices = [i for i in range(len(questions)) if i not in exclude_indices]
-        
-        # If all questions used, reset (allow repeats after full cycle)
-        if not available_indices:
-            available_indices = list(range(len(questions)))
+        question_count = question_set.question_count
+        if deck.set_id != set_id or deck.size != question_count:
+            deck.reset(set_id, question_count)
         
-        selected_index = random.choice(available_indices)
-        return questions[selected_index], selected_index
+        selected_index = deck.draw()
+        questions = self.get_questions(set_id, selected_index, 1)
+        if not questions:
+            raise ValueError(f"Question set {set_id} not found")
+        return questions[0], selected_index
     
     def get_question_set(self, set_id: str) -> Optional[QuestionSet]:
         """Get question set by ID."""
-        return self.question_sets.get(set_id)
+        question_set = self.question_sets.get(set_id)
+        if question_set is None:
+            # Another worker sharing the store may have uploaded it
+            self._refresh_catalog()
+            question_set = self.question_sets.get(set_id)
+        return question_set
     
     def list_question_sets(self) -> List[QuestionSet]:
         """List all available question sets."""
-        return list(self.question_sets.values())
+        self._refresh_catalog()
+        with self._catalog_lock:
+            return list(self.question_sets.values())
+    
+    def _refresh_catalog(self):
+        """Bring the catalog in line with the store's set metadata; questions stay on disk."""
+        # The default pack is in the catalog before any stored set is listed
+        self._load_default_questions()
+        with self._catalog_lock:
+            known = set(self.question_sets)
+        # Listed without the lock; only sets already known beforehand can be missing because they were deleted
+        stored = {metadata["set_id"]: metadata for metadata in self.store.list_sets()}
+        with self._catalog_lock:
+            for set_id in known - stored.keys() - {DEFAULT_SET_ID}:
+                self.question_sets.pop(set_id, None)
+            for set_id, metadata in stored.items():
+                if set_id not in self.question_sets:
+                    self.question_sets[set_id] = QuestionSet(**metadata)
     
     def delete_question_set(self, set_id: str) -> bool:
         """Delete a question set."""
-        if set_id in self.question_sets:
-            del self.question_sets[set_id]
-            return True
-        return False
+        if set_id not in self.question_sets:
+            return False
+        # Still listed while the store deletes it, so a concurrent refresh cannot add it back
+        self._store_for(set_id).delete_set(set_id)
+        with self._catalog_lock:
+            self.question_sets.pop(set_id, None)
+        return True
     
-    def _determine_category(self, questions: List[QuestionData]) -> str:
-        """Determine category based on question content."""
-        categories = [q.category for q in questions if q.category]
-        if categories:
-            # Return most common category
-            return max(set(categories), key=categories.count)
-        return "Mixed"
+    def get_stats(self) -> Dict[str, int]:
+        """Get upload cache counters and how many distinct questions are held in memory."""
+        interner = self.builtin.interner
+        return {
+            "sets": len(self.question_sets),
+            **self.stats,
+            "interned_questions": len(interner),
+            "intern_hits": interner.stats["hits"],
+            "intern_misses": interner.stats["misses"],
+        }
     
     def _load_default_questions(self):
-        """Load default question set from bundled CSV."""
+        """Load default question set from its precompiled pack, or the bundled CSV."""
+        if self._default_loaded:
+            return
+        self._default_loaded = True
         try:
-            import os
-            default_csv_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'default_questions.csv')
-            
-            if os.path.exists(default_csv_path):
-                with open(default_csv_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
+            if os.path.exists(DEFAULT_CSV_PATH):
+                compiled = load_pack(DEFAULT_CSV_PATH)
+                if compiled:
+                    rows, _ = compiled
+                else:
+                    with open(DEFAULT_CSV_PATH, 'r', encoding='utf-8-sig', newline='') as f:
+                        rows, _ = self._read_csv(f)
                 # Create default question set with fixed ID
-                default_set = self.parse_csv(content, "Default Questions")
-                default_set.set_id = "default"
-                default_set.name = "Default Questions"
-                default_set.category = "Mixed"
-                self.question_sets["default"] = default_set
+                self._add_question_set(DEFAULT_SET_ID, "Default Questions", "Mixed", rows, store=self.builtin)
         except Exception as e:
             print(f"Warning: Could not load default questions: {e}")
 
-
 # Global question manager instance
-question_manager = QuestionManager()
\ No newline at end of file
+question_manager = QuestionManager(create_question_store())
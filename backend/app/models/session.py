@@ -1,41 +1,224 @@
-from typing import Dict, Optional, List, Set
-from pydantic import BaseModel
+"""
+Live game state: sessions, their players and the current question.
+"""
+from dataclasses import dataclass, field, fields
+from itertools import islice
+from typing import Any, Callable, Dict, Optional, List, Set, Tuple, Union
 from .game_state import GameState
 import uuid
 import random
 import string
+import unicodedata
 
-class Player(BaseModel):
+
+def normalize_pseudonym(pseudonym: str) -> str:
+    """Fold a pseudonym so names differing only in case or Unicode form compare equal"""
+    return unicodedata.normalize("NFKC", unicodedata.normalize("NFKC", pseudonym).casefold())
+
+def _init_fields(cls) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls) if f.init)
+
+@dataclass(slots=True)
+class Player:
     player_id: str
     pseudonym: str
     is_game_master: bool = False
-    connected: bool = True
+    connected: bool = False  # Whether the player has a socket open; kept up to date by presence changes
+    joined_version: int = 0  # Session roster_version at which the player joined
+    
+    def roster_entry(self) -> Dict:
+        """The player as listed in rosters and roster deltas"""
+        return {
+            "player_id": self.player_id,
+            "pseudonym": self.pseudonym,
+            "is_game_master": self.is_game_master,
+            "connected": self.connected
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form of the player"""
+        return {name: getattr(self, name) for name in _PLAYER_FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Player":
+        """Rebuild a player from to_dict output"""
+        return cls(**{name: data[name] for name in _PLAYER_FIELDS if name in data})
 
-class Question(BaseModel):
+@dataclass(slots=True)
+class Question:
     text: str
     correct_answer: str
-    fake_answers: Dict[str, str] = {}  # player_id -> fake_answer
-    votes: Dict[str, str] = {}  # player_id -> voted_answer
+    fake_answers: Dict[str, str] = field(default_factory=dict)  # player_id -> fake_answer
+    votes: Dict[str, int] = field(default_factory=dict)  # player_id -> index into answer_order
+    answer_order: List[str] = field(default_factory=list)  # Distinct answers in voting order, fixed once per round
+    answer_index: Dict[str, int] = field(default_factory=dict)  # answer -> position in answer_order
+    vote_counts: List[int] = field(default_factory=list)  # Running tally of votes per position in answer_order
+    audience_votes: List[int] = field(default_factory=list)  # Spectator votes per position, flushed in batches
     source: str = "manual"  # "manual", "csv", "dice"
     original_text: Optional[str] = None  # Original question before editing
     original_answer: Optional[str] = None  # Original answer before editing
     
-class GameSession(BaseModel):
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form of the question"""
+        return {name: getattr(self, name) for name in _QUESTION_FIELDS}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Question":
+        """Rebuild a question from to_dict output"""
+        return cls(**{name: data[name] for name in _QUESTION_FIELDS if name in data})
+    
+    def fix_answer_order(self):
+        """Shuffle the answers once for voting and index them"""
+        answers = list(dict.fromkeys([*self.fake_answers.values(), self.correct_answer]))
+        random.shuffle(answers)
+        self.answer_order = answers
+        self.answer_index = {answer: index for index, answer in enumerate(answers)}
+        self.vote_counts = [0] * len(answers)
+    
+    def record_vote(self, player_id: str, answer_index: int):
+        """Store a player's vote and update the tally, replacing any earlier vote"""
+        previous = self.votes.get(player_id)
+        if previous is not None:
+            self.vote_counts[previous] -= 1
+        self.votes[player_id] = answer_index
+        self.vote_counts[answer_index] += 1
+    
+    def add_audience_votes(self, counts: Dict[int, int]):
+        """Add a batch of spectator votes (answer index -> count) to audience_votes"""
+        if len(self.audience_votes) != len(self.answer_order):
+            self.audience_votes = [0] * len(self.answer_order)
+        for answer_index, count in counts.items():
+            self.audience_votes[answer_index] += count
+    
+    def remove_player(self, player_id: str):
+        """Drop a departed player's fake answer and vote from this round"""
+        self.fake_answers.pop(player_id, None)
+        previous = self.votes.pop(player_id, None)
+        if previous is not None:
+            self.vote_counts[previous] -= 1
+
+_MASK64 = (1 << 64) - 1
+
+def _mix64(value: int) -> int:
+    """splitmix64 finalizer: spreads a 64-bit integer into a well-mixed hash"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+def _random_seed() -> int:
+    return random.getrandbits(63)
+
+@dataclass(slots=True)
+class QuestionDeck:
+    """A session's pass through a question set without repeats, shuffled one draw at a time from a seed."""
+    seed: int = field(default_factory=_random_seed)
+    set_id: Optional[str] = None
+    size: int = 0
+    cycle: int = 0
+    cursor: int = 0  # Questions dealt in the current cycle
+    displaced: Dict[int, int] = field(default_factory=dict)  # position -> question index swapped there
+    
+    def reset(self, set_id: str, size: int):
+        """Start dealing a (different) question set from the top, keeping the seed"""
+        self.set_id = set_id
+        self.size = size
+        self.cycle = 0
+        self.cursor = 0
+        self.displaced.clear()
+    
+    def draw(self) -> int:
+        """Deal the index of the next question"""
+        if self.size <= 0:
+            raise ValueError("Question set is empty")
+        if self.cursor >= self.size:
+            self.cycle += 1
+            self.cursor = 0
+            self.displaced.clear()
+        
+        position = self.cursor
+        swap = position + _mix64(self.seed ^ _mix64((self.cycle << 32) | position)) % (self.size - position)
+        current = self.displaced.pop(position, position)
+        if swap == position:
+            drawn = current
+        else:
+            drawn = self.displaced.get(swap, swap)
+            self.displaced[swap] = current
+        self.cursor += 1
+        return drawn
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form of the deck"""
+        data = {name: getattr(self, name) for name in _DECK_FIELDS}
+        data["displaced"] = list(self.displaced.items())
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuestionDeck":
+        """Rebuild a deck from to_dict output"""
+        values = {name: data[name] for name in _DECK_FIELDS if name in data}
+        values["displaced"] = {position: index for position, index in data.get("displaced", ())}
+        return cls(**values)
+
+def _default_auto_timers() -> Dict[str, int]:
+    return {
+        "submission_timeout": 60,
+        "voting_timeout": 30,
+        "results_display": 10
+    }
+
+@dataclass(slots=True)
+class GameSession:
     session_id: str
     game_master_id: str
-    players: Dict[str, Player] = {}
+    players: Dict[str, Player] = field(default_factory=dict)
     current_question: Optional[Question] = None
     game_state: GameState = GameState.WAITING_FOR_PLAYERS
-    scores: Dict[str, int] = {}
+    scores: Dict[str, int] = field(default_factory=dict)
     round_number: int = 0
     is_automatic_mode: bool = False
+    legacy_progress_ticks: bool = False  # Per-second AUTO_MODE_PROGRESS instead of PHASE_DEADLINE
     question_set_id: Optional[str] = None
-    used_questions: Set[int] = set()  # Track used question indices
-    auto_timers: Dict[str, int] = {
-        "submission_timeout": 60,
-        "voting_timeout": 30,
-        "results_display": 10
-    }
+    question_seed: int = field(default_factory=_random_seed)  # Seeds every deck, so a seed replays a game
+    question_decks: Dict[str, QuestionDeck] = field(default_factory=dict)  # set_id -> order its questions are dealt in
+    non_gm_player_count: int = 0  # Kept in step with players so completion checks are O(1)
+    roster_version: int = 0  # Bumped whenever a player joins or leaves
+    departed_players: Dict[str, int] = field(default_factory=dict)  # player_id -> roster_version at which they left
+    auto_timers: Dict[str, int] = field(default_factory=_default_auto_timers)
+    version: int = 0  # Bumped on every saved change; identifies state snapshots
+    # Called with (session_id, game_state) once every non-GM player has acted
+    _phase_complete_hook: Optional[Callable[[str, GameState], None]] = field(
+        default=None, init=False, repr=False, compare=False)
+    # (version, serialized state) built by the last state request
+    _snapshot: Optional[Tuple[int, bytes]] = field(default=None, init=False, repr=False, compare=False)
+    # Normalized pseudonym -> player_id, built on first use and kept in step with players
+    _pseudonym_index: Optional[Dict[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form of the session, as kept by the session store"""
+        data = {name: getattr(self, name) for name in _SESSION_FIELDS}
+        data["players"] = {player_id: player.to_dict() for player_id, player in self.players.items()}
+        data["current_question"] = self.current_question.to_dict() if self.current_question else None
+        data["game_state"] = self.game_state.value
+        data["question_decks"] = {set_id: deck.to_dict() for set_id, deck in self.question_decks.items()}
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "GameSession":
+        """Rebuild a session from to_dict output"""
+        # Keys no longer on the session, such as the old used_questions list, are ignored
+        values = {name: data[name] for name in _SESSION_FIELDS if name in data}
+        values["players"] = {
+            player_id: Player.from_dict(player) for player_id, player in data.get("players", {}).items()
+        }
+        if data.get("current_question"):
+            values["current_question"] = Question.from_dict(data["current_question"])
+        if "game_state" in data:
+            values["game_state"] = GameState(data["game_state"])
+        values["question_decks"] = {
+            set_id: QuestionDeck.from_dict(deck) for set_id, deck in data.get("question_decks", {}).items()
+        }
+        return cls(**values)
     
     @classmethod
     def create_new(cls, game_master_pseudonym: str) -> "GameSession":
@@ -56,26 +239,138 @@ class GameSession(BaseModel):
             scores={game_master_id: 0}
         )
     
+    def _pseudonyms(self) -> Dict[str, str]:
+        if self._pseudonym_index is None:
+            self._pseudonym_index = {
+                normalize_pseudonym(player.pseudonym): player_id for player_id, player in self.players.items()
+            }
+        return self._pseudonym_index
+    
+    def _register_player(self, pseudonym: str, key: str) -> Player:
+        player = Player(
+            player_id=str(uuid.uuid4()),
+            pseudonym=pseudonym,
+            is_game_master=False,
+            joined_version=self.roster_version
+        )
+        self.players[player.player_id] = player
+        self._pseudonyms()[key] = player.player_id
+        self.scores[player.player_id] = 0
+        self.non_gm_player_count += 1
+        return player
+    
     def add_player(self, pseudonym: str) -> Player:
         """Add a new player to the session"""
-        if self.is_pseudonym_taken(pseudonym):
+        key = normalize_pseudonym(pseudonym)
+        if key in self._pseudonyms():
             raise ValueError(f"Pseudonym '{pseudonym}' is already taken")
         
-        player_id = str(uuid.uuid4())
-        player = Player(
-            player_id=player_id,
-            pseudonym=pseudonym,
-            is_game_master=False
-        )
+        self.roster_version += 1
+        return self._register_player(pseudonym, key)
+    
+    def add_players(self, pseudonyms: List[str]) -> List[Player]:
+        """Add several players at once, e.g. a class roster; nobody is added if any name is taken"""
+        keys = [normalize_pseudonym(pseudonym) for pseudonym in pseudonyms]
+        index = self._pseudonyms()
+        seen = set()
+        taken = []
+        for pseudonym, key in zip(pseudonyms, keys):
+            if key in index or key in seen:
+                taken.append(pseudonym)
+            seen.add(key)
+        if taken:
+            raise ValueError(f"Pseudonyms already taken: {', '.join(taken)}")
+        if not pseudonyms:
+            return []
+        
+        # The whole batch joins at one roster version
+        self.roster_version += 1
+        return [self._register_player(pseudonym, key) for pseudonym, key in zip(pseudonyms, keys)]
+    
+    def remove_player(self, player_id: str) -> Player:
+        """Remove a player from the session, freeing their pseudonym"""
+        if player_id == self.game_master_id:
+            raise ValueError("Game master cannot leave the session")
+        player = self.players.pop(player_id, None)
+        if player is None:
+            raise ValueError("Player not in session")
         
-        self.players[player_id] = player
-        self.scores[player_id] = 0
+        self._pseudonyms().pop(normalize_pseudonym(player.pseudonym), None)
+        self.scores.pop(player_id, None)
+        self.non_gm_player_count -= 1
+        self.roster_version += 1
+        self.departed_players[player_id] = self.roster_version
+        
+        if self.current_question:
+            self.current_question.remove_player(player_id)
+            # The player may have been the last one the phase was waiting for
+            if (self.game_state == GameState.SUBMISSION_PHASE and self.all_submitted()) or \
+                    (self.game_state == GameState.VOTING_PHASE and self.all_voted()):
+                self._notify_phase_complete()
         return player
     
     def is_pseudonym_taken(self, pseudonym: str) -> bool:
         """Check if a pseudonym is already in use"""
-        return any(player.pseudonym.lower() == pseudonym.lower() 
-                  for player in self.players.values())
+        return normalize_pseudonym(pseudonym) in self._pseudonyms()
+    
+    def set_phase_complete_hook(self, hook: Optional[Callable[[str, GameState], None]]):
+        """Register a callback fired when all players have submitted or voted"""
+        self._phase_complete_hook = hook
+    
+    def _notify_phase_complete(self):
+        if self._phase_complete_hook:
+            self._phase_complete_hook(self.session_id, self.game_state)
+    
+    def bump_version(self):
+        """Mark the session as changed, invalidating the cached state snapshot"""
+        self.version += 1
+        self._snapshot = None
+    
+    def get_snapshot(self, build: Callable[["GameSession"], bytes]) -> bytes:
+        """Get the serialized state for the current version, building it at most once per version"""
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            self._snapshot = (self.version, build(self))
+        return self._snapshot[1]
+    
+    def get_roster_page(self, offset: int, limit: int) -> List[Player]:
+        """Get up to `limit` players in join order, starting at `offset`"""
+        return list(islice(self.players.values(), offset, offset + limit))
+    
+    def get_roster_changes(self, since: int) -> Tuple[List[Player], List[str]]:
+        """Get the players who joined and the IDs of those who left after roster version `since`"""
+        # Players are kept in join order, so the newcomers are a suffix of the roster
+        added = []
+        for player in reversed(self.players.values()):
+            if player.joined_version <= since:
+                break
+            added.append(player)
+        added.reverse()
+        removed = [player_id for player_id, version in self.departed_players.items() if version > since]
+        return added, removed
+    
+    def get_non_gm_players(self) -> List[Player]:
+        """Get every player except the game master"""
+        return [p for p in self.players.values() if not p.is_game_master]
+    
+    def get_non_gm_vote_count(self) -> int:
+        """Count the votes cast by non-GM players this round"""
+        if not self.current_question:
+            return 0
+        votes = self.current_question.votes
+        return len(votes) - (self.game_master_id in votes)
+    
+    def all_submitted(self) -> bool:
+        """Check if every non-GM player has submitted a fake answer"""
+        if not self.current_question:
+            return False
+        # Only players in the session can submit and the GM cannot, so counting is enough
+        return self.non_gm_player_count > 0 and len(self.current_question.fake_answers) >= self.non_gm_player_count
+    
+    def all_voted(self) -> bool:
+        """Check if every non-GM player has voted"""
+        if not self.current_question:
+            return False
+        return self.non_gm_player_count > 0 and self.get_non_gm_vote_count() >= self.non_gm_player_count
     
     def get_player(self, player_id: str) -> Optional[Player]:
         """Get a player by ID"""
@@ -98,16 +393,24 @@ class GameSession(BaseModel):
         self.game_state = GameState.SUBMISSION_PHASE
         self.round_number += 1
     
-    def enable_automatic_mode(self, question_set_id: str, timers: Optional[Dict[str, int]] = None):
-        """Enable automatic game master mode"""
+    def enable_automatic_mode(self, question_set_id: str, timers: Optional[Dict[str, int]] = None,
+                              legacy_progress: bool = False, seed: Optional[int] = None):
+        """Enable automatic game master mode; a seed replays the same question order"""
         self.is_automatic_mode = True
         self.question_set_id = question_set_id
+        self.legacy_progress_ticks = legacy_progress
         if timers:
             self.auto_timers.update(timers)
+        if seed is not None:
+            self.question_seed = seed
+            self.question_decks.clear()
     
-    def add_used_question(self, question_index: int):
-        """Mark a question as used"""
-        self.used_questions.add(question_index)
+    def question_deck(self, set_id: str) -> QuestionDeck:
+        """The deck questions from a set are dealt from; each set keeps its own place"""
+        deck = self.question_decks.get(set_id)
+        if deck is None:
+            deck = self.question_decks[set_id] = QuestionDeck(seed=self.question_seed)
+        return deck
     
     def submit_fake_answer(self, player_id: str, fake_answer: str):
         """Submit a fake answer for the current question"""
@@ -120,49 +423,73 @@ class GameSession(BaseModel):
         if player_id == self.game_master_id:
             raise ValueError("Game master cannot submit fake answers")
         
+        if player_id not in self.players:
+            raise ValueError("Player not in session")
+        
         self.current_question.fake_answers[player_id] = fake_answer
+        if self.all_submitted():
+            self._notify_phase_complete()
+    
+    def start_voting_phase(self):
+        """Move to the voting phase, fixing the order the answers are shown in"""
+        self.game_state = GameState.VOTING_PHASE
+        if self.current_question:
+            self.current_question.fix_answer_order()
+    
+    def _question_with_answer_order(self) -> Question:
+        # Sessions moved to voting without start_voting_phase get their order on first use
+        if not self.current_question.answer_order:
+            self.current_question.fix_answer_order()
+        return self.current_question
     
     def get_all_answers_shuffled(self) -> List[str]:
-        """Get all answers (fake + correct) in random order"""
+        """Get all answers (fake + correct) in this round's voting order"""
         if not self.current_question:
             return []
-        
-        answers = list(self.current_question.fake_answers.values())
-        answers.append(self.current_question.correct_answer)
-        random.shuffle(answers)
-        return answers
+        return list(self._question_with_answer_order().answer_order)
     
-    def submit_vote(self, player_id: str, voted_answer: str):
-        """Submit a vote for an answer"""
+    def validate_vote(self, player_id: str, vote: Union[int, str, None]) -> int:
+        """Check a vote without recording it and return its answer index"""
         if not self.current_question:
             raise ValueError("No active question")
         
         if self.game_state != GameState.VOTING_PHASE:
             raise ValueError("Not in voting phase")
         
-        self.current_question.votes[player_id] = voted_answer
+        if player_id not in self.players:
+            raise ValueError("Player not in session")
+        
+        question = self._question_with_answer_order()
+        index = question.answer_index.get(vote) if isinstance(vote, str) else vote
+        if index is None or not 0 <= index < len(question.answer_order):
+            raise ValueError("Invalid answer")
+        return index
+    
+    def submit_vote(self, player_id: str, vote: Union[int, str, None]):
+        """Submit a vote for an answer, by its index in the voting order (or its text)"""
+        index = self.validate_vote(player_id, vote)
+        self.current_question.record_vote(player_id, index)
+        if self.all_voted():
+            self._notify_phase_complete()
     
     def calculate_scores(self) -> Dict[str, int]:
         """Calculate and update scores based on votes"""
         if not self.current_question:
             return {}
         
-        # Count votes for each answer
-        vote_counts = {}
-        for voted_answer in self.current_question.votes.values():
-            vote_counts[voted_answer] = vote_counts.get(voted_answer, 0) + 1
-        
+        question = self._question_with_answer_order()
         round_scores = {}
         
         # Award points to players whose fake answers got votes
-        for player_id, fake_answer in self.current_question.fake_answers.items():
-            votes_received = vote_counts.get(fake_answer, 0)
+        for player_id, fake_answer in question.fake_answers.items():
+            votes_received = question.vote_counts[question.answer_index[fake_answer]]
             self.scores[player_id] += votes_received
             round_scores[player_id] = votes_received
         
         # Award points to players who voted for the correct answer
-        for player_id, voted_answer in self.current_question.votes.items():
-            if voted_answer == self.current_question.correct_answer:
+        correct_index = question.answer_index[question.correct_answer]
+        for player_id, answer_index in question.votes.items():
+            if answer_index == correct_index:
                 # Give 1 point for voting correctly
                 self.scores[player_id] += 1
                 round_scores[player_id] = round_scores.get(player_id, 0) + 1
@@ -174,14 +501,19 @@ class GameSession(BaseModel):
         if not self.current_question:
             return {}
         
-        vote_counts = {}
-        for voted_answer in self.current_question.votes.values():
-            vote_counts[voted_answer] = vote_counts.get(voted_answer, 0) + 1
+        question = self._question_with_answer_order()
+        vote_counts = {
+            answer: count for answer, count in zip(question.answer_order, question.vote_counts) if count
+        }
+        audience_vote_counts = {
+            answer: count for answer, count in zip(question.answer_order, question.audience_votes) if count
+        }
         
         return {
             "question": self.current_question.text,
             "correct_answer": self.current_question.correct_answer,
             "vote_counts": vote_counts,
+            "audience_vote_counts": audience_vote_counts,
             "fake_answers": {
                 self.players[pid].pseudonym: answer 
                 for pid, answer in self.current_question.fake_answers.items()
@@ -192,4 +524,9 @@ class GameSession(BaseModel):
     def reset_for_next_round(self):
         """Reset session state for the next round"""
         self.current_question = None
-        self.game_state = GameState.WAITING_FOR_PLAYERS
\ No newline at end of file
+        self.game_state = GameState.WAITING_FOR_PLAYERS
+
+_PLAYER_FIELDS = _init_fields(Player)
+_DECK_FIELDS = _init_fields(QuestionDeck)
+_QUESTION_FIELDS = _init_fields(Question)
+_SESSION_FIELDS = _init_fields(GameSession)
@@ -0,0 +1,285 @@
+"""
+Session-affinity router for running the API across several worker processes.
+
+    AFFINITY_WORKERS=http://127.0.0.1:8001,http://127.0.0.1:8002 uvicorn app.router:app --port 8000
+    python -m app.router --workers 4 --port 8000
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Iterable, List, Optional
+import httpx
+import websockets
+from .services.hash_ring import HashRing
+
+logger = logging.getLogger(__name__)
+
+SESSION_PATH = re.compile(r"^/(?:sessions|ws)/([^/]+)(?:/|$)")
+
+# Headers that describe a single hop and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host",
+}
+
+
+class AffinityRouter:
+    """ASGI app that proxies HTTP and WebSocket traffic to the worker owning each session."""
+    
+    def __init__(self, workers: Iterable[str], health_interval: float = 2.0):
+        self.workers: List[str] = [worker.rstrip("/") for worker in workers if worker]
+        self.ring = HashRing(self.workers)
+        self.health_interval = health_interval
+        self._round_robin = itertools.count()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+    
+    def add_worker(self, worker: str):
+        """Put a worker (back) into rotation; only its share of sessions moves to it."""
+        worker = worker.rstrip("/")
+        if worker not in self.workers:
+            self.workers.append(worker)
+        if worker not in self.ring.nodes:
+            logger.info(f"Worker {worker} added to the ring")
+            self.ring.add_node(worker)
+    
+    def remove_worker(self, worker: str, forget: bool = False):
+        """Take a worker out of rotation; only its sessions move elsewhere."""
+        if worker in self.ring.nodes:
+            logger.warning(f"Worker {worker} removed from the ring")
+            self.ring.remove_node(worker)
+        if forget and worker in self.workers:
+            self.workers.remove(worker)
+    
+    def pick_worker(self, path: str) -> Optional[str]:
+        """Choose the worker for a request path."""
+        match = SESSION_PATH.match(path)
+        if match:
+            return self.ring.get_node(match.group(1))
+        if not self.ring.nodes:
+            return None
+        return self.ring.nodes[next(self._round_robin) % len(self.ring.nodes)]
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._proxy_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._proxy_websocket(scope, receive, send)
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    
+    async def start(self):
+        """Open the upstream connection pool and start health checks."""
+        if self._client is None:
+            limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+            self._client = httpx.AsyncClient(timeout=30.0, limits=limits)
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _health_loop(self):
+        """Drop workers that stop answering /health and re-add them when they recover."""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for worker in list(self.workers):
+                try:
+                    response = await self._client.get(f"{worker}/health", timeout=1.0)
+                    healthy = response.status_code == 200
+                except httpx.HTTPError:
+                    healthy = False
+                if healthy:
+                    self.add_worker(worker)
+                else:
+                    self.remove_worker(worker)
+    
+    async def _proxy_http(self, scope, receive, send):
+        if self._client is None:
+            await self.start()
+        
+        # Small bodies arrive in one message; larger ones are streamed to the worker as they arrive
+        first = await receive()
+        body = first.get("body", b"")
+        streamed = False
+        if first.get("more_body"):
+            async def stream_body():
+                nonlocal streamed
+                streamed = True
+                yield first.get("body", b"")
+                while True:
+                    message = await receive()
+                    yield message.get("body", b"")
+                    if not message.get("more_body"):
+                        return
+            body = stream_body()
+        
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+        ]
+        # Some servers include the query string in raw_path, others do not
+        path = (scope.get("raw_path") or scope["path"].encode("utf-8")).split(b"?", 1)[0]
+        if scope.get("query_string"):
+            path += b"?" + scope["query_string"]
+        
+        # A worker that refuses connections is dropped and the request retried on the new owner
+        for _ in range(2):
+            worker = self.pick_worker(scope["path"])
+            if worker is None:
+                break
+            request = self._client.build_request(
+                scope["method"], worker + path.decode("latin-1"), headers=headers, content=body
+            )
+            try:
+                response = await self._client.send(request, stream=True)
+            except httpx.ConnectError:
+                self.remove_worker(worker)
+                if streamed:
+                    # Part of the body has been read already and cannot be sent again
+                    break
+                continue
+            
+            try:
+                await send({
+                    "type": "http.response.start",
+                    "status": response.status_code,
+                    "headers": [
+                        (name, value) for name, value in response.headers.raw
+                        if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+                    ],
+                })
+                async for chunk in response.aiter_raw():
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b""})
+            finally:
+                await response.aclose()
+            return
+        
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail": "No worker available"}'})
+    
+    async def _proxy_websocket(self, scope, receive, send):
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        
+        worker = self.pick_worker(scope["path"])
+        if worker is None:
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        
+        url = worker.replace("http", "ws", 1) + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        try:
+            upstream = await websockets.connect(url, max_size=None, subprotocols=scope.get("subprotocols") or None)
+        except (OSError, websockets.WebSocketException):
+            self.remove_worker(worker)
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        
+        await send({"type": "websocket.accept", "subprotocol": upstream.subprotocol})
+        
+        async def client_to_worker():
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    await upstream.close()
+                    return
+                data = message.get("text")
+                await upstream.send(data if data is not None else message.get("bytes", b""))
+        
+        async def worker_to_client():
+            try:
+                async for data in upstream:
+                    if isinstance(data, str):
+                        await send({"type": "websocket.send", "text": data})
+                    else:
+                        await send({"type": "websocket.send", "bytes": data})
+            except websockets.ConnectionClosed:
+                pass
+            await send({"type": "websocket.close", "code": upstream.close_code or 1000})
+        
+        tasks = [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await upstream.close()
+
+
+def spawn_workers(count: int, base_port: int, host: str = "127.0.0.1") -> List[subprocess.Popen]:
+    """Start uvicorn workers sharing SQLite session and question stores and a broadcast bus."""
+    state_dir = tempfile.mkdtemp(prefix="trivia-workers-")
+    env = dict(os.environ)
+    env.setdefault("SESSION_STORE", f"sqlite:///{os.path.join(state_dir, 'sessions.db')}")
+    # Question sets are uploaded through whichever worker round-robin picks
+    env.setdefault("QUESTION_STORE", f"sqlite:///{os.path.join(state_dir, 'questions.db')}")
+    env.setdefault("BROADCAST_BUS", f"unix://{os.path.join(state_dir, 'bus.sock')}")
+    return [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", host,
+             "--port", str(base_port + index), "--log-level", "warning"],
+            env=env,
+        )
+        for index in range(count)
+    ]
+
+
+# Router over the workers listed in AFFINITY_WORKERS, for `uvicorn app.router:app`
+app = AffinityRouter(os.getenv("AFFINITY_WORKERS", "").split(","))
+
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Run the API on several workers behind a session-affinity router")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--base-port", type=int, default=8101, help="first port used by the workers")
+    args = parser.parse_args()
+    
+    processes = spawn_workers(args.workers, args.base_port)
+    router = AffinityRouter(f"http://127.0.0.1:{args.base_port + index}" for index in range(args.workers))
+    try:
+        uvicorn.run(router, host=args.host, port=args.port)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
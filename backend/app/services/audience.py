@@ -0,0 +1,102 @@
+"""
+Audience (spectator) votes, tallied in memory and flushed on a fixed interval.
+"""
+import os
+import uuid
+from typing import Dict, Optional, Set, Tuple
+from ..models.game_state import GameState
+from ..models.session import GameSession
+from .scheduler import TimerWheel, timer_wheel
+from .session_actor import SessionActors, session_actors
+
+
+# Seconds between AUDIENCE_TALLY flushes while audience votes are coming in
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("AUDIENCE_FLUSH_INTERVAL", "1"))
+
+AUDIENCE_TIMER = "audience"
+
+
+class AudienceManager:
+    """Collects spectator votes per session and round and flushes them as one AUDIENCE_TALLY."""
+    
+    def __init__(self, session_manager, websocket_manager, flush_interval: Optional[float] = None,
+                 scheduler: Optional[TimerWheel] = None, actors: Optional[SessionActors] = None):
+        self.session_manager = session_manager
+        self.websocket_manager = websocket_manager
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.scheduler = scheduler or timer_wheel
+        self.actors = actors or session_actors
+        # session_id -> spectator IDs issued for it; only these may watch and vote
+        self.spectators: Dict[str, Set[str]] = {}
+        # session_id -> (round_number, spectators who voted that round, votes per answer index not yet flushed)
+        self.rounds: Dict[str, Tuple[int, Set[str], Dict[int, int]]] = {}
+        self.stats = {"votes": 0, "duplicates": 0, "flushes": 0}
+    
+    def new_spectator_id(self, session_id: str) -> str:
+        """Issue an ID for a new spectator; no pseudonym or roster entry is involved."""
+        spectator_id = str(uuid.uuid4())
+        self.spectators.setdefault(session_id, set()).add(spectator_id)
+        return spectator_id
+    
+    def is_spectator(self, session_id: str, spectator_id: str) -> bool:
+        """Whether the ID was issued for this session."""
+        return spectator_id in self.spectators.get(session_id, ())
+    
+    def forget_session(self, session_id: str):
+        """Drop the spectator IDs and votes of a session this worker no longer holds."""
+        self.spectators.pop(session_id, None)
+        self.rounds.pop(session_id, None)
+    
+    def record_vote(self, session: GameSession, spectator_id: str, answer_index: int) -> bool:
+        """Count a spectator's vote. Returns False if they already voted this round."""
+        if session.game_state != GameState.VOTING_PHASE or not session.current_question:
+            raise ValueError("Not in voting phase")
+        if not 0 <= answer_index < len(session.get_all_answers_shuffled()):
+            raise ValueError("Invalid answer")
+        
+        round_number, voters, pending = self.rounds.get(session.session_id, (None, None, None))
+        if round_number != session.round_number:
+            round_number, voters, pending = self.rounds[session.session_id] = (session.round_number, set(), {})
+        if spectator_id in voters:
+            self.stats["duplicates"] += 1
+            return False
+        voters.add(spectator_id)
+        pending[answer_index] = pending.get(answer_index, 0) + 1
+        self.stats["votes"] += 1
+        
+        key = (session.session_id, AUDIENCE_TIMER)
+        if self.scheduler.get(key) is None:
+            self.scheduler.schedule(key, self.flush_interval, self._flush_on_actor, session.session_id)
+        return True
+    
+    async def _flush_on_actor(self, session_id: str):
+        await self.actors.call(session_id, self.flush, session_id)
+    
+    async def flush(self, session_id: str):
+        """Fold pending audience votes into the question and broadcast the tally."""
+        self.scheduler.cancel((session_id, AUDIENCE_TIMER))
+        session = self.session_manager.get_session(session_id)
+        current = self.rounds.get(session_id)
+        if not session or not session.current_question or not current or not current[2]:
+            return
+        
+        round_number, _, pending = current
+        if round_number != session.round_number:
+            # Votes for a round that has already been closed
+            pending.clear()
+            return
+        question = session.current_question
+        question.add_audience_votes(pending)
+        pending.clear()
+        self.session_manager.save_session(session)
+        self.stats["flushes"] += 1
+        
+        await self.websocket_manager.broadcast_to_session(session_id, {
+            "type": "AUDIENCE_TALLY",
+            "data": {
+                "round_number": session.round_number,
+                "vote_counts": question.audience_votes,
+                "total_votes": sum(question.audience_votes),
+                "spectators": self.websocket_manager.get_audience_size(session_id)
+            }
+        })
@@ -1,42 +1,68 @@
 """
 Automatic Game Master service for managing automated trivia sessions.
 """
-import asyncio
-from typing import Dict, Optional
+import math
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
 from ..models.session import GameSession
 from ..models.game_state import GameState
 from ..models.questions import question_manager
+from .scheduler import TimerWheel, timer_wheel
+from .session_actor import SessionActors, session_actors
+
+
+# Seconds between PHASE_DEADLINE resync broadcasts (0 disables resync ticks)
+DEFAULT_RESYNC_INTERVAL = float(os.getenv("AUTO_RESYNC_INTERVAL", "10"))
+
+# Timer keys per session on the shared wheel
+PHASE_TIMER = "phase"
+PROGRESS_TIMER = "progress"
 
 
 class AutoGameMaster:
     """Manages automatic game master functionality."""
     
-    def __init__(self):
-        self.active_timers: Dict[str, asyncio.Task] = {}
+    def __init__(self, resync_interval: Optional[float] = None, scheduler: Optional[TimerWheel] = None,
+                 actors: Optional[SessionActors] = None):
         self.sessions: Dict[str, GameSession] = {}
+        # session_id -> phase whose PHASE_TIMER is pending
+        self.timer_phases: Dict[str, str] = {}
+        self.resync_interval = DEFAULT_RESYNC_INTERVAL if resync_interval is None else resync_interval
+        self.scheduler = scheduler or timer_wheel
+        # Phase timeouts run as commands on the session's actor, in order with player actions
+        self.actors = actors or session_actors
+        # Set by the session manager so automatic transitions get persisted
+        self.on_session_changed: Optional[Callable[[GameSession], None]] = None
+        # Set by the app so votes still buffered for a session count before voting closes
+        self.before_voting_ends: Optional[Callable[[str], Awaitable[None]]] = None
     
     def register_session(self, session: GameSession):
         """Register a session for automatic management."""
         self.sessions[session.session_id] = session
+        session.set_phase_complete_hook(self._on_phase_complete)
     
     def unregister_session(self, session_id: str):
         """Unregister a session and cancel any active timers."""
-        if session_id in self.active_timers:
-            self.active_timers[session_id].cancel()
-            del self.active_timers[session_id]
+        self._cancel_timers(session_id)
         
         if session_id in self.sessions:
             del self.sessions[session_id]
     
+    def _session_changed(self, session: GameSession):
+        if self.on_session_changed:
+            self.on_session_changed(session)
+    
     async def start_automatic_session(self, session_id: str, question_set_id: str, 
-                                    websocket_manager, timers: Optional[Dict[str, int]] = None):
+                                    websocket_manager, timers: Optional[Dict[str, int]] = None,
+                                    legacy_progress: bool = False, seed: Optional[int] = None):
         """Start automatic mode for a session."""
         session = self.sessions.get(session_id)
         if not session:
             raise ValueError(f"Session {session_id} not found")
         
         # Enable automatic mode
-        session.enable_automatic_mode(question_set_id, timers)
+        session.enable_automatic_mode(question_set_id, timers, legacy_progress, seed)
         
         # Start the first question automatically
         await self.progress_to_next_question(session_id, websocket_manager)
@@ -49,19 +75,17 @@ class AutoGameMaster:
         
         try:
             # Get random question from the question set
-            question_data, question_index = question_manager.get_random_question(
-                session.question_set_id, session.used_questions
+            question_data, _ = question_manager.get_random_question(
+                session.question_set_id, session.question_deck(session.question_set_id)
             )
             
-            # Mark question as used
-            session.add_used_question(question_index)
-            
             # Start the question phase
             session.start_question_phase(
                 question_data.question,
                 question_data.answer,
                 source="csv"
             )
+            self._session_changed(session)
             
             # Broadcast question to all players
             await websocket_manager.broadcast_to_session(session_id, {
@@ -77,11 +101,12 @@ class AutoGameMaster:
             
             # Start submission timer
             await self._start_phase_timer(session_id, "submission", websocket_manager)
-            
+        
         except Exception as e:
             print(f"Error in automatic progression: {e}")
             # Fallback to manual mode
             session.is_automatic_mode = False
+            self._session_changed(session)
     
     async def handle_phase_timeout(self, session_id: str, phase: str, websocket_manager):
         """Handle timeout for a specific phase."""
@@ -89,35 +114,51 @@ class AutoGameMaster:
         if not session or not session.is_automatic_mode:
             return
         
+        # A phase the game master already ended by hand only needs the timer chain to continue
         if phase == "submission":
-            # Move to voting phase
-            session.game_state = GameState.VOTING_PHASE
-            answers = session.get_all_answers_shuffled()
-            
-            await websocket_manager.broadcast_to_session(session_id, {
-                "type": "GAME_STATE_UPDATE",
-                "data": {
-                    "game_state": session.game_state.value,
-                    "answers": answers,
-                    "is_automatic_mode": True
-                }
-            })
+            if session.game_state == GameState.SUBMISSION_PHASE:
+                # Move to voting phase
+                session.start_voting_phase()
+                self._session_changed(session)
+                answers = session.get_all_answers_shuffled()
+                
+                await websocket_manager.broadcast_to_session(session_id, {
+                    "type": "GAME_STATE_UPDATE",
+                    "data": {
+                        "game_state": session.game_state.value,
+                        "answers": answers,
+                        "is_automatic_mode": True
+                    }
+                })
+            elif session.game_state != GameState.VOTING_PHASE:
+                return
             
             # Start voting timer
             await self._start_phase_timer(session_id, "voting", websocket_manager)
-            
+        
         elif phase == "voting":
-            # Move to results phase
-            await self.calculate_and_broadcast_results(session_id, websocket_manager)
+            if session.game_state == GameState.VOTING_PHASE and self.before_voting_ends:
+                await self.before_voting_ends(session_id)
+            if session.game_state == GameState.VOTING_PHASE:
+                # Move to results phase
+                await self.calculate_and_broadcast_results(session_id, websocket_manager)
+            elif session.game_state != GameState.RESULTS_PHASE:
+                return
             
             # Start results display timer
             await self._start_phase_timer(session_id, "results", websocket_manager)
-            
+        
         elif phase == "results":
             # Progress to next question
             session.reset_for_next_round()
+            self._session_changed(session)
             await self.progress_to_next_question(session_id, websocket_manager)
     
+    async def _phase_timer_fired(self, session_id: str, phase: str, websocket_manager):
+        if self.timer_phases.get(session_id) == phase:
+            del self.timer_phases[session_id]
+        await self.actors.call(session_id, self.handle_phase_timeout, session_id, phase, websocket_manager)
+    
     async def calculate_and_broadcast_results(self, session_id: str, websocket_manager):
         """Calculate scores and broadcast results."""
         session = self.sessions.get(session_id)
@@ -130,6 +171,7 @@ class AutoGameMaster:
         
         # Update game state
         session.game_state = GameState.RESULTS_PHASE
+        self._session_changed(session)
         
         # Broadcast results
         await websocket_manager.broadcast_to_session(session_id, {
@@ -148,49 +190,115 @@ class AutoGameMaster:
         if not session:
             return
         
-        # Cancel existing timer
-        if session_id in self.active_timers:
-            self.active_timers[session_id].cancel()
-        
         # Get timeout duration
         timeout_key = f"{phase}_timeout" if phase != "results" else "results_display"
         timeout = session.auto_timers.get(timeout_key, 30)
         
-        # Start new timer
-        self.active_timers[session_id] = asyncio.create_task(
-            self._timer_countdown(session_id, phase, timeout, websocket_manager)
+        # Scheduling under the session's key replaces any timer still pending
+        self.timer_phases[session_id] = phase
+        self.scheduler.schedule(
+            (session_id, PHASE_TIMER), timeout,
+            self._phase_timer_fired, session_id, phase, websocket_manager
         )
+        self.scheduler.cancel((session_id, PROGRESS_TIMER))
+        
+        if session.legacy_progress_ticks:
+            await self._progress_tick(session_id, phase, timeout, websocket_manager)
+            return
+        
+        deadline = time.time() + timeout
+        await self._broadcast_deadline(session_id, phase, deadline, timeout, websocket_manager)
+        if self.resync_interval > 0 and timeout > self.resync_interval:
+            self.scheduler.schedule(
+                (session_id, PROGRESS_TIMER), self.resync_interval,
+                self._resync_tick, session_id, phase, deadline, timeout, websocket_manager
+            )
     
-    async def _timer_countdown(self, session_id: str, phase: str, duration: int, websocket_manager):
-        """Countdown timer with progress updates."""
-        try:
-            for remaining in range(duration, 0, -1):
-                await websocket_manager.broadcast_to_session(session_id, {
-                    "type": "AUTO_MODE_PROGRESS",
-                    "data": {
-                        "current_phase": phase.upper() + "_PHASE",
-                        "time_remaining": remaining,
-                        "total_time": duration
-                    }
-                })
-                await asyncio.sleep(1)
-            
-            # Timer expired, handle phase timeout
-            await self.handle_phase_timeout(session_id, phase, websocket_manager)
-            
-        except asyncio.CancelledError:
-            # Timer was cancelled (manual intervention)
-            pass
-        finally:
-            # Clean up timer reference
-            if session_id in self.active_timers:
-                del self.active_timers[session_id]
+    async def _resync_tick(self, session_id: str, phase: str, deadline: float, duration: int,
+                           websocket_manager):
+        """Low-frequency resync for clients whose clocks drift or who just reconnected."""
+        if not self.scheduler.get((session_id, PHASE_TIMER)):
+            return
+        
+        await self._broadcast_deadline(session_id, phase, deadline, duration, websocket_manager,
+                                       resync=True)
+        if deadline - time.time() > self.resync_interval:
+            self.scheduler.schedule(
+                (session_id, PROGRESS_TIMER), self.resync_interval,
+                self._resync_tick, session_id, phase, deadline, duration, websocket_manager
+            )
+    
+    async def _broadcast_deadline(self, session_id: str, phase: str, deadline: float, duration: int,
+                                  websocket_manager, resync: bool = False):
+        """Broadcast the absolute deadline of the current phase."""
+        await websocket_manager.broadcast_to_session(session_id, {
+            "type": "PHASE_DEADLINE",
+            "data": {
+                "current_phase": phase.upper() + "_PHASE",
+                "deadline": deadline,
+                "server_time": time.time(),
+                "total_time": duration,
+                "resync": resync
+            }
+        })
+    
+    async def _progress_tick(self, session_id: str, phase: str, duration: int, websocket_manager):
+        """Per-second progress broadcast for legacy clients, aligned to the phase deadline."""
+        phase_timer = self.scheduler.get((session_id, PHASE_TIMER))
+        if not phase_timer:
+            return
+        
+        left = phase_timer.remaining(self.scheduler.time())
+        remaining = math.ceil(left)
+        if remaining <= 0:
+            return
+        
+        await websocket_manager.broadcast_to_session(session_id, {
+            "type": "AUTO_MODE_PROGRESS",
+            "data": {
+                "current_phase": phase.upper() + "_PHASE",
+                "time_remaining": remaining,
+                "total_time": duration
+            }
+        })
+        
+        if remaining > 1:
+            self.scheduler.schedule(
+                (session_id, PROGRESS_TIMER), left - (remaining - 1),
+                self._progress_tick, session_id, phase, duration, websocket_manager
+            )
+    
+    def complete_phase(self, session_id: str, phase: str) -> bool:
+        """Advance immediately if the pending timer belongs to the given phase."""
+        key = (session_id, PHASE_TIMER)
+        if self.timer_phases.get(session_id) != phase or not self.scheduler.get(key):
+            return False
+        return self.scheduler.fire_now(key)
+    
+    def _on_phase_complete(self, session_id: str, game_state: GameState):
+        """Completion hook called by GameSession once every player has acted."""
+        session = self.sessions.get(session_id)
+        if not session or not session.is_automatic_mode:
+            return
+        
+        if game_state == GameState.SUBMISSION_PHASE:
+            self.complete_phase(session_id, "submission")
+        elif game_state == GameState.VOTING_PHASE:
+            self.complete_phase(session_id, "voting")
     
     def cancel_timer(self, session_id: str):
-        """Cancel active timer for manual intervention."""
-        if session_id in self.active_timers:
-            self.active_timers[session_id].cancel()
-            del self.active_timers[session_id]
+        """Cancel active timer for manual intervention; the game master runs the session from here."""
+        self._cancel_timers(session_id)
+        session = self.sessions.get(session_id)
+        if session and session.is_automatic_mode:
+            # Without a phase timer nothing would advance an automatic session
+            session.is_automatic_mode = False
+            self._session_changed(session)
+    
+    def _cancel_timers(self, session_id: str):
+        self.timer_phases.pop(session_id, None)
+        self.scheduler.cancel((session_id, PHASE_TIMER))
+        self.scheduler.cancel((session_id, PROGRESS_TIMER))
 
 
 # Global auto game master instance
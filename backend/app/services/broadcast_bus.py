@@ -0,0 +1,249 @@
+"""
+Broadcast bus for delivering session events across worker processes.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import struct
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Set
+
+
+# Bytes a worker connection may have waiting to be sent before that worker is treated as stalled
+DEFAULT_MAX_PEER_BUFFER = int(os.getenv("BROADCAST_BUS_MAX_BUFFER", str(4 * 1024 * 1024)))
+
+
+class BusEvent:
+    """A pre-encoded session event travelling between workers."""
+    __slots__ = ("session_id", "message_type", "frame", "exclude_player", "target_player")
+    
+    def __init__(self, session_id: str, message_type: str, frame: str,
+                 exclude_player: Optional[str] = None, target_player: Optional[str] = None):
+        self.session_id = session_id
+        self.message_type = message_type
+        self.frame = frame
+        self.exclude_player = exclude_player
+        self.target_player = target_player  # Set for direct messages to a single player
+    
+    def encode(self) -> bytes:
+        """Length-prefixed wire form: a small JSON header line followed by the frame."""
+        header = json.dumps([self.session_id, self.message_type, self.exclude_player, self.target_player])
+        payload = header.encode("utf-8") + b"\n" + self.frame.encode("utf-8")
+        return struct.pack("!I", len(payload)) + payload
+    
+    @classmethod
+    def decode(cls, payload: bytes) -> "BusEvent":
+        header, frame = payload.split(b"\n", 1)
+        session_id, message_type, exclude_player, target_player = json.loads(header)
+        return cls(session_id, message_type, frame.decode("utf-8"), exclude_player, target_player)
+
+
+EventHandler = Callable[[BusEvent], None]
+
+
+class BroadcastBus(ABC):
+    """Interface for publishing session events to every worker, including this one."""
+    
+    # True when every socket lives in this process, so empty sessions can be skipped
+    local_only = False
+    
+    def __init__(self):
+        self._handler: Optional[EventHandler] = None
+    
+    def set_handler(self, handler: EventHandler):
+        """Set the callback that delivers an event to this worker's local sockets."""
+        self._handler = handler
+    
+    @abstractmethod
+    def publish(self, event: BusEvent):
+        """Deliver an event locally and to every other worker."""
+    
+    async def start(self):
+        """Connect to the other workers."""
+    
+    async def stop(self):
+        """Disconnect from the other workers."""
+    
+    def _deliver_local(self, event: BusEvent):
+        if self._handler:
+            self._handler(event)
+
+
+class InProcessBus(BroadcastBus):
+    """Single-worker bus: publishing is just local delivery."""
+    
+    local_only = True
+    
+    def publish(self, event: BusEvent):
+        self._deliver_local(event)
+
+
+class UnixSocketBus(BroadcastBus):
+    """Multi-process bus relayed over a Unix socket by whichever worker holds the hub lock."""
+    
+    def __init__(self, path: str, reconnect_delay: float = 0.5, max_buffer: Optional[int] = None):
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.max_buffer = DEFAULT_MAX_PEER_BUFFER if max_buffer is None else max_buffer
+        self.is_hub = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()  # Hub: connected workers
+        self._hub: Optional[asyncio.StreamWriter] = None  # Client: connection to the hub
+        self._task: Optional[asyncio.Task] = None
+        self._lock_file = None  # Hub: held open to keep the hub lock
+        self._connected = asyncio.Event()
+        self.stats = {"published": 0, "received": 0, "dropped": 0, "stalled_peers": 0}
+    
+    async def start(self):
+        self._connected = asyncio.Event()
+        self._task = asyncio.create_task(self._maintain())
+        await self._connected.wait()
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._hub:
+            self._hub.close()
+            self._hub = None
+        for peer in list(self._peers):
+            peer.close()
+        self._peers.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_hub = False
+    
+    def publish(self, event: BusEvent):
+        self._deliver_local(event)
+        data = event.encode()
+        self.stats["published"] += 1
+        
+        if self.is_hub:
+            self._relay(data)
+        elif self._hub:
+            if not self._write(self._hub, data):
+                # The hub is not keeping up; losing events beats queueing them without bound
+                self.stats["dropped"] += 1
+        else:
+            # Between hub failover and reconnect there is nobody to relay to
+            self.stats["dropped"] += 1
+    
+    async def _maintain(self):
+        """Become the hub or connect to it, and start over whenever the hub is lost."""
+        while True:
+            try:
+                if await self._try_become_hub():
+                    self._connected.set()
+                    await self._server.serve_forever()
+                else:
+                    reader, writer = await asyncio.open_unix_connection(self.path)
+                    self._hub = writer
+                    self._connected.set()
+                    await self._read_events(reader)
+                    self._hub = None
+                    writer.close()
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionError, FileNotFoundError, OSError) as e:
+                print(f"Broadcast bus connection lost: {e!r}")
+                self._hub = None
+            await asyncio.sleep(self.reconnect_delay)
+    
+    async def _try_become_hub(self) -> bool:
+        """Take the hub role if no live worker holds the hub lock."""
+        lock_file = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False  # Another worker is the hub
+        
+        # The lock dies with its holder, so any socket file left here is stale
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path)
+        except OSError:
+            lock_file.close()
+            raise
+        self._lock_file = lock_file
+        self.is_hub = True
+        return True
+    
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Hub side: relay everything a worker publishes to everyone else."""
+        self._peers.add(writer)
+        try:
+            while True:
+                payload = await self._read_payload(reader)
+                if payload is None:
+                    break
+                self._relay(struct.pack("!I", len(payload)) + payload, source=writer)
+                self._receive(payload)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+    
+    def _write(self, writer: asyncio.StreamWriter, data: bytes) -> bool:
+        """Queue data for a connection unless it already has max_buffer bytes waiting."""
+        if writer.transport.get_write_buffer_size() > self.max_buffer:
+            return False
+        writer.write(data)
+        return True
+    
+    def _relay(self, data: bytes, source: Optional[asyncio.StreamWriter] = None):
+        """Hub side: send data to every worker but its source, disconnecting any that has stalled."""
+        for peer in list(self._peers):
+            if peer is not source and not self._write(peer, data):
+                # It reconnects once it reads again, missing what was sent meanwhile
+                print("Broadcast bus peer stalled, disconnecting it")
+                self.stats["stalled_peers"] += 1
+                self._peers.discard(peer)
+                # Abort rather than close, which would keep the backlog until it was flushed
+                peer.transport.abort()
+    
+    async def _read_events(self, reader: asyncio.StreamReader):
+        """Client side: deliver relayed events until the hub disconnects."""
+        while True:
+            payload = await self._read_payload(reader)
+            if payload is None:
+                return
+            self._receive(payload)
+    
+    @staticmethod
+    async def _read_payload(reader: asyncio.StreamReader) -> Optional[bytes]:
+        try:
+            header = await reader.readexactly(4)
+        except asyncio.IncompleteReadError:
+            return None
+        (length,) = struct.unpack("!I", header)
+        return await reader.readexactly(length)
+    
+    def _receive(self, payload: bytes):
+        self.stats["received"] += 1
+        try:
+            self._deliver_local(BusEvent.decode(payload))
+        except Exception as e:
+            print(f"Error delivering bus event: {e!r}")
+
+
+def create_broadcast_bus(url: Optional[str] = None) -> BroadcastBus:
+    """Build a bus from a URL such as "local" or "unix:///tmp/trivia-bus.sock"."""
+    url = url or os.getenv("BROADCAST_BUS", "local")
+    if url == "local":
+        return InProcessBus()
+    if url.startswith("unix://"):
+        return UnixSocketBus(url[len("unix://"):])
+    raise ValueError(f"Unsupported broadcast bus: {url}")
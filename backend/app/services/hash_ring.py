@@ -0,0 +1,49 @@
+"""
+Consistent hash ring mapping session IDs to worker processes.
+"""
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+
+class HashRing:
+    """Consistent hashing with virtual nodes, so adding or removing a worker moves about 1/N of the keys."""
+    
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 128):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+    
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+    
+    def add_node(self, node: str):
+        """Add a worker to the ring."""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            if point in self._owners:
+                continue
+            bisect.insort(self._points, point)
+            self._owners[point] = node
+    
+    def remove_node(self, node: str):
+        """Remove a worker from the ring."""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+    
+    def get_node(self, key: str) -> Optional[str]:
+        """Get the worker that owns a key."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
@@ -0,0 +1,70 @@
+"""
+Precompiled question packs: a bundled CSV validated once at build time.
+
+    python -m app.services.question_pack [csv_path ...]
+"""
+import marshal
+import os
+import struct
+import sys
+from typing import List, Optional, Tuple
+from .question_store import QuestionRow
+
+
+# Bundled default pack
+DEFAULT_CSV_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'data', 'default_questions.csv'))
+
+# Magic, marshal version, Python major/minor, source size, source mtime_ns
+_HEADER = struct.Struct("<4sHBBqq")
+_MAGIC = b"TQP1"
+
+
+def pack_path(csv_path: str) -> str:
+    """Where the compiled form of a CSV is kept."""
+    return os.path.splitext(csv_path)[0] + ".pack"
+
+
+def _source_stamp(csv_path: str) -> Tuple[int, int]:
+    stat = os.stat(csv_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_pack(csv_path: str, rows: List[QuestionRow], category: str) -> str:
+    """Write validated rows as the compiled pack of csv_path; returns the pack's path."""
+    size, mtime_ns = _source_stamp(csv_path)
+    header = _HEADER.pack(_MAGIC, marshal.version, *sys.version_info[:2], size, mtime_ns)
+    path = pack_path(csv_path)
+    with open(path, "wb") as f:
+        f.write(header + marshal.dumps((category, tuple(rows))))
+    return path
+
+
+def load_pack(csv_path: str) -> Optional[Tuple[List[QuestionRow], str]]:
+    """Rows and category of csv_path's pack, or None if it is missing or stale."""
+    try:
+        with open(pack_path(csv_path), "rb") as f:
+            data = f.read()
+        magic, marshal_version, major, minor, size, mtime_ns = _HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if (magic, marshal_version, (major, minor)) != (_MAGIC, marshal.version, sys.version_info[:2]):
+        return None
+    if (size, mtime_ns) != _source_stamp(csv_path):
+        return None
+    category, rows = marshal.loads(data[_HEADER.size:])
+    return list(rows), category
+
+
+def compile_pack(csv_path: str) -> str:
+    """Validate a CSV and write its pack."""
+    # Imported here: the question models import this module
+    from ..models.questions import QuestionManager
+    
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows, category = QuestionManager(store=None)._read_csv(f)
+    return write_pack(csv_path, rows, category)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or [DEFAULT_CSV_PATH]:
+        print(f"Compiled {compile_pack(path)}")
@@ -0,0 +1,225 @@
+"""
+Question set storage backends so uploaded sets survive a restart.
+"""
+import os
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# (question, answer, category, difficulty), already validated
+QuestionRow = Tuple[str, str, Optional[str], Optional[str]]
+
+# Catalog fields kept for every set
+SET_FIELDS = ("set_id", "name", "category", "question_count", "created_at", "file_path", "content_hash")
+
+# Rows taken at a time while a set is streamed into a store
+ROW_BATCH_SIZE = 1000
+
+
+def row_batches(rows: Iterable[QuestionRow], size: int = ROW_BATCH_SIZE) -> Iterator[List[QuestionRow]]:
+    """Read rows lazily in lists of at most size."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class RowInterner:
+    """Shares one tuple per distinct question row, freeing a row once no set holds it."""
+    
+    def __init__(self):
+        # Uploads are interned on worker threads while sets are deleted on the event loop
+        self._lock = threading.Lock()
+        self._rows: Dict[QuestionRow, List] = {}  # row -> [shared row, number of holders]
+        self.stats = {"hits": 0, "misses": 0}
+    
+    def intern(self, rows: List[QuestionRow]) -> List[QuestionRow]:
+        """Swap each row for its shared copy, taking a reference to it."""
+        shared_rows = []
+        with self._lock:
+            for row in rows:
+                entry = self._rows.get(row)
+                if entry is None:
+                    question, answer, category, difficulty = row
+                    # Categories and difficulties repeat on almost every row
+                    shared = (question, answer,
+                              category and sys.intern(category), difficulty and sys.intern(difficulty))
+                    entry = self._rows[shared] = [shared, 0]
+                    self.stats["misses"] += 1
+                else:
+                    self.stats["hits"] += 1
+                entry[1] += 1
+                shared_rows.append(entry[0])
+        return shared_rows
+    
+    def release(self, rows: List[QuestionRow]):
+        """Drop the references taken by intern."""
+        with self._lock:
+            for row in rows:
+                entry = self._rows[row]
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._rows[row]
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class QuestionStore(ABC):
+    """Interface for persisting question sets: a small catalog plus rows read on demand."""
+    
+    @abstractmethod
+    def add_set(self, set_id: str, rows: Iterable[QuestionRow], describe: Callable[[int], Dict[str, Any]]):
+        """Store a set's questions as rows is read, then its catalog entry from describe(question_count)."""
+    
+    @abstractmethod
+    def list_sets(self) -> List[Dict[str, Any]]:
+        """Catalog entries of every stored set, without their questions."""
+    
+    @abstractmethod
+    def get_rows(self, set_id: str, offset: int, limit: int) -> List[QuestionRow]:
+        """Questions offset to offset + limit of a set, in upload order."""
+    
+    @abstractmethod
+    def delete_set(self, set_id: str) -> bool:
+        """Remove a set and its questions; returns whether it existed."""
+    
+    def location(self, set_id: str) -> str:
+        """Where a set's questions are kept, for its file_path."""
+        return ""
+    
+    def close(self):
+        """Release any resources held by the store."""
+
+
+class InMemoryQuestionStore(QuestionStore):
+    """Keeps question rows in lists, interned across sets; nothing survives a restart."""
+    
+    def __init__(self, interner: Optional[RowInterner] = None):
+        self.interner = RowInterner() if interner is None else interner
+        # Uploads add sets from worker threads while the catalog is listed on the event loop
+        self._lock = threading.Lock()
+        self._sets: Dict[str, Tuple[Dict[str, Any], List[QuestionRow]]] = {}
+    
+    def add_set(self, set_id: str, rows: Iterable[QuestionRow], describe: Callable[[int], Dict[str, Any]]):
+        shared_rows: List[QuestionRow] = []
+        try:
+            for batch in row_batches(rows):
+                shared_rows.extend(self.interner.intern(batch))
+            metadata = describe(len(shared_rows))
+        except BaseException:
+            self.interner.release(shared_rows)
+            raise
+        self.delete_set(set_id)
+        with self._lock:
+            self._sets[set_id] = (dict(metadata), shared_rows)
+    
+    def list_sets(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            stored = list(self._sets.values())
+        return [dict(metadata) for metadata, _ in stored]
+    
+    def get_rows(self, set_id: str, offset: int, limit: int) -> List[QuestionRow]:
+        stored = self._sets.get(set_id)
+        return stored[1][offset:offset + limit] if stored else []
+    
+    def delete_set(self, set_id: str) -> bool:
+        with self._lock:
+            stored = self._sets.pop(set_id, None)
+        if stored is None:
+            return False
+        self.interner.release(stored[1])
+        return True
+
+
+class SQLiteQuestionStore(QuestionStore):
+    """Stores question sets in SQLite (WAL mode), one row per question keyed by (set_id, position)."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        # Uploads are written from worker threads; one writer at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS question_sets ("
+            "set_id TEXT PRIMARY KEY, name TEXT NOT NULL, category TEXT NOT NULL, "
+            "question_count INTEGER NOT NULL, created_at TEXT NOT NULL, file_path TEXT NOT NULL, content_hash TEXT)"
+        )
+        # Catalogs written before uploads were hashed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(question_sets)")}
+        if "content_hash" not in columns:
+            self._conn.execute("ALTER TABLE question_sets ADD COLUMN content_hash TEXT")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "set_id TEXT NOT NULL, position INTEGER NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL, "
+            "category TEXT, difficulty TEXT, PRIMARY KEY (set_id, position)) WITHOUT ROWID"
+        )
+        # Games read from the event loop on their own connection, so WAL lets them run during an upload
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.stats = {"sets_written": 0, "row_reads": 0}
+    
+    def add_set(self, set_id: str, rows: Iterable[QuestionRow], describe: Callable[[int], Dict[str, Any]]):
+        # One transaction, so a set whose rows fail part way is rolled back whole
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM questions WHERE set_id = ?", (set_id,))
+            question_count = 0
+            for batch in row_batches(rows):
+                self._conn.executemany(
+                    "INSERT INTO questions (set_id, position, question, answer, category, difficulty) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    ((set_id, position, *row) for position, row in enumerate(batch, question_count))
+                )
+                question_count += len(batch)
+            metadata = describe(question_count)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO question_sets ({', '.join(SET_FIELDS)}) "
+                f"VALUES ({', '.join('?' for _ in SET_FIELDS)})",
+                tuple(str(metadata[name]) if name == "created_at" else metadata[name] for name in SET_FIELDS)
+            )
+        self.stats["sets_written"] += 1
+    
+    def list_sets(self) -> List[Dict[str, Any]]:
+        with self._read_lock:
+            rows = self._reader.execute(f"SELECT {', '.join(SET_FIELDS)} FROM question_sets").fetchall()
+        return [dict(zip(SET_FIELDS, row)) for row in rows]
+    
+    def get_rows(self, set_id: str, offset: int, limit: int) -> List[QuestionRow]:
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT question, answer, category, difficulty FROM questions "
+                "WHERE set_id = ? AND position >= ? ORDER BY position LIMIT ?",
+                (set_id, offset, limit)
+            ).fetchall()
+        self.stats["row_reads"] += len(rows)
+        return rows
+    
+    def delete_set(self, set_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            deleted = self._conn.execute("DELETE FROM question_sets WHERE set_id = ?", (set_id,)).rowcount
+            self._conn.execute("DELETE FROM questions WHERE set_id = ?", (set_id,))
+        return deleted > 0
+    
+    def location(self, set_id: str) -> str:
+        return f"{self.path}#{set_id}"
+    
+    def close(self):
+        self._reader.close()
+        self._conn.close()
+
+
+def create_question_store(url: Optional[str] = None) -> QuestionStore:
+    """Build a store from a URL such as "memory" or "sqlite:///data/questions.db"."""
+    url = url or os.getenv("QUESTION_STORE", "memory")
+    if url == "memory":
+        return InMemoryQuestionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteQuestionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported question store: {url}")
@@ -0,0 +1,84 @@
+"""
+Roster change notifications, coalesced into periodic ROSTER_DELTA broadcasts.
+"""
+import os
+from typing import Dict, Optional
+from ..models.session import GameSession
+from .scheduler import TimerWheel, timer_wheel
+
+
+# Seconds roster changes are collected before one ROSTER_DELTA goes out
+DEFAULT_ROSTER_INTERVAL = float(os.getenv("ROSTER_FLUSH_INTERVAL", "0.5"))
+
+ROSTER_TIMER = "roster"
+
+
+class _PendingDelta:
+    """Roster changes of one session waiting for the next flush."""
+    
+    __slots__ = ("since", "presence")
+    
+    def __init__(self):
+        self.since: Optional[int] = None  # Roster version the room was last told about
+        self.presence: Dict[str, bool] = {}  # player_id -> connected, latest change wins
+
+
+class RosterNotifier:
+    """Batches joins, departures and connection changes into one ROSTER_DELTA per flush."""
+    
+    def __init__(self, session_manager, websocket_manager, interval: Optional[float] = None,
+                 scheduler: Optional[TimerWheel] = None):
+        self.session_manager = session_manager
+        self.websocket_manager = websocket_manager
+        self.interval = DEFAULT_ROSTER_INTERVAL if interval is None else interval
+        self.scheduler = scheduler or timer_wheel
+        self.pending: Dict[str, _PendingDelta] = {}
+        self.stats = {"changes": 0, "deltas": 0}
+    
+    def _pending_for(self, session_id: str) -> _PendingDelta:
+        pending = self.pending.get(session_id)
+        if pending is None:
+            pending = self.pending[session_id] = _PendingDelta()
+            self.scheduler.schedule((session_id, ROSTER_TIMER), self.interval, self.flush, session_id)
+        self.stats["changes"] += 1
+        return pending
+    
+    def roster_changed(self, session: GameSession):
+        """Queue a join or departure that just bumped the session's roster version."""
+        pending = self._pending_for(session.session_id)
+        if pending.since is None:
+            pending.since = session.roster_version - 1
+    
+    def presence_changed(self, session_id: str, player_id: str, connected: bool):
+        """Record a player's socket connecting or disconnecting and queue it for the room."""
+        session = self.session_manager.get_session(session_id)
+        player = session.get_player(player_id) if session else None
+        if player and player.connected != connected:
+            player.connected = connected
+            self.session_manager.save_session(session)
+        self._pending_for(session_id).presence[player_id] = connected
+    
+    async def flush(self, session_id: str):
+        """Broadcast the session's queued roster changes as one ROSTER_DELTA."""
+        self.scheduler.cancel((session_id, ROSTER_TIMER))
+        pending = self.pending.pop(session_id, None)
+        session = self.session_manager.get_session(session_id) if pending else None
+        if not session:
+            return
+        
+        since = session.roster_version if pending.since is None else pending.since
+        added, removed = session.get_roster_changes(since)
+        self.stats["deltas"] += 1
+        
+        await self.websocket_manager.broadcast_to_session(session_id, {
+            "type": "ROSTER_DELTA",
+            "data": {
+                "from_version": since,
+                "version": session.roster_version,
+                "added": [player.roster_entry() for player in added],
+                "removed": removed,
+                "connected": [player_id for player_id, online in pending.presence.items() if online],
+                "disconnected": [player_id for player_id, online in pending.presence.items() if not online],
+                "total_players": len(session.players)
+            }
+        })
@@ -0,0 +1,238 @@
+"""
+Shared timer scheduler for phase deadlines across every game session.
+"""
+import asyncio
+import math
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+# Resolution of the wheel in seconds; timers fire at most one tick late
+DEFAULT_TICK = float(os.getenv("TIMER_WHEEL_TICK", "0.1"))
+
+
+class TimerHandle:
+    """A scheduled callback living in one bucket of the wheel."""
+    __slots__ = ("key", "deadline", "expires_tick", "callback", "args", "bucket")
+    
+    def __init__(self, key: Hashable, deadline: float, expires_tick: int,
+                 callback: Callable, args: Tuple[Any, ...]):
+        self.key = key
+        self.deadline = deadline          # Event loop time the timer is due
+        self.expires_tick = expires_tick  # Absolute wheel tick the timer is due
+        self.callback = callback
+        self.args = args
+        self.bucket: Optional[Dict[Hashable, "TimerHandle"]] = None
+    
+    def remaining(self, now: float) -> float:
+        """Seconds left until the deadline."""
+        return max(0.0, self.deadline - now)
+
+
+class TimerWheel:
+    """Hierarchical timing wheel that fires every timer due in the same tick as one batch."""
+    
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = 64, levels: int = 4):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._wheels: List[List[Dict[Hashable, TimerHandle]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self._timers: Dict[Hashable, TimerHandle] = {}
+        self._current_tick = 0
+        self._origin = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._callback_tasks = set()
+        self.recent_lateness: Deque[Tuple[Hashable, float]] = deque(maxlen=100)
+        self.stats = {
+            "scheduled": 0,
+            "cancelled": 0,
+            "fired": 0,
+            "fired_early": 0,
+            "batches": 0,
+            "max_lateness": 0.0,
+            "total_lateness": 0.0,
+        }
+    
+    def schedule(self, key: Hashable, delay: float, callback: Callable, *args) -> TimerHandle:
+        """Schedule callback(*args) after delay seconds, replacing any timer with the same key."""
+        self._ensure_running()
+        self.cancel(key)
+        
+        now = self._loop.time()
+        if not self._timers:
+            # Nothing pending, so skip straight to the present instead of replaying idle ticks
+            self._current_tick = max(self._current_tick, self._tick_at(now))
+        
+        deadline = now + max(0.0, delay)
+        expires_tick = max(self._current_tick + 1, math.ceil((deadline - self._origin) / self.tick))
+        handle = TimerHandle(key, deadline, expires_tick, callback, args)
+        self._place(handle)
+        self._timers[key] = handle
+        self.stats["scheduled"] += 1
+        self._wakeup.set()
+        return handle
+    
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel the timer registered under key."""
+        handle = self._timers.pop(key, None)
+        if not handle:
+            return False
+        self._detach(handle)
+        self.stats["cancelled"] += 1
+        return True
+    
+    def fire_now(self, key: Hashable) -> bool:
+        """Fire the timer registered under key immediately instead of at its deadline."""
+        handle = self._timers.pop(key, None)
+        if not handle:
+            return False
+        self._detach(handle)
+        self.stats["fired_early"] += 1
+        self._invoke(handle)
+        return True
+    
+    def get(self, key: Hashable) -> Optional[TimerHandle]:
+        """Get the pending timer registered under key."""
+        return self._timers.get(key)
+    
+    def time(self) -> float:
+        """Current time on the clock deadlines are measured against."""
+        return self._loop.time() if self._loop else asyncio.get_running_loop().time()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduling counters and firing lateness."""
+        fired = self.stats["fired"]
+        return {
+            "pending": len(self._timers),
+            **self.stats,
+            "mean_lateness": self.stats["total_lateness"] / fired if fired else 0.0,
+        }
+    
+    def _tick_at(self, now: float) -> int:
+        return int((now - self._origin) // self.tick)
+    
+    def _place(self, handle: TimerHandle):
+        """Put a timer into the lowest level whose span covers its delay."""
+        delta = handle.expires_tick - self._current_tick
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.slots or level == self.levels - 1:
+                bucket = self._wheels[level][(handle.expires_tick // span) % self.slots]
+                bucket[handle.key] = handle
+                handle.bucket = bucket
+                return
+            span *= self.slots
+    
+    @staticmethod
+    def _detach(handle: TimerHandle):
+        """Take a timer out of its bucket; expired timers waiting in the current batch have none."""
+        if handle.bucket is not None:
+            del handle.bucket[handle.key]
+            handle.bucket = None
+    
+    def _advance(self) -> List[TimerHandle]:
+        """Move the wheel forward one tick and return the timers that expired."""
+        self._current_tick += 1
+        tick = self._current_tick
+        
+        # Cascade higher levels first so their timers can land in lower buckets
+        for level in range(self.levels - 1, 0, -1):
+            span = self.slots ** level
+            if tick % span == 0:
+                bucket = self._wheels[level][(tick // span) % self.slots]
+                handles = list(bucket.values())
+                bucket.clear()
+                for handle in handles:
+                    self._place(handle)
+        
+        bucket = self._wheels[0][tick % self.slots]
+        expired = list(bucket.values())
+        bucket.clear()
+        for handle in expired:
+            handle.bucket = None
+        return expired
+    
+    def _ensure_running(self):
+        """Start the driver task on the current event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Timers from a previous (closed) loop can never fire, start fresh
+            for level in self._wheels:
+                for bucket in level:
+                    bucket.clear()
+            self._timers.clear()
+            self._loop = loop
+            self._origin = loop.time()
+            self._current_tick = 0
+            self._wakeup = asyncio.Event()
+            self._task = None
+        
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self):
+        """Sleep tick by tick while timers are pending and fire each due batch."""
+        loop = self._loop
+        while True:
+            if not self._timers:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            next_tick_at = self._origin + (self._current_tick + 1) * self.tick
+            delay = next_tick_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            due: List[TimerHandle] = []
+            target = self._tick_at(loop.time())
+            while self._current_tick < target and self._timers:
+                due.extend(self._advance())
+            if self._current_tick < target:
+                self._current_tick = target
+            
+            if due:
+                self._fire(due, loop.time())
+    
+    def _fire(self, handles: List[TimerHandle], now: float):
+        """Run a batch of expired timers and record how late each one was."""
+        self.stats["batches"] += 1
+        for handle in handles:
+            if self._timers.get(handle.key) is not handle:
+                # Cancelled, fired early or replaced by an earlier callback in this batch
+                continue
+            del self._timers[handle.key]
+            
+            lateness = max(0.0, now - handle.deadline)
+            self.stats["fired"] += 1
+            self.stats["total_lateness"] += lateness
+            self.stats["max_lateness"] = max(self.stats["max_lateness"], lateness)
+            self.recent_lateness.append((handle.key, lateness))
+            
+            self._invoke(handle)
+    
+    def _invoke(self, handle: TimerHandle):
+        try:
+            result = handle.callback(*handle.args)
+        except Exception as e:
+            print(f"Error in timer {handle.key}: {e!r}")
+            return
+        
+        if asyncio.iscoroutine(result):
+            task = self._loop.create_task(result)
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._on_callback_done)
+    
+    def _on_callback_done(self, task: asyncio.Task):
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Error in timer callback: {task.exception()!r}")
+
+
+# Global timer wheel shared by every auto-mode session
+timer_wheel = TimerWheel()
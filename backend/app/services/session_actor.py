@@ -0,0 +1,109 @@
+"""
+Per-session actors: every command for a session runs one at a time, in order.
+"""
+import asyncio
+import functools
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Seconds an actor with an empty mailbox waits before its task exits
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("SESSION_ACTOR_IDLE_TIMEOUT", "30"))
+
+
+class SessionActor:
+    """Owns one session's mailbox and the task that works through it."""
+    
+    def __init__(self, registry: "SessionActors", session_id: str):
+        self.registry = registry
+        self.session_id = session_id
+        self.mailbox: asyncio.Queue = asyncio.Queue()
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.create_task(self._run())
+    
+    def is_usable(self) -> bool:
+        """Whether the actor can still take commands on the running event loop."""
+        return not self.task.done() and self.loop is asyncio.get_running_loop()
+    
+    async def _run(self):
+        while True:
+            try:
+                async with asyncio.timeout(self.registry.idle_timeout):
+                    command, future = await self.mailbox.get()
+            except TimeoutError:
+                # Nothing can be queued between this check and leaving the registry
+                if self.mailbox.empty():
+                    self.registry._retire(self)
+                    return
+                continue
+            
+            if future.cancelled():
+                continue
+            try:
+                result = await command()
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+
+class SessionActors:
+    """Runs each session's commands one at a time, in order; different sessions run concurrently."""
+    
+    def __init__(self, idle_timeout: Optional[float] = None):
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.actors: Dict[str, SessionActor] = {}
+        self.stats = {"commands": 0, "inline": 0, "actors_started": 0, "max_mailbox": 0}
+    
+    async def call(self, session_id: str, command: Callable[..., Awaitable[Any]], /, *args, **kwargs) -> Any:
+        """Run command(*args, **kwargs) on the session's actor and return its result."""
+        actor = self.actors.get(session_id)
+        if actor is not None and actor.task is asyncio.current_task():
+            # Queuing behind ourselves would deadlock
+            self.stats["inline"] += 1
+            return await command(*args, **kwargs)
+        
+        if actor is None or not actor.is_usable():
+            actor = self.actors[session_id] = SessionActor(self, session_id)
+            self.stats["actors_started"] += 1
+        
+        future = asyncio.get_running_loop().create_future()
+        actor.mailbox.put_nowait((functools.partial(command, *args, **kwargs), future))
+        self.stats["commands"] += 1
+        self.stats["max_mailbox"] = max(self.stats["max_mailbox"], actor.mailbox.qsize())
+        return await future
+    
+    def serialized(self, handler: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """Wrap a coroutine function taking session_id so every call runs on that session's actor."""
+        @functools.wraps(handler)
+        async def run(*args, **kwargs):
+            session_id = kwargs["session_id"] if "session_id" in kwargs else args[0]
+            return await self.call(session_id, handler, *args, **kwargs)
+        return run
+    
+    def _retire(self, actor: SessionActor):
+        if self.actors.get(actor.session_id) is actor:
+            del self.actors[actor.session_id]
+    
+    async def shutdown(self):
+        """Stop every actor, e.g. on application shutdown."""
+        loop = asyncio.get_running_loop()
+        actors = [actor for actor in self.actors.values() if actor.loop is loop]
+        self.actors.clear()
+        for actor in actors:
+            actor.task.cancel()
+        await asyncio.gather(*(actor.task for actor in actors), return_exceptions=True)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get command counters and the number of live actors."""
+        return {
+            "actors": len(self.actors),
+            "queued": sum(actor.mailbox.qsize() for actor in self.actors.values()),
+            **self.stats,
+        }
+
+
+# Global session actors instance
+session_actors = SessionActors()
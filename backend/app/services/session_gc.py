@@ -0,0 +1,132 @@
+"""
+Background sweeper that evicts idle sessions and accounts for their memory.
+"""
+import asyncio
+import os
+import sys
+import time
+import types
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+# Seconds without activity before a session nobody is connected to is evicted
+DEFAULT_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))
+
+# Seconds without activity before a session is evicted even with sockets still open
+DEFAULT_CONNECTED_TTL = float(os.getenv("SESSION_CONNECTED_TTL", "14400"))
+
+# Seconds between sweeps
+DEFAULT_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+
+# Shared, immutable or code objects are not owned by any one session
+_UNOWNED = (type, Enum, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+
+def approximate_size(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Approximate deep size of an object graph in bytes, counting each object once."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, _UNOWNED):
+        return 0
+    seen.add(id(obj))
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approximate_size(key, seen) + approximate_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(approximate_size(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool)):
+        if hasattr(obj, "__dict__"):
+            size += approximate_size(vars(obj), seen)
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                    size += approximate_size(getattr(obj, name), seen)
+    return size
+
+
+class SessionSweeper:
+    """Periodically evicts idle sessions and purges stored copies no worker keeps alive."""
+    
+    def __init__(self, session_manager, websocket_manager, idle_ttl: Optional[float] = None,
+                 connected_ttl: Optional[float] = None, interval: Optional[float] = None):
+        self.session_manager = session_manager
+        self.websocket_manager = websocket_manager
+        self.idle_ttl = DEFAULT_IDLE_TTL if idle_ttl is None else idle_ttl
+        self.connected_ttl = DEFAULT_CONNECTED_TTL if connected_ttl is None else connected_ttl
+        self.interval = DEFAULT_SWEEP_INTERVAL if interval is None else interval
+        # session_id -> approximate bytes, as measured by the last sweep
+        self.session_sizes: Dict[str, int] = {}
+        # Called with the ID of each evicted session so other per-session state can go too
+        self.on_evict: Optional[Callable[[str], None]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "sweeps": 0,
+            "evicted": 0,
+            "purged": 0,
+            "reclaimed_bytes": 0,
+        }
+    
+    def start(self):
+        """Start sweeping in the background."""
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Error sweeping idle sessions: {e!r}")
+    
+    async def sweep(self, now: Optional[float] = None) -> List[str]:
+        """Evict every idle session and return their IDs."""
+        now = time.monotonic() if now is None else now
+        manager = self.session_manager
+        evicted = []
+        sizes = {}
+        
+        for session_id, session in list(manager.sessions.items()):
+            size = approximate_size(session)
+            idle = now - manager.last_activity.get(session_id, now)
+            connected = bool(self.websocket_manager.get_connected_players(session_id)
+                             or self.websocket_manager.get_audience_size(session_id))
+            if idle < (self.connected_ttl if connected else self.idle_ttl):
+                sizes[session_id] = size
+                continue
+            
+            if connected:
+                await self.websocket_manager.close_session(session_id)
+            if manager.evict_session(session_id):
+                if self.on_evict:
+                    self.on_evict(session_id)
+                evicted.append(session_id)
+                self.stats["evicted"] += 1
+                self.stats["reclaimed_bytes"] += size
+        
+        # Workers sharing the store only purge sessions none of them has kept alive
+        manager.store.keep_alive(list(manager.sessions))
+        purged = manager.store.purge_expired(self.idle_ttl, keep=manager.sessions.keys())
+        self.stats["purged"] += len(purged)
+        self.stats["sweeps"] += 1
+        self.session_sizes = sizes
+        return evicted
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get eviction counters and the memory held by live sessions."""
+        largest = sorted(self.session_sizes.items(), key=lambda item: item[1], reverse=True)[:5]
+        return {
+            "sessions": len(self.session_manager.sessions),
+            "tracked_bytes": sum(self.session_sizes.values()),
+            "largest_sessions": dict(largest),
+            **self.stats,
+        }
@@ -0,0 +1,228 @@
+"""
+Session storage backends so game sessions can outlive a worker process.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Collection, Dict, List, Optional
+from ..models.session import GameSession
+
+
+class SessionStore(ABC):
+    """Interface for persisting game sessions."""
+    
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[GameSession]:
+        """Load a session, or None if it is not stored."""
+    
+    @abstractmethod
+    def save(self, session: GameSession):
+        """Persist a session immediately."""
+    
+    @abstractmethod
+    def mark_dirty(self, session: GameSession):
+        """Persist a session at the next flush; repeated calls are coalesced."""
+    
+    def stored_version(self, session_id: str) -> Optional[int]:
+        """Version of the stored copy, if it can differ from this worker's live object."""
+        return None
+    
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Remove a session from the store."""
+    
+    @abstractmethod
+    def session_ids(self) -> List[str]:
+        """List the IDs of every stored session."""
+    
+    @abstractmethod
+    def evict(self, session_id: str):
+        """Drop a session from this worker's memory; durable stores keep their copy."""
+    
+    def keep_alive(self, session_ids: Collection[str]):
+        """Mark stored sessions as in use, so no worker purges them as expired."""
+    
+    def purge_expired(self, max_age: float, keep: Collection[str] = ()) -> List[str]:
+        """Delete stored sessions not written or kept alive for max_age seconds, except those in keep."""
+        return []
+    
+    def flush(self):
+        """Write out any pending changes."""
+    
+    def close(self):
+        """Flush and release any resources held by the store."""
+        self.flush()
+
+
+class InMemorySessionStore(SessionStore):
+    """Keeps live session objects in a dict; nothing survives a restart."""
+    
+    def __init__(self):
+        self._sessions: Dict[str, GameSession] = {}
+    
+    def load(self, session_id: str) -> Optional[GameSession]:
+        return self._sessions.get(session_id)
+    
+    def save(self, session: GameSession):
+        self._sessions[session.session_id] = session
+    
+    def mark_dirty(self, session: GameSession):
+        # The stored object is the live object, so there is nothing to write
+        self._sessions[session.session_id] = session
+    
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+    
+    def session_ids(self) -> List[str]:
+        return list(self._sessions.keys())
+    
+    def evict(self, session_id: str):
+        # Memory is the only copy, so evicting is deleting
+        self.delete(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Stores sessions as compressed JSON blobs in SQLite, writing each loop iteration's changes together."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 0)"
+        )
+        # Stores written before versions were tracked
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "version" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._dirty: Dict[str, GameSession] = {}
+        self._flush_scheduled = False
+        self.stats = {"writes": 0, "flushes": 0, "coalesced": 0}
+    
+    @staticmethod
+    def encode(session: GameSession) -> bytes:
+        """Serialize a session to its compact stored form."""
+        return zlib.compress(json.dumps(session.to_dict(), separators=(",", ":")).encode("utf-8"))
+    
+    @staticmethod
+    def decode(data: bytes) -> GameSession:
+        """Rebuild a session from its stored form."""
+        return GameSession.from_dict(json.loads(zlib.decompress(data)))
+    
+    def load(self, session_id: str) -> Optional[GameSession]:
+        if session_id in self._dirty:
+            return self._dirty[session_id]
+        row = self._conn.execute(
+            "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return self.decode(row[0]) if row else None
+    
+    def save(self, session: GameSession):
+        self._dirty.pop(session.session_id, None)
+        self._write([session])
+    
+    def mark_dirty(self, session: GameSession):
+        if session.session_id in self._dirty:
+            self.stats["coalesced"] += 1
+        self._dirty[session.session_id] = session
+        
+        if self._flush_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): write straight away
+            self.flush()
+            return
+        self._flush_scheduled = True
+        loop.call_soon(self.flush)
+    
+    def stored_version(self, session_id: str) -> Optional[int]:
+        session = self._dirty.get(session_id)
+        if session is not None:
+            return session.version
+        row = self._conn.execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def delete(self, session_id: str):
+        self._dirty.pop(session_id, None)
+        self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+    
+    def session_ids(self) -> List[str]:
+        stored = {row[0] for row in self._conn.execute("SELECT session_id FROM sessions")}
+        return list(stored | set(self._dirty))
+    
+    def evict(self, session_id: str):
+        session = self._dirty.pop(session_id, None)
+        if session is not None:
+            self._write([session])
+    
+    def keep_alive(self, session_ids: Collection[str]):
+        if not session_ids:
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE sessions SET updated_at = ? WHERE session_id = ?",
+                [(now, session_id) for session_id in session_ids]
+            )
+    
+    def purge_expired(self, max_age: float, keep: Collection[str] = ()) -> List[str]:
+        cutoff = time.time() - max_age
+        expired = [
+            row[0] for row in self._conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )
+            if row[0] not in keep and row[0] not in self._dirty
+        ]
+        if expired:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "DELETE FROM sessions WHERE session_id = ?", [(session_id,) for session_id in expired]
+                )
+        return expired
+    
+    def flush(self):
+        self._flush_scheduled = False
+        if not self._dirty:
+            return
+        sessions = list(self._dirty.values())
+        self._dirty.clear()
+        self._write(sessions)
+        self.stats["flushes"] += 1
+    
+    def close(self):
+        self.flush()
+        self._conn.close()
+    
+    def _write(self, sessions: List[GameSession]):
+        now = time.time()
+        rows = [(session.session_id, self.encode(session), now, session.version) for session in sessions]
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at, version) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        self.stats["writes"] += len(rows)
+
+
+def create_session_store(url: Optional[str] = None) -> SessionStore:
+    """Build a store from a URL such as "memory" or "sqlite:///data/sessions.db"."""
+    url = url or os.getenv("SESSION_STORE", "memory")
+    if url == "memory":
+        return InMemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported session store: {url}")
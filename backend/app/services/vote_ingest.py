@@ -0,0 +1,107 @@
+"""
+Micro-batched ingestion of player votes.
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+from ..models.session import GameSession
+from .scheduler import TimerWheel, timer_wheel
+from .session_actor import SessionActors, session_actors
+
+
+# Seconds a vote may wait in the buffer before its batch is applied
+DEFAULT_BATCH_INTERVAL = float(os.getenv("VOTE_BATCH_INTERVAL", "0.1"))
+
+# Votes buffered per session before the batch is applied without waiting
+DEFAULT_MAX_BATCH = int(os.getenv("VOTE_MAX_BATCH", "256"))
+
+VOTE_BATCH_TIMER = "votes"
+
+
+class VoteIngestor:
+    """Buffers votes per session and applies them in batches, one save and broadcast per batch."""
+    
+    def __init__(self, session_manager, websocket_manager,
+                 on_all_voted: Optional[Callable[[GameSession], Awaitable[None]]] = None,
+                 interval: Optional[float] = None, max_batch: Optional[int] = None,
+                 scheduler: Optional[TimerWheel] = None, actors: Optional[SessionActors] = None):
+        self.session_manager = session_manager
+        self.websocket_manager = websocket_manager
+        # Called once a batch completes the vote in a manually run session
+        self.on_all_voted = on_all_voted
+        self.interval = DEFAULT_BATCH_INTERVAL if interval is None else interval
+        self.max_batch = DEFAULT_MAX_BATCH if max_batch is None else max_batch
+        self.scheduler = scheduler or timer_wheel
+        # Batches are applied as commands on the session's actor
+        self.actors = actors or session_actors
+        # session_id -> batches of (player_id, answer_index) in arrival order; the last one is open
+        self.buffers: Dict[str, List[List[Tuple[str, int]]]] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self.stats = {"votes": 0, "batches": 0, "rejected": 0, "max_batch": 0}
+    
+    def submit(self, session: GameSession, player_id: str, vote: Union[int, str, None]):
+        """Validate a vote and queue it for the session's next batch; invalid votes raise ValueError here."""
+        answer_index = session.validate_vote(player_id, vote)
+        batches = self.buffers.setdefault(session.session_id, [[]])
+        batches[-1].append((player_id, answer_index))
+        self.stats["votes"] += 1
+        
+        key = (session.session_id, VOTE_BATCH_TIMER)
+        if len(batches[-1]) >= self.max_batch:
+            # A full batch does not wait for the rest of its window
+            batches.append([])
+            self.scheduler.cancel(key)
+            task = asyncio.create_task(self._flush_on_actor(session.session_id))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        elif self.scheduler.get(key) is None:
+            self.scheduler.schedule(key, self.interval, self._flush_on_actor, session.session_id)
+    
+    def pending(self, session_id: str) -> int:
+        """Number of votes waiting to be applied for a session."""
+        return sum(len(batch) for batch in self.buffers.get(session_id, ()))
+    
+    async def _flush_on_actor(self, session_id: str):
+        await self.actors.call(session_id, self.flush, session_id)
+    
+    async def flush(self, session_id: str):
+        """Apply a session's buffered votes, broadcasting one progress event per batch."""
+        self.scheduler.cancel((session_id, VOTE_BATCH_TIMER))
+        batches = self.buffers.pop(session_id, None)
+        session = self.session_manager.get_session(session_id) if batches else None
+        if not session:
+            return
+        
+        # Apply every batch before awaiting anything so a concurrent flush cannot reorder votes
+        progress = []
+        for batch in batches:
+            applied = 0
+            for player_id, answer_index in batch:
+                try:
+                    session.submit_vote(player_id, answer_index)
+                    applied += 1
+                except ValueError:
+                    # Voting closed between validation and this batch
+                    self.stats["rejected"] += 1
+            if applied:
+                self.stats["batches"] += 1
+                self.stats["max_batch"] = max(self.stats["max_batch"], applied)
+                progress.append({
+                    "votes_count": len(session.current_question.votes),
+                    "total_players": session.non_gm_player_count,
+                    "all_voted": session.all_voted(),
+                    "batch_size": applied
+                })
+        if not progress:
+            return
+        
+        self.session_manager.save_session(session)
+        for data in progress:
+            await self.websocket_manager.broadcast_to_session(session_id, {
+                "type": "VOTE_SUBMITTED",
+                "data": data
+            })
+        
+        # Auto mode advances through its own timer
+        if progress[-1]["all_voted"] and not session.is_automatic_mode and self.on_all_voted:
+            await self.on_all_voted(session)
@@ -1,21 +1,39 @@
 """
 Session manager for handling game sessions and player management.
 """
-from typing import Dict, Optional, Tuple
+import os
+import time
+from typing import Dict, List, Optional, Tuple
 from .models.session import GameSession, Player
 from .services.auto_gm import auto_gm
+from .services.session_store import SessionStore, create_session_store
+
+
+# Seconds between checks of the store for a newer copy of a cached session
+DEFAULT_RELOAD_CHECK_INTERVAL = float(os.getenv("SESSION_RELOAD_CHECK_INTERVAL", "1.0"))
 
 
 class SessionManager:
     """Manages game sessions and player interactions."""
     
-    def __init__(self):
+    def __init__(self, store: Optional[SessionStore] = None, reload_check_interval: Optional[float] = None):
+        # Live session objects owned by this worker
         self.sessions: Dict[str, GameSession] = {}
+        # session_id -> monotonic time of the last request or change
+        self.last_activity: Dict[str, float] = {}
+        # session_id -> monotonic time the store was last asked for a newer version
+        self.version_checked: Dict[str, float] = {}
+        self.reload_check_interval = (DEFAULT_RELOAD_CHECK_INTERVAL if reload_check_interval is None
+                                      else reload_check_interval)
+        self.store = store or create_session_store()
     
     def create_session(self, game_master_pseudonym: str) -> GameSession:
         """Create a new game session with a game master."""
         session = GameSession.create_new(game_master_pseudonym)
         self.sessions[session.session_id] = session
+        self.touch(session.session_id)
+        # Written immediately so the session is visible to other workers right away
+        self.store.save(session)
         
         # Register with auto GM for potential automatic mode
         auto_gm.register_session(session)
@@ -23,8 +41,54 @@ class SessionManager:
         return session
     
     def get_session(self, session_id: str) -> Optional[GameSession]:
-        """Get a session by ID."""
-        return self.sessions.get(session_id)
+        """Get a session by ID, loading it from the store if another worker has saved a newer version."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.store.load(session_id)
+            if session is not None:
+                # Auto-mode timers do not survive a restart, so hand control back to the GM
+                session.is_automatic_mode = False
+                # Sockets are tracked per worker; players are marked present again as they reconnect
+                for player in session.players.values():
+                    player.connected = False
+                self._adopt(session)
+        else:
+            now = time.monotonic()
+            if now - self.version_checked.get(session_id, float("-inf")) >= self.reload_check_interval:
+                # Throttled so polling a session does not query the store on every request
+                self.version_checked[session_id] = now
+                stored_version = self.store.stored_version(session_id)
+                if stored_version is not None and stored_version > session.version:
+                    session = self._reload(session)
+        if session is not None:
+            self.touch(session_id)
+        return session
+    
+    def _reload(self, stale: GameSession) -> GameSession:
+        session = self.store.load(stale.session_id)
+        if session is None:
+            return stale
+        # Timers and sockets belong to this worker, so keep its view of them
+        session.is_automatic_mode = stale.is_automatic_mode
+        for player_id, player in session.players.items():
+            previous = stale.players.get(player_id)
+            player.connected = previous.connected if previous else False
+        self._adopt(session)
+        return session
+    
+    def _adopt(self, session: GameSession):
+        self.sessions[session.session_id] = session
+        auto_gm.register_session(session)
+    
+    def touch(self, session_id: str):
+        """Record activity on a session so the idle sweeper keeps it."""
+        self.last_activity[session_id] = time.monotonic()
+    
+    def save_session(self, session: GameSession):
+        """Record that a session changed; the store coalesces the actual writes."""
+        session.bump_version()
+        self.touch(session.session_id)
+        self.store.mark_dirty(session)
     
     def join_session(self, session_id: str, pseudonym: str) -> Tuple[GameSession, Player]:
         """Add a player to an existing session."""
@@ -33,6 +97,27 @@ class SessionManager:
             raise ValueError(f"Session {session_id} not found")
         
         player = session.add_player(pseudonym)
+        self.save_session(session)
+        return session, player
+    
+    def add_players(self, session_id: str, pseudonyms: List[str]) -> Tuple[GameSession, List[Player]]:
+        """Pre-register several players in an existing session."""
+        session = self.get_session(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        
+        players = session.add_players(pseudonyms)
+        self.save_session(session)
+        return session, players
+    
+    def remove_player(self, session_id: str, player_id: str) -> Tuple[GameSession, Player]:
+        """Remove a player from an existing session."""
+        session = self.get_session(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        
+        player = session.remove_player(player_id)
+        self.save_session(session)
         return session, player
     
     def remove_session(self, session_id: str) -> bool:
@@ -41,6 +126,20 @@ class SessionManager:
             # Unregister from auto GM
             auto_gm.unregister_session(session_id)
             del self.sessions[session_id]
+            self.last_activity.pop(session_id, None)
+            self.version_checked.pop(session_id, None)
+            self.store.delete(session_id)
+            return True
+        return False
+    
+    def evict_session(self, session_id: str) -> bool:
+        """Unload a session from this worker, keeping any durable copy in the store."""
+        if session_id in self.sessions:
+            auto_gm.unregister_session(session_id)
+            del self.sessions[session_id]
+            self.last_activity.pop(session_id, None)
+            self.version_checked.pop(session_id, None)
+            self.store.evict(session_id)
             return True
         return False
     
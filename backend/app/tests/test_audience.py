@@ -0,0 +1,118 @@
+import asyncio
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.session import GameSession
+from app.services.audience import AudienceManager
+from app.services.scheduler import TimerWheel
+from app.services.session_store import InMemorySessionStore
+from app.session_manager import SessionManager
+from app.websocket import WebSocketManager
+from app.tests.test_websocket import FakeWebSocket
+
+
+def test_spectators_get_a_reduced_stream_outside_the_roster():
+    """Test that spectators see game flow but not per-player events"""
+    async def scenario():
+        manager = WebSocketManager()
+        player, spectator = FakeWebSocket(), FakeWebSocket()
+        manager._add_connection(player, "S1", "p1")
+        await manager.connect_spectator(spectator, "S1", "viewer")
+        
+        await manager.broadcast_to_session("S1", {"type": "PLAYER_JOINED"})
+        await manager.broadcast_to_session("S1", {"type": "QUESTION_SUBMITTED"})
+        await manager.drain("S1")
+        
+        assert manager.get_connected_players("S1") == {"p1"}
+        assert manager.get_audience_size("S1") == 1
+        await manager.disconnect(spectator, "S1", "viewer", spectator=True)
+        assert manager.get_audience_size("S1") == 0 and manager.get_connected_players("S1") == {"p1"}
+        await manager.shutdown()
+        return player, spectator
+    
+    player, spectator = asyncio.run(scenario())
+    
+    assert [json.loads(frame)["type"] for frame in player.sent] == ["PLAYER_JOINED", "QUESTION_SUBMITTED"]
+    assert [json.loads(frame)["type"] for frame in spectator.sent] == ["QUESTION_SUBMITTED"]
+
+def test_audience_votes_are_flushed_as_one_tally():
+    """Test that a burst of spectator votes produces a single save and broadcast"""
+    async def scenario():
+        sessions = SessionManager(InMemorySessionStore())
+        websockets = WebSocketManager()
+        audience = AudienceManager(sessions, websockets, flush_interval=0.05, scheduler=TimerWheel(tick=0.01))
+        spectator = FakeWebSocket()
+        
+        session = sessions.create_session("TestMaster")
+        player = session.add_player("Player1")
+        session.start_question_phase("Test question?", "Correct answer")
+        session.submit_fake_answer(player.player_id, "Fake answer")
+        session.start_voting_phase()
+        await websockets.connect_spectator(spectator, session.session_id, "viewer")
+        
+        correct = session.current_question.answer_index["Correct answer"]
+        for i in range(500):
+            assert audience.record_vote(session, f"viewer-{i}", correct if i % 5 else 1 - correct)
+        assert not audience.record_vote(session, "viewer-0", correct)
+        version = session.version
+        
+        await asyncio.sleep(0.15)
+        await websockets.drain(session.session_id)
+        await websockets.shutdown()
+        return session, spectator, audience, version
+    
+    session, spectator, audience, version = asyncio.run(scenario())
+    
+    assert session.version == version + 1
+    assert [json.loads(frame)["type"] for frame in spectator.sent] == ["AUDIENCE_TALLY"]
+    tally = json.loads(spectator.sent[0])["data"]
+    assert tally["total_votes"] == 500 and tally["spectators"] == 1
+    assert session.get_results()["audience_vote_counts"] == {"Correct answer": 400, "Fake answer": 100}
+    assert audience.stats == {"votes": 500, "duplicates": 1, "flushes": 1}
+    assert len(session.players) == 2  # Spectators never joined the roster
+
+def test_only_issued_spectators_vote_and_their_votes_reach_the_results():
+    """Test that unknown spectator IDs are refused and pending audience votes are counted before results"""
+    with TestClient(app) as client:
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        session_id, gm_id = created["session_id"], created["player_id"]
+        player_id = client.post(f"/sessions/{session_id}/join", json={"pseudonym": "TestPlayer"}).json()["player_id"]
+        client.post(f"/sessions/{session_id}/questions", params={"player_id": gm_id},
+                    json={"question": "Test question?", "answer": "Correct answer"})
+        client.post(f"/sessions/{session_id}/answers", params={"player_id": player_id},
+                    json={"fake_answer": "Fake answer"})
+        spectator_id = client.post(f"/sessions/{session_id}/spectators").json()["spectator_id"]
+        
+        refused = client.post(f"/sessions/{session_id}/audience-votes", params={"spectator_id": "made-up"},
+                              json={"answer_index": 0})
+        counted = client.post(f"/sessions/{session_id}/audience-votes", params={"spectator_id": spectator_id},
+                              json={"answer_index": 0})
+        client.post(f"/sessions/{session_id}/end-voting", params={"player_id": gm_id})
+        results = client.get(f"/sessions/{session_id}/state").json()["results"]
+    
+    assert refused.status_code == 403
+    assert counted.status_code == 200
+    assert sum(results["audience_vote_counts"].values()) == 1
+
+def test_pending_audience_votes_survive_a_session_reload():
+    """Test that votes waiting for a flush are kept when the session object is replaced from the store"""
+    async def scenario():
+        sessions = SessionManager(InMemorySessionStore())
+        audience = AudienceManager(sessions, WebSocketManager(), flush_interval=60, scheduler=TimerWheel(tick=0.01))
+        session = sessions.create_session("TestMaster")
+        player = session.add_player("Player1")
+        session.start_question_phase("Test question?", "Correct answer")
+        session.submit_fake_answer(player.player_id, "Fake answer")
+        session.start_voting_phase()
+        
+        correct = session.current_question.answer_index["Correct answer"]
+        assert audience.record_vote(session, "viewer", correct)
+        # What SessionManager._reload does when another worker saved a newer version
+        sessions.sessions[session.session_id] = reloaded = GameSession.from_dict(session.to_dict())
+        assert not audience.record_vote(reloaded, "viewer", correct)
+        await audience.flush(session.session_id)
+        return reloaded
+    
+    reloaded = asyncio.run(scenario())
+    
+    assert reloaded.get_results()["audience_vote_counts"] == {"Correct answer": 1}
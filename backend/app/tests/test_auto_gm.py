@@ -0,0 +1,106 @@
+import asyncio
+from app.models.session import GameSession
+from app.models.game_state import GameState
+from fastapi.testclient import TestClient
+from app.main import app
+from app.session_manager import session_manager
+from app.services.auto_gm import AutoGameMaster
+from app.services.scheduler import TimerWheel
+
+
+class RecordingWebSocketManager:
+    def __init__(self):
+        self.messages = []
+    
+    async def broadcast_to_session(self, session_id: str, message: dict, exclude_player: str = None):
+        self.messages.append(message)
+    
+    def types(self):
+        return [message["type"] for message in self.messages]
+
+
+def run_auto_session(timers, legacy_progress=False, run_for=0.1):
+    async def scenario():
+        auto_gm = AutoGameMaster(resync_interval=0, scheduler=TimerWheel(tick=0.01))
+        session = GameSession.create_new("TestMaster")
+        auto_gm.register_session(session)
+        manager = RecordingWebSocketManager()
+        
+        await auto_gm.start_automatic_session(session.session_id, "default", manager, timers, legacy_progress)
+        await asyncio.sleep(run_for)
+        auto_gm.unregister_session(session.session_id)
+        return session, manager
+    
+    return asyncio.run(scenario())
+
+def test_deadline_mode_sends_single_deadline_event():
+    """Test that a phase is announced once with an absolute deadline"""
+    session, manager = run_auto_session({"submission_timeout": 30})
+    
+    assert manager.types() == ["GAME_STATE_UPDATE", "PHASE_DEADLINE"]
+    deadline = manager.messages[1]["data"]
+    assert deadline["current_phase"] == "SUBMISSION_PHASE"
+    assert deadline["total_time"] == 30
+    assert deadline["deadline"] - deadline["server_time"] > 29
+    assert session.game_state == GameState.SUBMISSION_PHASE
+
+def test_legacy_mode_sends_progress_ticks():
+    """Test that legacy clients can still opt in to per-second progress"""
+    session, manager = run_auto_session({"submission_timeout": 30}, legacy_progress=True)
+    
+    assert manager.types() == ["GAME_STATE_UPDATE", "AUTO_MODE_PROGRESS"]
+    assert manager.messages[1]["data"]["time_remaining"] == 30
+
+def test_phase_advances_when_deadline_expires():
+    """Test that the submission phase moves to voting on expiry"""
+    session, manager = run_auto_session({"submission_timeout": 0, "voting_timeout": 30})
+    
+    assert session.game_state == GameState.VOTING_PHASE
+    assert manager.types()[-1] == "PHASE_DEADLINE"
+
+def test_phase_advances_early_when_everyone_has_acted():
+    """Test that the completion hook skips the rest of the phase timer"""
+    async def scenario():
+        auto_gm = AutoGameMaster(resync_interval=0, scheduler=TimerWheel(tick=0.01))
+        session = GameSession.create_new("TestMaster")
+        players = [session.add_player(f"Player{i}") for i in range(2)]
+        auto_gm.register_session(session)
+        manager = RecordingWebSocketManager()
+        timers = {"submission_timeout": 60, "voting_timeout": 60}
+        
+        await auto_gm.start_automatic_session(session.session_id, "default", manager, timers)
+        for player in players:
+            session.submit_fake_answer(player.player_id, f"Fake from {player.pseudonym}")
+        await asyncio.sleep(0.05)
+        state_after_submissions = session.game_state
+        
+        answers = session.get_all_answers_shuffled()
+        for player in players:
+            session.submit_vote(player.player_id, answers[0])
+        await asyncio.sleep(0.05)
+        state_after_votes = session.game_state
+        auto_gm.unregister_session(session.session_id)
+        return state_after_submissions, state_after_votes, auto_gm.scheduler
+    
+    after_submissions, after_votes, scheduler = asyncio.run(scenario())
+    
+    assert after_submissions == GameState.VOTING_PHASE
+    assert after_votes == GameState.RESULTS_PHASE
+    assert scheduler.stats["fired_early"] == 2
+
+def test_cancelling_the_timer_hands_the_round_back_to_the_game_master():
+    """Test that a session whose auto timer was cancelled still advances when everyone has submitted"""
+    with TestClient(app) as client:
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        session_id, gm_id = created["session_id"], created["player_id"]
+        player_id = client.post(f"/sessions/{session_id}/join", json={"pseudonym": "TestPlayer"}).json()["player_id"]
+        client.post(f"/sessions/{session_id}/auto-mode", params={"player_id": gm_id},
+                    json={"question_set_id": "default"})
+        
+        client.post(f"/sessions/{session_id}/cancel-auto-timer", params={"player_id": gm_id})
+        client.post(f"/sessions/{session_id}/answers", params={"player_id": player_id},
+                    json={"fake_answer": "A made-up answer"})
+        
+        session = session_manager.get_session(session_id)
+        assert not session.is_automatic_mode
+        assert session.game_state == GameState.VOTING_PHASE
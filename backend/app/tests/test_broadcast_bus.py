@@ -0,0 +1,92 @@
+import asyncio
+import json
+from app.services.broadcast_bus import BusEvent, UnixSocketBus
+from app.websocket import WebSocketManager
+from app.tests.test_websocket import FakeWebSocket
+
+
+def test_bus_event_round_trip():
+    """Test the wire encoding of a bus event"""
+    event = BusEvent("S1", "PING", '{"type": "PING"}', exclude_player="p1")
+    decoded = BusEvent.decode(event.encode()[4:])
+    
+    assert (decoded.session_id, decoded.message_type, decoded.frame) == ("S1", "PING", '{"type": "PING"}')
+    assert decoded.exclude_player == "p1"
+    assert decoded.target_player is None
+
+def test_broadcast_reaches_sockets_on_other_workers(tmp_path):
+    """Test that each worker delivers a published event to its own sockets"""
+    path = str(tmp_path / "bus.sock")
+    
+    async def scenario():
+        workers = [WebSocketManager(bus=UnixSocketBus(path)) for _ in range(3)]
+        for worker in workers:
+            await worker.start()
+        sockets = [FakeWebSocket() for _ in workers]
+        for i, (worker, websocket) in enumerate(zip(workers, sockets)):
+            worker._add_connection(websocket, "S1", f"p{i}")
+        
+        # Publish from a client worker and from the hub
+        await workers[2].broadcast_to_session("S1", {"type": "FROM_CLIENT"})
+        await workers[0].send_to_player("S1", "p1", {"type": "DIRECT"})
+        await asyncio.sleep(0.05)
+        hubs = [worker.bus.is_hub for worker in workers]
+        for worker in workers:
+            await worker.shutdown()
+        return sockets, hubs
+    
+    sockets, hubs = asyncio.run(scenario())
+    
+    assert hubs == [True, False, False]
+    received = [sorted(json.loads(frame)["type"] for frame in websocket.sent) for websocket in sockets]
+    assert received == [["FROM_CLIENT"], ["DIRECT", "FROM_CLIENT"], ["FROM_CLIENT"]]
+
+def test_client_takes_over_when_hub_stops(tmp_path):
+    """Test hub failover between workers"""
+    path = str(tmp_path / "bus.sock")
+    
+    async def scenario():
+        hub, client = UnixSocketBus(path, reconnect_delay=0.01), UnixSocketBus(path, reconnect_delay=0.01)
+        received = []
+        client.set_handler(lambda event: received.append(event.message_type))
+        await hub.start()
+        await client.start()
+        await hub.stop()
+        await asyncio.sleep(0.1)
+        
+        late = UnixSocketBus(path)
+        await late.start()
+        late.publish(BusEvent("S1", "AFTER_FAILOVER", "{}"))
+        await asyncio.sleep(0.05)
+        state = (client.is_hub, late.is_hub)
+        await late.stop()
+        await client.stop()
+        return state, received
+    
+    (client_is_hub, late_is_hub), received = asyncio.run(scenario())
+    
+    assert client_is_hub and not late_is_hub
+    assert received == ["AFTER_FAILOVER"]
+
+def test_hub_disconnects_a_worker_that_stops_reading(tmp_path):
+    """Test that a stalled worker is dropped instead of buffering the hub's broadcasts without limit"""
+    path = str(tmp_path / "bus.sock")
+    
+    async def scenario():
+        hub = UnixSocketBus(path, max_buffer=64 * 1024)
+        await hub.start()
+        # A worker that connects and then never reads
+        _, stalled = await asyncio.open_unix_connection(path)
+        await asyncio.sleep(0.05)
+        peers_before = len(hub._peers)
+        
+        frame = json.dumps({"type": "FILLER", "data": "x" * 1024})
+        for _ in range(4000):
+            hub.publish(BusEvent("S1", "FILLER", frame))
+            await asyncio.sleep(0)
+        state = (peers_before, len(hub._peers), hub.stats["stalled_peers"])
+        stalled.close()
+        await hub.stop()
+        return state
+    
+    assert asyncio.run(scenario()) == (1, 0, 1)
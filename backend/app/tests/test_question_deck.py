@@ -0,0 +1,50 @@
+from app.models.questions import QuestionManager
+from app.models.session import GameSession, QuestionDeck
+
+
+def deal(deck: QuestionDeck, count: int):
+    return [deck.draw() for _ in range(count)]
+
+def test_deck_deals_every_question_once_per_cycle():
+    """Test that a cycle is a permutation of the set and the next cycle is reshuffled"""
+    deck = QuestionDeck(seed=7)
+    deck.reset("set", 50)
+    
+    first, second = deal(deck, 50), deal(deck, 50)
+    
+    assert sorted(first) == sorted(second) == list(range(50))
+    assert first != second
+    assert deck.cycle == 1 and not deck.displaced.keys() - range(deck.cursor, 50)
+
+def test_seeded_deck_replays_after_a_round_trip():
+    """Test that the same seed deals the same questions, even across a save and reload"""
+    manager = QuestionManager()
+    csv_content = "question,answer\n" + "".join(f"Question number {i}?,{i}\n" for i in range(20))
+    quiz = manager.parse_csv(csv_content, "quiz.csv").set_id
+    original = GameSession.create_new("Host")
+    original.enable_automatic_mode(quiz, seed=42)
+    dealt = [manager.get_random_question(quiz, original.question_deck(quiz))[1] for _ in range(8)]
+    
+    replay = GameSession.create_new("Host")
+    replay.enable_automatic_mode(quiz, seed=42)
+    replayed = [manager.get_random_question(quiz, replay.question_deck(quiz))[1] for _ in range(3)]
+    replay = GameSession.from_dict(replay.to_dict())
+    replayed += [manager.get_random_question(quiz, replay.question_deck(quiz))[1] for _ in range(5)]
+    
+    assert replayed == dealt
+    assert len(set(dealt)) == 8
+
+def test_each_question_set_keeps_its_own_place():
+    """Test that dealing from another set (e.g. a dice roll) does not restart the session's deck"""
+    manager = QuestionManager()
+    quiz = manager.parse_csv("question,answer\n" + "".join(f"Quiz question {i}?,{i}\n" for i in range(20)), "quiz.csv")
+    trivia = manager.parse_csv("question,answer\n" + "".join(f"Trivia question {i}?,{i}\n" for i in range(20)), "trivia.csv")
+    session = GameSession.create_new("Host")
+    
+    dealt = []
+    for _ in range(5):
+        dealt.append(manager.get_random_question(quiz.set_id, session.question_deck(quiz.set_id))[1])
+        manager.get_random_question(trivia.set_id, session.question_deck(trivia.set_id))
+    
+    assert len(set(dealt)) == 5
+    assert session.question_decks[quiz.set_id].seed == session.question_decks[trivia.set_id].seed
@@ -0,0 +1,173 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.questions import QuestionManager, QuestionSetError, question_manager
+from app.services.question_pack import compile_pack, load_pack
+from app.services.question_store import ROW_BATCH_SIZE, SQLiteQuestionStore, row_batches
+
+
+def test_large_upload_is_streamed_into_a_question_set():
+    """Test that an upload over the old 1000-question cap is parsed, BOM and quoted newlines included"""
+    rows = "".join(f'"Question number {i}, with a comma?",Answer {i},Science\r\n' for i in range(5000))
+    content = ("\ufeffquestion,answer,category\r\n" + '"A question that spans\ntwo lines?",Yes,History\r\n' + rows)
+    
+    with TestClient(app) as client:
+        response = client.post("/question-sets/upload",
+                               files={"file": ("big.csv", io.BytesIO(content.encode("utf-8")), "text/csv")})
+    
+    assert response.status_code == 200
+    uploaded = response.json()["question_set"]
+    assert uploaded["question_count"] == 5001 and uploaded["category"] == "Science"
+    first = question_manager.get_questions(uploaded["set_id"], 0, 1)[0]
+    last = question_manager.get_questions(uploaded["set_id"], 5000, 1)[0]
+    assert question_manager.delete_question_set(uploaded["set_id"])
+    assert first.question == "A question that spans\ntwo lines?"
+    assert last.answer == "Answer 4999"
+
+def test_upload_reports_every_bad_row():
+    """Test that invalid rows are collected into one error instead of stopping at the first"""
+    content = ("question,answer\n"
+               "Short?,Yes\n"
+               "A perfectly valid question?,Yes\n"
+               "Another valid question here?,\n"
+               "Tiny,\n")
+    
+    with TestClient(app) as client:
+        sets_before = len(question_manager.question_sets)
+        response = client.post("/question-sets/upload",
+                               files={"file": ("bad.csv", io.BytesIO(content.encode("utf-8")), "text/csv")})
+    
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail.startswith("Failed to parse CSV: 3 invalid rows: Row 2: Question must be at least 10")
+    assert "Row 4: Answer cannot be empty" in detail
+    assert "Row 5: Question must be at least 10 characters long; Answer cannot be empty" in detail
+    assert len(question_manager.question_sets) == sets_before
+
+def test_uploaded_sets_survive_a_restart(tmp_path):
+    """Test that a SQLite-backed catalog reloads only metadata and pages questions back in"""
+    store = SQLiteQuestionStore(str(tmp_path / "questions.db"))
+    uploaded = QuestionManager(store).parse_csv(
+        "question,answer,category\n" + "".join(f"Stored question {i}?,Answer {i},Art\n" for i in range(300)),
+        "stored.csv"
+    )
+    store.close()
+    
+    reopened = SQLiteQuestionStore(str(tmp_path / "questions.db"))
+    manager = QuestionManager(reopened)
+    question_set = manager.get_question_set(uploaded.set_id)
+    
+    assert (question_set.name, question_set.category, question_set.question_count) == ("stored", "Art", 300)
+    assert reopened.stats["row_reads"] == 0
+    assert [q.answer for q in manager.get_questions(uploaded.set_id, 150, 2)] == ["Answer 150", "Answer 151"]
+    assert manager.delete_question_set(uploaded.set_id)
+    assert QuestionManager(reopened).get_question_set(uploaded.set_id) is None
+
+def test_reads_do_not_wait_for_an_upload_being_written(tmp_path):
+    """Test that catalog and question reads proceed while another thread holds an open write transaction"""
+    store = SQLiteQuestionStore(str(tmp_path / "questions.db"))
+    manager = QuestionManager(store)
+    uploaded = manager.parse_csv("question,answer\nA question already stored?,Stored\n", "stored.csv")
+    seen = []
+    
+    with store._lock:
+        store._conn.execute("BEGIN")
+        store._conn.execute("DELETE FROM questions WHERE set_id = ?", (uploaded.set_id,))
+        reader = threading.Thread(target=lambda: seen.append(
+            ([metadata["set_id"] for metadata in store.list_sets()], manager.get_questions(uploaded.set_id)[0].answer)
+        ))
+        reader.start()
+        reader.join(timeout=1)
+        store._conn.execute("ROLLBACK")
+    
+    assert seen == [([uploaded.set_id], "Stored")]
+
+def test_upload_is_streamed_into_the_store_and_rolled_back_on_a_bad_row(tmp_path):
+    """Test that rows reach SQLite in batches and a bad row at the end leaves nothing stored"""
+    store = SQLiteQuestionStore(str(tmp_path / "questions.db"))
+    manager = QuestionManager(store)
+    good = "".join(f"Streamed question number {i}?,Answer {i}\n" for i in range(2500))
+    
+    with pytest.raises(QuestionSetError):
+        manager.parse_csv("question,answer\n" + good + "Short?,\n", "bad.csv")
+    batches = list(row_batches((f"row {i}",) for i in range(2500)))
+    
+    assert store._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 0
+    assert store.list_sets() == []
+    assert [len(batch) for batch in batches] == [ROW_BATCH_SIZE, ROW_BATCH_SIZE, 500]
+
+def test_compiled_pack_is_used_until_its_csv_changes(tmp_path):
+    """Test that a compiled pack round-trips the validated rows and goes stale with its CSV"""
+    csv_path = tmp_path / "pack.csv"
+    csv_path.write_text("question,answer,category\nWhat is the boiling point?,100 C,Science\n", encoding="utf-8")
+    
+    compile_pack(str(csv_path))
+    
+    assert load_pack(str(csv_path)) == ([("What is the boiling point?", "100 C", "Science", None)], "Science")
+    csv_path.write_text("question,answer\nWhat is the freezing point?,0 C\n", encoding="utf-8")
+    assert load_pack(str(csv_path)) is None
+
+def test_identical_uploads_and_questions_are_deduplicated():
+    """Test that re-uploading a file returns the stored set and that sets share identical questions"""
+    manager = QuestionManager()
+    # Loads the default pack, so its questions are part of the baseline
+    manager.list_question_sets()
+    baseline = manager.get_stats()
+    shared = "What is the capital of France?,Paris,Geography\n"
+    rome = "Which river flows through Rome?,Tiber,Geography\n"
+    first = manager.parse_csv("question,answer,category\n" + shared + rome, "a.csv")
+    again = manager.parse_csv("question,answer,category\n" + shared + rome, "b.csv")
+    other = manager.parse_csv("question,answer,category\n" + shared, "c.csv")
+    
+    assert again is first and other.set_id != first.set_id
+    assert manager.stats == {"upload_hits": 1, "upload_misses": 2}
+    assert manager.store.get_rows(first.set_id, 0, 1)[0] is manager.store.get_rows(other.set_id, 0, 1)[0]
+    stats = manager.get_stats()
+    assert stats["interned_questions"] - baseline["interned_questions"] == 2
+    assert stats["intern_hits"] - baseline["intern_hits"] == 1
+    
+    manager.delete_question_set(first.set_id)
+    assert manager.get_stats()["interned_questions"] - baseline["interned_questions"] == 1
+    assert manager.parse_csv("question,answer,category\n" + shared, "c.csv") is other
+
+def test_uploads_on_worker_threads_do_not_disturb_catalog_reads():
+    """Test that sets added from threads while the catalog is listed are all kept"""
+    manager = QuestionManager()
+    contents = [f"question,answer\nUploaded question number {i}?,Answer {i}\n" for i in range(40)]
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(manager.parse_csv, content, f"set{i}.csv") for i, content in enumerate(contents)]
+        while not all(future.done() for future in futures):
+            manager.list_question_sets()
+        uploaded = [future.result().set_id for future in futures]
+    
+    assert {question_set.set_id for question_set in manager.list_question_sets()} >= set(uploaded)
+    assert len(uploaded) == len(set(uploaded)) == 40
+
+def test_dice_draws_from_the_default_set_after_an_upload():
+    """Test that an uploaded set never takes over the dice from the default pack"""
+    content = "question,answer\nA question only this upload has?,Uploaded\n"
+    
+    with TestClient(app) as client:
+        uploaded = client.post("/question-sets/upload",
+                               files={"file": ("dice.csv", io.BytesIO(content.encode("utf-8")), "text/csv")})
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        rolled = client.post(f"/sessions/{created['session_id']}/dice-question",
+                             params={"player_id": created["player_id"]}).json()
+        question_manager.delete_question_set(uploaded.json()["question_set"]["set_id"])
+    
+    assert rolled["answer"] != "Uploaded"
+
+def test_concurrent_identical_uploads_store_one_set():
+    """Test that the same file uploaded from several threads at once is parsed and stored once"""
+    manager = QuestionManager()
+    content = "question,answer\n" + "".join(f"Concurrent question number {i}?,Answer {i}\n" for i in range(2000))
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: manager.parse_csv(content, f"copy{i}.csv"), range(8)))
+    
+    assert len({question_set.set_id for question_set in results}) == 1
+    assert manager.stats == {"upload_hits": 7, "upload_misses": 1}
@@ -0,0 +1,45 @@
+import asyncio
+from app.services.roster import RosterNotifier
+from app.services.scheduler import TimerWheel
+from app.services.session_store import InMemorySessionStore
+from app.session_manager import SessionManager
+from app.tests.test_auto_gm import RecordingWebSocketManager
+
+
+def test_join_storm_becomes_one_roster_delta():
+    """Test that many joins and connects in one window produce a single ROSTER_DELTA"""
+    async def scenario():
+        sessions = SessionManager(InMemorySessionStore())
+        manager = RecordingWebSocketManager()
+        roster = RosterNotifier(sessions, manager, interval=0.05, scheduler=TimerWheel(tick=0.01))
+        session = sessions.create_session("TestMaster")
+        
+        joined = []
+        for i in range(200):
+            session, player = sessions.join_session(session.session_id, f"Player{i}")
+            roster.roster_changed(session)
+            roster.presence_changed(session.session_id, player.player_id, True)
+            joined.append(player.player_id)
+        roster.presence_changed(session.session_id, joined[0], False)
+        await asyncio.sleep(0.2)
+        return manager, joined, session
+    
+    manager, joined, session = asyncio.run(scenario())
+    
+    assert manager.types() == ["ROSTER_DELTA"]
+    delta = manager.messages[0]["data"]
+    assert (delta["from_version"], delta["version"], delta["total_players"]) == (0, 200, 201)
+    assert [p["player_id"] for p in delta["added"]] == joined
+    assert delta["connected"] == joined[1:] and delta["disconnected"] == joined[:1]
+    assert not session.players[joined[0]].connected and session.players[joined[1]].connected
+
+def test_roster_changes_since_a_version():
+    """Test that roster deltas only list players who joined after the given version"""
+    sessions = SessionManager(InMemorySessionStore())
+    session = sessions.create_session("TestMaster")
+    players = [session.add_player(f"Player{i}") for i in range(5)]
+    
+    added, removed = session.get_roster_changes(3)
+    assert added == players[3:] and removed == []
+    assert session.get_roster_changes(session.roster_version) == ([], [])
+    assert [p.pseudonym for p in session.get_roster_page(4, 10)] == ["Player3", "Player4"]
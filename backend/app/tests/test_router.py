@@ -0,0 +1,76 @@
+import asyncio
+import httpx
+from app.router import AffinityRouter
+from app.services.hash_ring import HashRing
+
+
+def test_hash_ring_moves_only_the_removed_workers_keys():
+    """Test that removing a worker only reassigns the sessions it owned"""
+    ring = HashRing(["w1", "w2", "w3", "w4"])
+    keys = [f"SESSION{i}" for i in range(2000)]
+    before = {key: ring.get_node(key) for key in keys}
+    
+    # Every worker gets a reasonable share
+    shares = {node: list(before.values()).count(node) for node in ring.nodes}
+    assert all(300 < share < 700 for share in shares.values())
+    
+    ring.remove_node("w2")
+    after = {key: ring.get_node(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(before[key] == "w2" for key in moved)
+    
+    ring.add_node("w2")
+    assert {key: ring.get_node(key) for key in keys} == before
+
+def test_router_pins_session_paths_to_one_worker():
+    """Test that HTTP and WebSocket paths of a session go to the same worker"""
+    router = AffinityRouter(["http://w1", "http://w2", "http://w3"])
+    
+    owner = router.pick_worker("/sessions/ABC123/state")
+    assert router.pick_worker("/sessions/ABC123/votes") == owner
+    assert router.pick_worker("/ws/ABC123/player-1") == owner
+    
+    # Other paths are spread over the workers
+    assert {router.pick_worker("/question-sets") for _ in range(3)} == set(router.workers)
+    
+    router.remove_worker(owner)
+    assert router.pick_worker("/sessions/ABC123/state") != owner
+    router.add_worker(owner)
+    assert router.pick_worker("/sessions/ABC123/state") == owner
+
+def test_router_streams_request_bodies_to_the_worker():
+    """Test that a multi-part request body is forwarded as it arrives instead of being collected first"""
+    events = []
+    chunks = [b"question,answer\n", b"A streamed question here?,Yes\n", b"Another streamed one here?,No\n"]
+    
+    class Worker(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            events.append("worker called")
+            received = b"".join([chunk async for chunk in request.stream])
+            return httpx.Response(200, stream=httpx.ByteStream(received))
+    
+    async def scenario():
+        router = AffinityRouter(["http://w1"], health_interval=0)
+        router._client = httpx.AsyncClient(transport=Worker())
+        pending = list(chunks)
+        sent = []
+        
+        async def receive():
+            events.append("body read")
+            body = pending.pop(0)
+            return {"type": "http.request", "body": body, "more_body": bool(pending)}
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {"type": "http", "method": "POST", "path": "/question-sets/upload", "query_string": b"",
+                 "headers": [(b"content-length", str(sum(map(len, chunks))).encode())]}
+        await router._proxy_http(scope, receive, send)
+        await router.stop()
+        return sent
+    
+    sent = asyncio.run(scenario())
+    
+    assert sent[0]["status"] == 200
+    assert b"".join(message.get("body", b"") for message in sent[1:]) == b"".join(chunks)
+    assert events.index("worker called") < len(events) - 1
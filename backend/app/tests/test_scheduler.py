@@ -0,0 +1,81 @@
+import asyncio
+from app.services.scheduler import TimerWheel
+
+
+def test_timers_fire_in_deadline_order():
+    """Test that timers across levels fire in order and near their deadline"""
+    async def scenario():
+        wheel = TimerWheel(tick=0.005, slots=4, levels=3)
+        fired = []
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for key, delay in [("late", 0.3), ("early", 0.02), ("middle", 0.1)]:
+            wheel.schedule(key, delay, lambda k: fired.append((k, loop.time() - start)), key)
+        await asyncio.sleep(0.4)
+        return wheel, fired
+    
+    wheel, fired = asyncio.run(scenario())
+    
+    assert [key for key, _ in fired] == ["early", "middle", "late"]
+    assert fired[2][1] >= 0.3
+    assert wheel.stats["fired"] == 3
+    assert wheel.get_stats()["pending"] == 0
+
+def test_cancel_and_replace_by_key():
+    """Test that cancelling or rescheduling a key drops the old timer"""
+    async def scenario():
+        wheel = TimerWheel(tick=0.005)
+        fired = []
+        wheel.schedule("a", 0.02, fired.append, "a")
+        wheel.schedule("b", 0.02, fired.append, "b-old")
+        wheel.schedule("b", 0.04, fired.append, "b-new")
+        assert wheel.cancel("a")
+        assert not wheel.cancel("missing")
+        await asyncio.sleep(0.1)
+        return fired
+    
+    assert asyncio.run(scenario()) == ["b-new"]
+
+def test_same_tick_timers_fire_as_one_batch():
+    """Test batching of wake-ups and lateness reporting"""
+    async def scenario():
+        wheel = TimerWheel(tick=0.05)
+        fired = []
+        
+        async def callback(key):
+            fired.append(key)
+        
+        for i in range(100):
+            wheel.schedule(i, 0.01, callback, i)
+        await asyncio.sleep(0.15)
+        return wheel, fired
+    
+    wheel, fired = asyncio.run(scenario())
+    
+    assert sorted(fired) == list(range(100))
+    assert wheel.stats["batches"] == 1
+    assert len(wheel.recent_lateness) == 100
+    assert 0 <= wheel.stats["max_lateness"] < 0.1
+
+def test_callbacks_can_cancel_timers_due_in_the_same_batch():
+    """Test that a callback may cancel or fire another timer that expired on the same tick"""
+    async def scenario():
+        wheel = TimerWheel(tick=0.05)
+        fired = []
+        
+        def first():
+            fired.append("first")
+            assert wheel.cancel("cancelled")
+            assert wheel.fire_now("fired-early")
+        
+        wheel.schedule("first", 0.01, first)
+        wheel.schedule("cancelled", 0.01, fired.append, "cancelled")
+        wheel.schedule("fired-early", 0.01, fired.append, "fired-early")
+        await asyncio.sleep(0.15)
+        return wheel, fired
+    
+    wheel, fired = asyncio.run(scenario())
+    
+    assert fired == ["first", "fired-early"]
+    assert wheel.stats["fired"] == 1 and wheel.stats["cancelled"] == 1 and wheel.stats["fired_early"] == 1
+    assert wheel.get_stats()["pending"] == 0
@@ -82,4 +82,78 @@ def test_voting_and_scoring():
     
     assert scores[player1.player_id] == 3  # Got 3 votes
     assert scores[player2.player_id] == 0  # Got 0 votes
-    assert session.scores[player1.player_id] == 3
\ No newline at end of file
+    assert session.scores[player1.player_id] == 3
+
+def test_answer_order_is_fixed_for_the_round():
+    """Test that the voting order is shuffled once and votes go by index"""
+    session = GameSession.create_new("TestMaster")
+    player1 = session.add_player("Player1")
+    player2 = session.add_player("Player2")
+    
+    session.start_question_phase("Test question?", "Correct answer")
+    session.submit_fake_answer(player1.player_id, "Fake answer")
+    session.submit_fake_answer(player2.player_id, "Fake answer")
+    session.start_voting_phase()
+    
+    answers = session.get_all_answers_shuffled()
+    assert sorted(answers) == ["Correct answer", "Fake answer"]  # Duplicates collapse
+    assert all(session.get_all_answers_shuffled() == answers for _ in range(10))
+    
+    session.submit_vote(player1.player_id, answers.index("Correct answer"))
+    session.submit_vote(player2.player_id, answers.index("Fake answer"))
+    with pytest.raises(ValueError, match="Invalid answer"):
+        session.submit_vote(player2.player_id, len(answers))
+    
+    scores = session.calculate_scores()
+    assert scores == {player1.player_id: 2, player2.player_id: 1}
+    assert session.get_results()["vote_counts"] == {"Correct answer": 1, "Fake answer": 1}
+
+def test_tallies_follow_submissions_and_changed_votes():
+    """Test that completion checks and vote counts come from running tallies"""
+    session = GameSession.create_new("TestMaster")
+    players = [session.add_player(f"Player{i}") for i in range(3)]
+    assert session.non_gm_player_count == 3
+    
+    session.start_question_phase("Test question?", "Correct answer")
+    with pytest.raises(ValueError, match="Player not in session"):
+        session.submit_fake_answer("unknown-player", "Fake answer")
+    for player in players:
+        assert not session.all_submitted()
+        session.submit_fake_answer(player.player_id, f"Fake from {player.pseudonym}")
+    assert session.all_submitted()
+    
+    session.start_voting_phase()
+    correct = session.current_question.answer_index["Correct answer"]
+    session.submit_vote(session.game_master_id, correct)
+    session.submit_vote(players[0].player_id, correct)
+    session.submit_vote(players[1].player_id, correct)
+    assert session.get_non_gm_vote_count() == 2 and not session.all_voted()
+    
+    # Changing a vote moves it between tallies
+    session.submit_vote(players[1].player_id, "Fake from Player0")
+    session.submit_vote(players[2].player_id, correct)
+    assert session.all_voted()
+    assert session.get_results()["vote_counts"] == {"Correct answer": 3, "Fake from Player0": 1}
+    assert session.calculate_scores()[players[0].player_id] == 2
+
+def test_pseudonyms_are_unique_after_case_and_unicode_folding():
+    """Test that the pseudonym index folds case and Unicode forms and follows removals"""
+    session = GameSession.create_new("TestMaster")
+    player = session.add_player("Straße")
+    
+    assert session.is_pseudonym_taken("STRASSE")
+    with pytest.raises(ValueError, match="already taken"):
+        session.add_player("ｓｔｒａｓｓｅ")  # Full-width letters
+    
+    with pytest.raises(ValueError, match="testmaster, bob"):
+        session.add_players(["Alice", "testmaster", "Bob", "bob"])
+    assert len(session.players) == 2  # Nothing from the rejected batch was added
+    
+    added = session.add_players(["Alice", "Bob"])
+    assert {p.joined_version for p in added} == {session.roster_version}
+    
+    session.remove_player(player.player_id)
+    assert not session.is_pseudonym_taken("strasse")
+    assert session.non_gm_player_count == 2
+    assert session.get_roster_changes(session.roster_version - 1) == ([], [player.player_id])
+    session.add_player("STRASSE")
@@ -0,0 +1,56 @@
+import asyncio
+from app.models.game_state import GameState
+from app.models.session import GameSession
+from app.services.session_actor import SessionActors
+
+
+def test_commands_for_a_session_run_one_at_a_time():
+    """Test that a check-then-act command cannot interleave with another on the same session"""
+    session = GameSession.create_new("TestMaster")
+    player = session.add_player("TestPlayer")
+    session.start_question_phase("Test question?", "Correct answer")
+    session.submit_fake_answer(player.player_id, "Fake answer")
+    session.start_voting_phase()
+    session.submit_vote(player.player_id, "Correct answer")
+    
+    async def end_voting():
+        if session.game_state != GameState.VOTING_PHASE:
+            return False
+        await asyncio.sleep(0.01)  # e.g. flushing buffered votes
+        session.game_state = GameState.RESULTS_PHASE
+        session.calculate_scores()
+        return True
+    
+    async def scenario():
+        actors = SessionActors(idle_timeout=0.05)
+        ended = await asyncio.gather(*(actors.call(session.session_id, end_voting) for _ in range(3)))
+        nested = await actors.call(session.session_id, actors.call, session.session_id, asyncio.sleep, 0, "inline")
+        await asyncio.sleep(0.1)
+        return ended, nested, actors
+    
+    ended, nested, actors = asyncio.run(scenario())
+    
+    assert ended == [True, False, False]
+    assert session.scores[player.player_id] == 1  # Scored once
+    assert nested == "inline" and actors.stats["inline"] == 1
+    assert actors.actors == {}  # The idle actor retired
+
+def test_sessions_do_not_wait_for_each_other():
+    """Test that a slow command only delays its own session"""
+    async def scenario():
+        actors = SessionActors()
+        order = []
+        
+        async def record(name, delay):
+            await asyncio.sleep(delay)
+            order.append(name)
+        
+        await asyncio.gather(
+            actors.call("S1", record, "slow", 0.05),
+            actors.call("S1", record, "after slow", 0),
+            actors.call("S2", record, "other session", 0),
+        )
+        await actors.shutdown()
+        return order
+    
+    assert asyncio.run(scenario()) == ["other session", "slow", "after slow"]
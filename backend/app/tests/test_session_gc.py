@@ -0,0 +1,85 @@
+import asyncio
+import time
+from app.models.session import GameSession
+from app.services.auto_gm import auto_gm
+from app.services.session_gc import SessionSweeper, approximate_size
+from app.services.session_store import InMemorySessionStore, SQLiteSessionStore
+from app.session_manager import SessionManager
+from app.websocket import WebSocketManager
+from app.tests.test_websocket import FakeWebSocket
+
+
+def test_sweeper_evicts_idle_sessions_and_reports_reclaimed_memory():
+    """Test that only idle sessions are evicted, sooner when nobody is connected"""
+    async def scenario():
+        manager = SessionManager(InMemorySessionStore())
+        websockets = WebSocketManager()
+        sweeper = SessionSweeper(manager, websockets, idle_ttl=60, connected_ttl=600, interval=0)
+        
+        idle = manager.create_session("IdleMaster")
+        connected = manager.create_session("ConnectedMaster")
+        active = manager.create_session("ActiveMaster")
+        websockets._add_connection(FakeWebSocket(), connected.session_id, connected.game_master_id)
+        
+        now = time.monotonic() + 120
+        manager.last_activity[active.session_id] = now - 1
+        
+        evicted = await sweeper.sweep(now)
+        assert evicted == [idle.session_id]
+        assert idle.session_id not in manager.sessions
+        assert idle.session_id not in auto_gm.sessions
+        assert manager.get_session(idle.session_id) is None
+        
+        stats = sweeper.get_stats()
+        assert stats["evicted"] == 1 and stats["reclaimed_bytes"] > 0
+        assert set(sweeper.session_sizes) == {connected.session_id, active.session_id}
+        
+        # Past the connected TTL the sockets are closed too
+        evicted = await sweeper.sweep(now + 600)
+        assert set(evicted) == {connected.session_id, active.session_id}
+        assert websockets.connections == {}
+        assert sweeper.get_stats()["tracked_bytes"] == 0
+        await websockets.shutdown()
+    
+    asyncio.run(scenario())
+
+def test_approximate_size_grows_with_players():
+    """Test that the memory estimate follows the session's contents"""
+    session = GameSession.create_new("TestMaster")
+    before = approximate_size(session)
+    for i in range(20):
+        session.add_player(f"Player{i}")
+    
+    assert approximate_size(session) > before + 20 * 100
+
+def test_sqlite_purge_keeps_loaded_and_recent_sessions(tmp_path):
+    """Test that only stale rows are purged from the store"""
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    stale, loaded, recent = (GameSession.create_new(f"Master{i}") for i in range(3))
+    for session in (stale, loaded, recent):
+        store.save(session)
+    store._conn.execute(
+        "UPDATE sessions SET updated_at = 0 WHERE session_id IN (?, ?)", (stale.session_id, loaded.session_id)
+    )
+    
+    assert store.purge_expired(60, keep={loaded.session_id}) == [stale.session_id]
+    assert sorted(store.session_ids()) == sorted([loaded.session_id, recent.session_id])
+
+def test_sweep_keeps_sessions_another_worker_holds(tmp_path):
+    """Test that one worker's sweep does not purge a quiet session another worker still has loaded"""
+    async def scenario():
+        worker_a = SessionManager(SQLiteSessionStore(str(tmp_path / "sessions.db")))
+        worker_b = SessionManager(SQLiteSessionStore(str(tmp_path / "sessions.db")))
+        websockets = WebSocketManager()
+        held = worker_b.create_session("HeldMaster")
+        abandoned = worker_b.create_session("AbandonedMaster")
+        worker_b.evict_session(abandoned.session_id)
+        worker_a.store._conn.execute("UPDATE sessions SET updated_at = 0")
+        
+        await SessionSweeper(worker_b, websockets, idle_ttl=60, interval=0).sweep()
+        await SessionSweeper(worker_a, websockets, idle_ttl=60, interval=0).sweep()
+        return worker_a, held, abandoned
+    
+    worker_a, held, abandoned = asyncio.run(scenario())
+    
+    assert worker_a.store.session_ids() == [held.session_id]
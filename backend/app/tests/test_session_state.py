@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.session_manager import session_manager
+
+
+def test_state_is_cached_per_version_and_honours_if_none_match():
+    """Test that unchanged state returns 304 and a mutation yields a new ETag"""
+    client = TestClient(app)
+    created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+    url = f"/sessions/{created['session_id']}/state"
+    
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["version"] == 0
+    
+    # Repeated polls reuse the serialized snapshot
+    session = session_manager.get_session(created["session_id"])
+    assert session.get_snapshot(lambda s: b"rebuilt") == first.content
+    
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    
+    client.post(f"/sessions/{created['session_id']}/join", json={"pseudonym": "TestPlayer"})
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [p["pseudonym"] for p in changed.json()["players"]] == ["TestMaster", "TestPlayer"]
+    
+    session_manager.remove_session(created["session_id"])
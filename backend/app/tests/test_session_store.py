@@ -0,0 +1,94 @@
+import asyncio
+from app.models.game_state import GameState
+from app.models.session import GameSession
+from app.main import session_manager as app_session_manager
+from app.services.auto_gm import auto_gm
+from app.session_manager import SessionManager
+from app.services.session_store import SQLiteSessionStore, create_session_store, InMemorySessionStore
+
+
+def test_sqlite_round_trip(tmp_path):
+    """Test that a session survives being written and reloaded"""
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    session = GameSession.create_new("TestMaster")
+    player = session.add_player("TestPlayer")
+    session.start_question_phase("Test question?", "Test answer")
+    session.submit_fake_answer(player.player_id, "Fake answer")
+    dealt = session.question_deck("default")
+    dealt.reset("default", 10)
+    first_index = dealt.draw()
+    store.save(session)
+    store.close()
+    
+    reopened = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    loaded = reopened.load(session.session_id)
+    
+    assert loaded.players[player.player_id].pseudonym == "TestPlayer"
+    assert loaded.current_question.fake_answers == {player.player_id: "Fake answer"}
+    assert loaded.game_state == GameState.SUBMISSION_PHASE
+    assert loaded.question_deck("default").draw() == dealt.draw() != first_index
+    assert reopened.session_ids() == [session.session_id]
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_sqlite_writes_are_coalesced_per_loop_tick(tmp_path):
+    """Test that many changes in one tick become a single write"""
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    session = GameSession.create_new("TestMaster")
+    
+    async def scenario():
+        for i in range(50):
+            session.add_player(f"Player{i}")
+            store.mark_dirty(session)
+        await asyncio.sleep(0)
+    
+    asyncio.run(scenario())
+    
+    assert store.stats["writes"] == 1
+    assert store.stats["coalesced"] == 49
+    assert len(store.load(session.session_id).players) == 51
+
+def test_create_session_store_from_url(tmp_path):
+    """Test choosing a backend from the SESSION_STORE URL"""
+    assert isinstance(create_session_store("memory"), InMemorySessionStore)
+    assert isinstance(create_session_store(f"sqlite:///{tmp_path}/s.db"), SQLiteSessionStore)
+
+def test_worker_reloads_a_session_another_worker_saved(tmp_path):
+    """Test that a worker's cached session is replaced once the shared store holds a newer version"""
+    worker_a = SessionManager(SQLiteSessionStore(str(tmp_path / "sessions.db")), reload_check_interval=0)
+    worker_b = SessionManager(SQLiteSessionStore(str(tmp_path / "sessions.db")), reload_check_interval=0)
+    session = worker_a.create_session("TestMaster")
+    assert worker_b.get_session(session.session_id).players.keys() == session.players.keys()
+    
+    worker_a.join_session(session.session_id, "Alice")
+    worker_a.store.flush()
+    _, bob = worker_b.join_session(session.session_id, "Bob")
+    worker_b.store.flush()
+    
+    reloaded = worker_a.get_session(session.session_id)
+    assert sorted(player.pseudonym for player in reloaded.players.values()) == ["Alice", "Bob", "TestMaster"]
+    assert reloaded.version == worker_b.get_session(session.session_id).version
+    assert worker_a.get_session(session.session_id) is reloaded
+
+def test_version_checks_are_throttled_per_session(tmp_path):
+    """Test that repeated reads within the check interval do not query the store for a newer version"""
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    manager = SessionManager(store, reload_check_interval=60)
+    session = manager.create_session("TestMaster")
+    checks = []
+    store.stored_version = lambda session_id: checks.append(session_id)
+    
+    for _ in range(10):
+        assert manager.get_session(session.session_id) is session
+    
+    assert checks == [session.session_id]
+    assert auto_gm.on_session_changed == app_session_manager.save_session  # Wired once, by the app
+
+def test_sessions_saved_with_used_questions_still_load():
+    """Test that blobs written before question decks replaced used_questions are still readable"""
+    session = GameSession.create_new("TestMaster")
+    data = session.to_dict()
+    data["used_questions"] = [1, 5, 12]
+    
+    loaded = GameSession.from_dict(data)
+    
+    assert loaded.session_id == session.session_id and "used_questions" not in loaded.to_dict()
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.session_manager import session_manager
+
+
+def receive_until_ack(socket):
+    """Read messages up to the next ACK; returns (message types, ACK data)"""
+    types = []
+    while True:
+        message = socket.receive_json()
+        types.append(message["type"])
+        if message["type"] == "ACK":
+            return types, message["data"]
+
+def test_game_actions_over_the_socket_are_acknowledged():
+    """Test that socket actions run like their REST endpoints and are ACKed by request id"""
+    with TestClient(app) as client:
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        session_id, gm_id = created["session_id"], created["player_id"]
+        player_id = client.post(f"/sessions/{session_id}/join", json={"pseudonym": "TestPlayer"}).json()["player_id"]
+        
+        with client.websocket_connect(f"/ws/{session_id}/{player_id}") as socket:
+            socket.send_json({"type": "SUBMIT_ANSWER", "request_id": "a1", "data": {"fake_answer": "Too early"}})
+            _, ack = receive_until_ack(socket)
+            assert ack == {"request_id": "a1", "ok": False, "status": 400, "error": "No active question"}
+            
+            # Only the game master may submit questions
+            socket.send_json({"type": "SUBMIT_QUESTION", "request_id": "q1",
+                              "data": {"question": "Test question?", "answer": "Correct answer"}})
+            _, ack = receive_until_ack(socket)
+            assert ack["request_id"] == "q1" and ack["status"] == 403
+            
+            client.post(f"/sessions/{session_id}/questions", params={"player_id": gm_id},
+                        json={"question": "Test question?", "answer": "Correct answer"})
+            socket.send_json({"type": "SUBMIT_ANSWER", "request_id": "a2", "data": {"fake_answer": "Fake answer"}})
+            types, ack = receive_until_ack(socket)
+            # The ACK follows the broadcasts the action caused
+            assert types[-3:] == ["ANSWER_SUBMITTED", "VOTING_PHASE_STARTED", "ACK"]
+            assert ack == {"request_id": "a2", "ok": True, "result": {"message": "Answer submitted successfully"}}
+            
+            socket.send_json({"type": "SUBMIT_VOTE", "request_id": "v1", "data": {"answer_index": "not a number"}})
+            _, ack = receive_until_ack(socket)
+            assert ack["status"] == 422
+            
+            socket.send_text("not json")
+            _, ack = receive_until_ack(socket)
+            assert ack["request_id"] is None and ack["status"] == 400
+        
+        session_manager.remove_session(session_id)
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.scheduler import TimerWheel
+from app.services.session_store import InMemorySessionStore
+from app.services.vote_ingest import VoteIngestor
+from app.session_manager import SessionManager
+from app.tests.test_auto_gm import RecordingWebSocketManager
+
+
+def run_votes(player_count: int, max_batch: int):
+    async def scenario():
+        sessions = SessionManager(InMemorySessionStore())
+        manager = RecordingWebSocketManager()
+        finished = []
+        
+        async def on_all_voted(session):
+            finished.append(session.session_id)
+        
+        ingest = VoteIngestor(sessions, manager, on_all_voted=on_all_voted, interval=0.05,
+                              max_batch=max_batch, scheduler=TimerWheel(tick=0.01))
+        session = sessions.create_session("TestMaster")
+        players = [session.add_player(f"Player{i}") for i in range(player_count)]
+        session.start_question_phase("Test question?", "Correct answer")
+        for player in players:
+            session.submit_fake_answer(player.player_id, f"Fake from {player.pseudonym}")
+        session.start_voting_phase()
+        
+        correct = session.current_question.answer_index["Correct answer"]
+        for player in players:
+            ingest.submit(session, player.player_id, correct)
+        # Nothing is applied until the batch is flushed
+        applied_before_flush = len(session.current_question.votes)
+        await asyncio.sleep(0.2)
+        return session, manager, finished, applied_before_flush, ingest
+    
+    return asyncio.run(scenario())
+
+def test_votes_in_one_window_become_one_broadcast():
+    """Test that a burst of votes is applied together with one VOTE_SUBMITTED"""
+    session, manager, finished, applied_before_flush, ingest = run_votes(50, max_batch=1000)
+    
+    assert applied_before_flush == 0
+    assert manager.types() == ["VOTE_SUBMITTED"]
+    assert manager.messages[0]["data"] == {"votes_count": 50, "total_players": 50, "all_voted": True, "batch_size": 50}
+    assert finished == [session.session_id]
+    assert session.current_question.vote_counts[session.current_question.answer_index["Correct answer"]] == 50
+
+def test_full_batches_flush_without_waiting():
+    """Test that the max batch size caps how many votes one broadcast covers"""
+    session, manager, finished, applied_before_flush, ingest = run_votes(250, max_batch=100)
+    
+    assert [message["data"]["batch_size"] for message in manager.messages] == [100, 100, 50]
+    assert [message["data"]["votes_count"] for message in manager.messages] == [100, 200, 250]
+    assert finished == [session.session_id]
+    assert ingest.stats["batches"] == 3 and ingest.stats["rejected"] == 0
+
+def test_invalid_votes_are_refused_before_they_are_queued():
+    """Test that wrong-phase and out-of-range votes fail on submit and never reach a batch"""
+    sessions = SessionManager(InMemorySessionStore())
+    ingest = VoteIngestor(sessions, RecordingWebSocketManager(), scheduler=TimerWheel(tick=0.01))
+    session = sessions.create_session("TestMaster")
+    player = session.add_player("Player1")
+    session.start_question_phase("Test question?", "Correct answer")
+    
+    with pytest.raises(ValueError, match="Not in voting phase"):
+        ingest.submit(session, player.player_id, 0)
+    session.submit_fake_answer(player.player_id, "Fake answer")
+    session.start_voting_phase()
+    with pytest.raises(ValueError, match="Invalid answer"):
+        ingest.submit(session, player.player_id, 5)
+    
+    assert ingest.pending(session.session_id) == 0 and ingest.stats["votes"] == 0
+
+def test_vote_endpoint_rejects_an_invalid_answer():
+    """Test that a bad vote gets a 400 instead of a success reply"""
+    with TestClient(app) as client:
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        session_id, gm_id = created["session_id"], created["player_id"]
+        player_id = client.post(f"/sessions/{session_id}/join", json={"pseudonym": "TestPlayer"}).json()["player_id"]
+        early = client.post(f"/sessions/{session_id}/votes", params={"player_id": player_id}, json={"answer_index": 0})
+        client.post(f"/sessions/{session_id}/questions", params={"player_id": gm_id},
+                    json={"question": "Test question?", "answer": "Correct answer"})
+        client.post(f"/sessions/{session_id}/answers", params={"player_id": player_id},
+                    json={"fake_answer": "Fake answer"})
+        out_of_range = client.post(f"/sessions/{session_id}/votes", params={"player_id": player_id},
+                                   json={"answer_index": 5})
+    
+    assert early.status_code == 400
+    assert out_of_range.status_code == 400
+
+def test_ending_the_vote_succeeds_when_buffered_votes_complete_the_round():
+    """Test that end-voting reports success when the flush it triggers already showed the results"""
+    with TestClient(app) as client:
+        created = client.post("/sessions", json={"game_master_pseudonym": "TestMaster"}).json()
+        session_id, gm_id = created["session_id"], created["player_id"]
+        player_id = client.post(f"/sessions/{session_id}/join", json={"pseudonym": "TestPlayer"}).json()["player_id"]
+        client.post(f"/sessions/{session_id}/questions", params={"player_id": gm_id},
+                    json={"question": "Test question?", "answer": "Correct answer"})
+        client.post(f"/sessions/{session_id}/answers", params={"player_id": player_id},
+                    json={"fake_answer": "Fake answer"})
+        client.post(f"/sessions/{session_id}/votes", params={"player_id": player_id}, json={"answer_index": 0})
+        ended = client.post(f"/sessions/{session_id}/end-voting", params={"player_id": gm_id})
+        state = client.get(f"/sessions/{session_id}/state").json()
+    
+    assert ended.status_code == 200
+    assert state["game_state"] == "results_phase" and state["current_question"]["votes_count"] == 1
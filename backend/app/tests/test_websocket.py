@@ -0,0 +1,110 @@
+import asyncio
+import json
+from app.websocket import WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+    
+    async def accept(self):
+        pass
+    
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+    
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+
+def test_broadcast_shares_one_frame():
+    """Test that every recipient receives the same encoded frame"""
+    async def scenario():
+        manager = WebSocketManager()
+        sockets = {f"p{i}": FakeWebSocket() for i in range(3)}
+        for player_id, websocket in sockets.items():
+            manager._add_connection(websocket, "S1", player_id)
+        
+        await manager.broadcast_to_session("S1", {"type": "PING"}, exclude_player="p0")
+        await manager.drain("S1")
+        return sockets
+    
+    sockets = asyncio.run(scenario())
+    
+    assert sockets["p0"].sent == []
+    assert sockets["p1"].sent[0] is sockets["p2"].sent[0]
+    assert json.loads(sockets["p1"].sent[0]) == {"type": "PING"}
+
+def test_slow_socket_is_dropped_after_deadline():
+    """Test that a stalled socket times out without blocking the others"""
+    async def scenario():
+        manager = WebSocketManager(send_timeout=0.05)
+        fast, slow = FakeWebSocket(), FakeWebSocket(delay=1)
+        manager._add_connection(fast, "S1", "fast")
+        manager._add_connection(slow, "S1", "slow")
+        
+        await manager.broadcast_to_session("S1", {"type": "PING"})
+        await asyncio.sleep(0.1)
+        await manager.drain("S1")
+        return manager, fast, slow
+    
+    manager, fast, slow = asyncio.run(scenario())
+    
+    assert json.loads(fast.sent[0]) == {"type": "PING"}
+    assert manager.get_connected_players("S1") == {"fast"}
+    assert slow.closed
+
+def test_queue_overflow_policies():
+    """Test drop-oldest for progress ticks and eviction for state changes"""
+    async def scenario():
+        manager = WebSocketManager(max_queue_size=2)
+        stalled = FakeWebSocket(delay=10)
+        manager._add_connection(stalled, "S1", "p1")
+        await asyncio.sleep(0)
+        
+        for remaining in range(5):
+            await manager.broadcast_to_session("S1", {"type": "AUTO_MODE_PROGRESS", "data": remaining})
+        depth_after_progress = manager.get_queue_depths("S1")["p1"]
+        
+        await manager.broadcast_to_session("S1", {"type": "RESULTS_READY"})
+        await manager.broadcast_to_session("S1", {"type": "RESULTS_READY"})
+        await manager.broadcast_to_session("S1", {"type": "RESULTS_READY"})
+        await asyncio.sleep(0)
+        return manager, depth_after_progress
+    
+    manager, depth_after_progress = asyncio.run(scenario())
+    
+    assert depth_after_progress == 2
+    assert manager.stats["dropped_messages"] >= 3
+    assert manager.stats["evictions"] == 1
+    assert manager.get_connected_players("S1") == set()
+
+def test_heartbeat_reaps_silent_sockets_and_pings_the_rest():
+    """Test that sockets silent past the timeout are closed in one sweep and live ones get a PING"""
+    async def scenario():
+        manager = WebSocketManager(heartbeat_timeout=60)
+        presence = []
+        manager.on_presence_change = lambda session_id, player_id, connected: presence.append((player_id, connected))
+        sockets = {f"p{i}": FakeWebSocket() for i in range(3)}
+        for player_id, websocket in sockets.items():
+            manager._add_connection(websocket, "S1", player_id)
+        for connection in manager.connections["S1"].values():
+            connection.last_seen = 0
+        manager.mark_alive("S1", "p2")
+        
+        reaped = await manager.reap_and_ping(now=100)
+        await manager.drain("S1")
+        await manager.shutdown()
+        return manager, sockets, reaped, presence
+    
+    manager, sockets, reaped, presence = asyncio.run(scenario())
+    
+    assert sorted(connection.player_id for connection in reaped) == ["p0", "p1"]
+    assert sockets["p0"].closed and sockets["p1"].closed and not sockets["p2"].closed
+    assert presence == [("p0", False), ("p1", False)]
+    assert [json.loads(frame)["type"] for frame in sockets["p2"].sent] == ["PING"]
+    assert manager.stats["reaped"] == 2
@@ -1,89 +1,432 @@
 """
 WebSocket manager for real-time communication.
 """
+import asyncio
 import json
-from typing import Dict, List, Set
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 from fastapi import WebSocket
+from .services.broadcast_bus import BroadcastBus, BusEvent, create_broadcast_bus
+
+
+# Per-send deadline so a single stalled socket cannot hold up a broadcast
+DEFAULT_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+
+# Maximum number of frames waiting in a connection's outbound queue
+DEFAULT_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "64"))
+
+# Seconds between server PINGs; 0 disables the heartbeat
+DEFAULT_HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", "20"))
+
+# Seconds without any frame from a client before its socket is reaped
+DEFAULT_HEARTBEAT_TIMEOUT = float(os.getenv("WS_HEARTBEAT_TIMEOUT", "60"))
+
+# Overflow policies applied when a connection's queue is full
+DROP_OLDEST = "drop_oldest"  # Discard the oldest droppable frame (stale progress ticks)
+DISCONNECT = "disconnect"    # Evict the slow consumer; it must resync on reconnect
+
+DEFAULT_OVERFLOW_POLICIES: Dict[str, str] = {
+    "AUTO_MODE_PROGRESS": DROP_OLDEST,
+    "AUDIENCE_TALLY": DROP_OLDEST,
+    "PING": DROP_OLDEST,
+}
+
+# The reduced event stream sent to spectators: game flow only, no per-player chatter
+AUDIENCE_EVENTS: Set[str] = {
+    "QUESTION_SUBMITTED",
+    "QUESTION_EDITED",
+    "VOTING_PHASE_STARTED",
+    "SUBMISSIONS_ENDED_EARLY",
+    "VOTING_ENDED_EARLY",
+    "RESULTS_READY",
+    "NEXT_ROUND_STARTED",
+    "GAME_STATE_UPDATE",
+    "PHASE_DEADLINE",
+    "AUDIENCE_TALLY",
+}
+
+
+class Connection:
+    """A player's or spectator's WebSocket with its own bounded outbound queue and writer task."""
+    
+    def __init__(self, manager: "WebSocketManager", websocket: WebSocket,
+                 session_id: str, player_id: str, spectator: bool = False):
+        self.manager = manager
+        self.websocket = websocket
+        self.session_id = session_id
+        self.player_id = player_id  # The spectator ID for spectators
+        self.spectator = spectator
+        self.queue: Deque[Tuple[str, str]] = deque()  # (message_type, frame)
+        self.closed = False
+        # Monotonic time of the last frame received from the client
+        self.last_seen = time.monotonic()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self._wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._writer())
+    
+    def enqueue(self, message_type: str, frame: str) -> bool:
+        """Queue a frame for sending. Returns False if the connection overflowed."""
+        if self.closed:
+            return True
+        
+        if len(self.queue) >= self.manager.max_queue_size:
+            if not self._drop_oldest_droppable():
+                if self.manager.policy_for(message_type) == DROP_OLDEST:
+                    # Nothing older is droppable, so the new frame is the stale one
+                    self.manager.stats["dropped_messages"] += 1
+                    return True
+                return False
+        
+        self.queue.append((message_type, frame))
+        self.idle.clear()
+        self._wakeup.set()
+        
+        depth = len(self.queue)
+        if depth > self.manager.stats["max_queue_depth"]:
+            self.manager.stats["max_queue_depth"] = depth
+        return True
+    
+    def _drop_oldest_droppable(self) -> bool:
+        """Remove the oldest queued frame whose type allows dropping."""
+        for index, (message_type, _) in enumerate(self.queue):
+            if self.manager.policy_for(message_type) == DROP_OLDEST:
+                del self.queue[index]
+                self.manager.stats["dropped_messages"] += 1
+                return True
+        return False
+    
+    def close(self):
+        """Stop the writer and discard anything still queued."""
+        self.closed = True
+        self.queue.clear()
+        self.idle.set()
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+    
+    async def _writer(self):
+        """Drain the queue one frame at a time, bounded by the send deadline."""
+        while True:
+            while not self.queue:
+                self.idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            
+            _, frame = self.queue.popleft()
+            try:
+                async with asyncio.timeout(self.manager.send_timeout):
+                    await self.websocket.send_text(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error sending to player {self.player_id}: {e!r}")
+                self.manager.stats["send_errors"] += 1
+                self.manager._schedule_eviction(self)
+                return
 
 
 class WebSocketManager:
     """Manages WebSocket connections for real-time game communication."""
     
-    def __init__(self):
-        # session_id -> {player_id -> websocket}
-        self.connections: Dict[str, Dict[str, WebSocket]] = {}
+    def __init__(self, send_timeout: Optional[float] = None, max_queue_size: Optional[int] = None,
+                 overflow_policies: Optional[Dict[str, str]] = None, default_policy: str = DISCONNECT,
+                 bus: Optional[BroadcastBus] = None, heartbeat_interval: Optional[float] = None,
+                 heartbeat_timeout: Optional[float] = None):
+        # session_id -> {player_id -> connection}
+        self.connections: Dict[str, Dict[str, Connection]] = {}
+        # session_id -> {spectator_id -> connection}, kept apart so rosters never see them
+        self.audiences: Dict[str, Dict[str, Connection]] = {}
+        self.send_timeout = DEFAULT_SEND_TIMEOUT if send_timeout is None else send_timeout
+        self.max_queue_size = DEFAULT_QUEUE_SIZE if max_queue_size is None else max_queue_size
+        self.overflow_policies = dict(DEFAULT_OVERFLOW_POLICIES)
+        if overflow_policies:
+            self.overflow_policies.update(overflow_policies)
+        self.default_policy = default_policy
+        self.heartbeat_interval = DEFAULT_HEARTBEAT_INTERVAL if heartbeat_interval is None else heartbeat_interval
+        self.heartbeat_timeout = DEFAULT_HEARTBEAT_TIMEOUT if heartbeat_timeout is None else heartbeat_timeout
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "evictions": 0,
+            "reaped": 0,
+            "dropped_messages": 0,
+            "send_errors": 0,
+            "max_queue_depth": 0,
+        }
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Called with (session_id, player_id, connected) instead of broadcasting
+        # PLAYER_CONNECTED / PLAYER_DISCONNECTED, e.g. to coalesce them into roster deltas
+        self.on_presence_change: Optional[Callable[[str, str, bool], None]] = None
+        # Events are published once and each worker delivers to its own sockets
+        self.bus = bus or create_broadcast_bus()
+        self.bus.set_handler(self._deliver)
+    
+    async def start(self):
+        """Join the broadcast bus and start the heartbeat, e.g. on application startup."""
+        await self.bus.start()
+        if self.heartbeat_interval > 0 and (self._heartbeat_task is None or self._heartbeat_task.done()):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+    
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.reap_and_ping()
+            except Exception as e:
+                print(f"Error in WebSocket heartbeat: {e!r}")
+    
+    def mark_alive(self, session_id: str, player_id: str, spectator: bool = False):
+        """Record that a frame arrived from a client."""
+        table = self.audiences if spectator else self.connections
+        connection = table.get(session_id, {}).get(player_id)
+        if connection:
+            connection.last_seen = time.monotonic()
+    
+    async def reap_and_ping(self, now: Optional[float] = None) -> List[Connection]:
+        """Close every socket silent for longer than the timeout, then PING the rest."""
+        now = time.monotonic() if now is None else now
+        live: List[Connection] = []
+        dead: List[Connection] = []
+        for table in (self.connections, self.audiences):
+            for session in table.values():
+                for connection in session.values():
+                    (dead if now - connection.last_seen > self.heartbeat_timeout else live).append(connection)
+        
+        # Found in one pass and removed afterwards, so no table changes while it is walked
+        for connection in dead:
+            self.stats["reaped"] += 1
+            await self._remove_connection(connection)
+            try:
+                await connection.websocket.close(code=1001)
+            except Exception:
+                pass
+        
+        frame = json.dumps({"type": "PING", "data": {"server_time": time.time()}})
+        for connection in live:
+            if not connection.closed and not connection.enqueue("PING", frame):
+                self._schedule_eviction(connection)
+        return dead
+    
+    def policy_for(self, message_type: str) -> str:
+        """Get the overflow policy for a message type."""
+        return self.overflow_policies.get(message_type, self.default_policy)
     
     async def connect(self, websocket: WebSocket, session_id: str, player_id: str):
         """Accept a WebSocket connection and add to session."""
         await websocket.accept()
-        
-        if session_id not in self.connections:
-            self.connections[session_id] = {}
-        
-        self.connections[session_id][player_id] = websocket
+        self._add_connection(websocket, session_id, player_id)
         
         # Notify others in session about new connection
+        if self.on_presence_change:
+            self.on_presence_change(session_id, player_id, True)
+            return
         await self.broadcast_to_session(session_id, {
             "type": "PLAYER_CONNECTED",
             "data": {"player_id": player_id}
         }, exclude_player=player_id)
     
-    async def disconnect(self, websocket: WebSocket, session_id: str, player_id: str):
+    async def connect_spectator(self, websocket: WebSocket, session_id: str, spectator_id: str):
+        """Accept a spectator's WebSocket; spectators are not announced to the room."""
+        await websocket.accept()
+        self._add_connection(websocket, session_id, spectator_id, spectator=True)
+    
+    def _add_connection(self, websocket: WebSocket, session_id: str, player_id: str,
+                        spectator: bool = False) -> Connection:
+        """Register an accepted socket, replacing any previous one for the player."""
+        table = self.audiences if spectator else self.connections
+        if session_id not in table:
+            table[session_id] = {}
+        
+        previous = table[session_id].get(player_id)
+        if previous:
+            previous.close()
+        
+        connection = Connection(self, websocket, session_id, player_id, spectator)
+        table[session_id][player_id] = connection
+        return connection
+    
+    async def disconnect(self, websocket: WebSocket, session_id: str, player_id: str,
+                         spectator: bool = False):
         """Remove WebSocket connection."""
-        if session_id in self.connections and player_id in self.connections[session_id]:
-            del self.connections[session_id][player_id]
-            
-            # Clean up empty sessions
-            if not self.connections[session_id]:
-                del self.connections[session_id]
-            else:
-                # Notify others about disconnection
-                await self.broadcast_to_session(session_id, {
-                    "type": "PLAYER_DISCONNECTED",
-                    "data": {"player_id": player_id}
-                }, exclude_player=player_id)
+        table = self.audiences if spectator else self.connections
+        connection = table.get(session_id, {}).get(player_id)
+        # Ignore stale disconnects from a socket that has since been replaced
+        if connection and connection.websocket is websocket:
+            await self._remove_connection(connection)
+    
+    async def _remove_connection(self, connection: Connection):
+        """Drop a connection from its session and notify the remaining players."""
+        session_id, player_id = connection.session_id, connection.player_id
+        table = self.audiences if connection.spectator else self.connections
+        if table.get(session_id, {}).get(player_id) is not connection:
+            return
+        
+        connection.close()
+        del table[session_id][player_id]
+        
+        # Clean up empty sessions
+        if not table[session_id]:
+            del table[session_id]
+        if connection.spectator:
+            return
+        if self.on_presence_change:
+            self.on_presence_change(session_id, player_id, False)
+        elif session_id in table:
+            # Notify others about disconnection
+            await self.broadcast_to_session(session_id, {
+                "type": "PLAYER_DISCONNECTED",
+                "data": {"player_id": player_id}
+            }, exclude_player=player_id)
+    
+    async def _evict(self, connection: Connection):
+        """Disconnect a slow or broken consumer."""
+        if connection.closed:
+            return
+        self.stats["evictions"] += 1
+        await self._remove_connection(connection)
+        try:
+            await connection.websocket.close(code=1013)
+        except Exception:
+            pass
+    
+    def _schedule_eviction(self, connection: Connection):
+        """Evict a connection without blocking the caller."""
+        task = asyncio.create_task(self._evict(connection))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
     
     async def send_to_player(self, session_id: str, player_id: str, message: dict):
-        """Send message to a specific player."""
-        if (session_id in self.connections and 
-            player_id in self.connections[session_id]):
-            websocket = self.connections[session_id][player_id]
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Error sending to player {player_id}: {e}")
-                # Remove broken connection
-                await self.disconnect(websocket, session_id, player_id)
+        """Send message to a specific player, wherever their socket is connected."""
+        if self.bus.local_only and player_id not in self.connections.get(session_id, {}):
+            return
+        self.bus.publish(BusEvent(
+            session_id, message.get("type", ""), json.dumps(message), target_player=player_id
+        ))
+    
+    def reply(self, session_id: str, player_id: str, message: dict) -> bool:
+        """Queue a message on a player's socket on this worker, after anything already queued."""
+        connection = self.connections.get(session_id, {}).get(player_id)
+        if connection is None:
+            return False
+        if not connection.enqueue(message.get("type", ""), json.dumps(message)):
+            self._schedule_eviction(connection)
+            return False
+        return True
     
     async def broadcast_to_session(self, session_id: str, message: dict, exclude_player: str = None):
         """Broadcast message to all players in a session."""
-        if session_id not in self.connections:
+        if self.bus.local_only and session_id not in self.connections and session_id not in self.audiences:
             return
         
-        disconnected_players = []
+        # Encode once and share the same frame with every recipient on every worker
+        self.bus.publish(BusEvent(
+            session_id, message.get("type", ""), json.dumps(message), exclude_player=exclude_player
+        ))
+    
+    def _deliver(self, event: BusEvent):
+        """Queue a published event for the sockets connected to this worker."""
+        connections = self.connections.get(event.session_id, {})
         
-        for player_id, websocket in self.connections[session_id].items():
-            if exclude_player and player_id == exclude_player:
-                continue
-            
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Error broadcasting to player {player_id}: {e}")
-                disconnected_players.append(player_id)
+        if event.target_player:
+            recipient = connections.get(event.target_player)
+            recipients = [recipient] if recipient else []
+        else:
+            recipients = [
+                connection for player_id, connection in connections.items()
+                if not (event.exclude_player and player_id == event.exclude_player)
+            ]
+            if event.message_type in AUDIENCE_EVENTS:
+                recipients.extend(self.audiences.get(event.session_id, {}).values())
         
-        # Clean up disconnected players
-        for player_id in disconnected_players:
-            if session_id in self.connections and player_id in self.connections[session_id]:
-                websocket = self.connections[session_id][player_id]
-                await self.disconnect(websocket, session_id, player_id)
+        overflowed: List[Connection] = [
+            connection for connection in recipients
+            if not connection.enqueue(event.message_type, event.frame)
+        ]
+        for connection in overflowed:
+            print(f"Outbound queue full for player {connection.player_id}, disconnecting")
+            self._schedule_eviction(connection)
+    
+    async def close_player(self, session_id: str, player_id: str, code: int = 1000):
+        """Close a player's socket, e.g. when they are removed from the session."""
+        connection = self.connections.get(session_id, {}).get(player_id)
+        if connection:
+            await self._remove_connection(connection)
+            try:
+                await connection.websocket.close(code=code)
+            except Exception:
+                pass
+    
+    async def close_session(self, session_id: str, code: int = 1001):
+        """Close every socket of a session, e.g. when the session is evicted."""
+        connections = [
+            *self.connections.pop(session_id, {}).values(),
+            *self.audiences.pop(session_id, {}).values(),
+        ]
+        for connection in connections:
+            connection.close()
+            try:
+                await connection.websocket.close(code=code)
+            except Exception:
+                pass
+    
+    async def drain(self, session_id: str):
+        """Wait until every queued frame for a session has been written."""
+        connections = [
+            *self.connections.get(session_id, {}).values(),
+            *self.audiences.get(session_id, {}).values(),
+        ]
+        await asyncio.gather(*(connection.idle.wait() for connection in connections))
+    
+    async def shutdown(self):
+        """Stop the heartbeat and every writer task, e.g. on application shutdown."""
+        tasks = []
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            tasks.append(self._heartbeat_task)
+            self._heartbeat_task = None
+        for table in (self.connections, self.audiences):
+            for session in table.values():
+                for connection in session.values():
+                    connection.close()
+                    tasks.append(connection.task)
+            table.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.bus.stop()
     
     def get_connected_players(self, session_id: str) -> Set[str]:
-        """Get list of connected player IDs for a session."""
+        """Get list of player IDs connected to this worker for a session."""
         if session_id in self.connections:
             return set(self.connections[session_id].keys())
         return set()
+    
+    def get_audience_size(self, session_id: str) -> int:
+        """Get the number of spectators connected to this worker for a session."""
+        return len(self.audiences.get(session_id, {}))
+    
+    def get_queue_depths(self, session_id: str) -> Dict[str, int]:
+        """Get the current outbound queue depth for each player in a session."""
+        return {
+            player_id: len(connection.queue)
+            for player_id, connection in self.connections.get(session_id, {}).items()
+        }
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get connection, queue and eviction counters."""
+        queued = [
+            len(connection.queue)
+            for table in (self.connections, self.audiences)
+            for session in table.values()
+            for connection in session.values()
+        ]
+        return {
+            "connections": len(queued),
+            "spectators": sum(len(session) for session in self.audiences.values()),
+            "queued_messages": sum(queued),
+            "current_max_queue_depth": max(queued, default=0),
+            **self.stats,
+        }
 
 
 # Global WebSocket manager instance
-websocket_manager = WebSocketManager()
\ No newline at end of file
+websocket_manager = WebSocketManager()
@@ -0,0 +1,113 @@
+"""
+Throughput benchmark for the session-affinity router.
+
+Starts N uvicorn workers behind an AffinityRouter and drives a simulated game
+load through it: many sessions created concurrently, players joining, polling
+state and submitting answers. Runs once per worker count so a single worker
+can be compared with several. Gains only show up with more than one CPU core.
+
+Run from the backend directory:
+    python -m benchmarks.affinity_benchmark --workers 1 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.router import AffinityRouter, spawn_workers
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, workers, timeout: float = 20.0):
+    deadline = time.perf_counter() + timeout
+    for worker in workers:
+        while True:
+            try:
+                if (await client.get(f"{worker}/health")).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"Worker {worker} did not start")
+            await asyncio.sleep(0.1)
+
+
+async def play_session(client: httpx.AsyncClient, players: int, polls: int, latencies):
+    async def timed(method, url, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+        return response.json()
+    
+    created = await timed("POST", "/sessions", json={"game_master_pseudonym": "GM"})
+    session_id = created["session_id"]
+    await timed("POST", f"/sessions/{session_id}/questions", params={"player_id": created["player_id"]},
+                json={"question": "Capital of France?", "answer": "Paris"})
+    player_ids = [
+        (await timed("POST", f"/sessions/{session_id}/join", json={"pseudonym": f"P{i}"}))["player_id"]
+        for i in range(players)
+    ]
+    
+    async def player_loop(index: int, player_id: str):
+        for _ in range(polls):
+            await timed("GET", f"/sessions/{session_id}/state")
+        await timed("POST", f"/sessions/{session_id}/answers",
+                    params={"player_id": player_id}, json={"fake_answer": f"Fake {index}"})
+    
+    await asyncio.gather(*(player_loop(i, pid) for i, pid in enumerate(player_ids)))
+
+
+async def run_once(worker_count: int, sessions: int, players: int, polls: int, base_port: int):
+    processes = spawn_workers(worker_count, base_port)
+    workers = [f"http://127.0.0.1:{base_port + index}" for index in range(worker_count)]
+    router = AffinityRouter(workers, health_interval=0)
+    try:
+        async with httpx.AsyncClient() as probe:
+            await wait_until_healthy(probe, workers)
+        await router.start()
+        
+        latencies = []
+        transport = httpx.ASGITransport(app=router)
+        async with httpx.AsyncClient(transport=transport, base_url="http://router", timeout=60) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(play_session(client, players, polls, latencies) for _ in range(sessions)))
+            elapsed = time.perf_counter() - start
+        await router.stop()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+    
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95)],
+    }
+
+
+async def run(worker_counts, sessions: int, players: int, polls: int, base_port: int):
+    print(f"{'workers':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for count in worker_counts:
+        result = await run_once(count, sessions, players, polls, base_port)
+        print(f"{count:>8} {result['requests']:>9} {result['rps']:>9.0f} "
+              f"{result['p50'] * 1000:>9.1f} {result['p95'] * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument("--base-port", type=int, default=8301)
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.sessions, args.players, args.polls, args.base_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark for WebSocketManager.broadcast_to_session.
+
+Compares the legacy sequential loop (one json.dumps and one awaited send per
+player) against the serialize-once fan-out through per-connection writer
+queues, using mock sockets. Fan-out timings include draining every queue.
+
+Run from the backend directory:
+    python -m benchmarks.broadcast_benchmark
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.websocket import WebSocketManager
+
+
+class MockWebSocket:
+    """Minimal stand-in for a starlette WebSocket."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sent = 0
+
+    async def send_text(self, data: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+        self.sent += 1
+
+
+def make_message(answer_count: int = 8) -> dict:
+    return {
+        "type": "GAME_STATE_UPDATE",
+        "data": {
+            "game_state": "voting_phase",
+            "answers": [f"Plausible fake answer number {i}" for i in range(answer_count)],
+            "is_automatic_mode": True,
+        },
+    }
+
+
+async def legacy_broadcast(manager: WebSocketManager, session_id: str, message: dict):
+    """The previous implementation: encode per player, await sends in turn."""
+    for player_id, connection in manager.connections[session_id].items():
+        await connection.websocket.send_text(json.dumps(message))
+
+
+def build_manager(room_size: int, latency: float) -> WebSocketManager:
+    manager = WebSocketManager()
+    for i in range(room_size):
+        manager._add_connection(MockWebSocket(latency), "BENCH", f"player-{i}")
+    return manager
+
+
+async def fanout_broadcast(manager: WebSocketManager, message: dict):
+    await manager.broadcast_to_session("BENCH", message)
+    await manager.drain("BENCH")
+
+
+async def time_broadcast(broadcast, manager, message, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await broadcast(manager, message)
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(room_sizes, rounds: int, latency: float):
+    message = make_message()
+    print(f"{'players':>8} {'legacy ms':>12} {'fan-out ms':>12} {'speedup':>9}")
+    for size in room_sizes:
+        manager = build_manager(size, latency)
+        legacy = await time_broadcast(
+            lambda m, msg: legacy_broadcast(m, "BENCH", msg), manager, message, rounds
+        )
+        fanout = await time_broadcast(fanout_broadcast, manager, message, rounds)
+        await manager.shutdown()
+        print(f"{size:>8} {legacy * 1000:>12.3f} {fanout * 1000:>12.3f} {legacy / fanout:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.001,
+                        help="simulated per-send socket latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.rounds, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark for a worker starting up with many stored question sets.
+
+Fills a SQLite question store with large sets, then measures what a fresh
+QuestionManager holds after loading the catalog, and how fast questions are
+paged back in compared with keeping every set resident.
+
+Run from the backend directory:
+    python -m benchmarks.question_catalog_benchmark
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.models.questions import QuestionData, QuestionManager
+from app.services.question_store import SQLiteQuestionStore
+
+
+def fill_store(path: str, sets: int, set_size: int):
+    manager = QuestionManager(SQLiteQuestionStore(path))
+    for s in range(sets):
+        rows = [(f"Question {i} of set {s}?", f"Answer {i}", "Mixed", None) for i in range(set_size)]
+        manager._add_question_set(f"set-{s}", f"Set {s}", "Mixed", rows)
+    manager.store.close()
+
+
+def resident_bytes(build) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    built = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before, elapsed
+
+
+def run(sets: int, set_size: int, reads: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "questions.db")
+        fill_store(path, sets, set_size)
+        print(f"{sets} sets of {set_size:,} questions, {os.path.getsize(path) / 2**20:.1f} MB on disk")
+
+        manager, catalog_bytes, catalog_time = resident_bytes(lambda: QuestionManager(SQLiteQuestionStore(path)))
+        print(f"{'catalog':>10} {catalog_bytes / 2**20:>8.1f} MB resident, started in {catalog_time * 1000:.0f} ms")
+
+        resident, eager_bytes, eager_time = resident_bytes(lambda: {
+            question_set.set_id: [QuestionData(question=q.question, answer=q.answer)
+                                  for q in manager.get_questions(question_set.set_id, 0, set_size)]
+            for question_set in manager.list_question_sets() if question_set.set_id.startswith("set-")
+        })
+        print(f"{'resident':>10} {eager_bytes / 2**20:>8.1f} MB resident, loaded in {eager_time * 1000:.0f} ms")
+        del resident
+        gc.collect()
+
+        start = time.perf_counter()
+        for i in range(reads):
+            manager.get_questions(f"set-{i % sets}", (i * 7919) % set_size, 1)
+        print(f"{'paged read':>10} {(time.perf_counter() - start) / reads * 1e6:>8.1f} us per question")
+        manager.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sets", type=int, default=100)
+    parser.add_argument("--set-size", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.sets, args.set_size, args.reads)
+
+
+if __name__ == "__main__":
+    main()
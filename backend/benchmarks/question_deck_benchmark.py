@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for dealing questions without repeats.
+
+Compares the legacy draw (rebuilding the list of unused indices over the whole
+set on every draw) against the per-session shuffled deck, dealing from one
+large question set.
+
+Run from the backend directory:
+    python -m benchmarks.question_deck_benchmark
+"""
+import argparse
+import random
+import time
+
+from app.models.questions import QuestionManager
+from app.models.session import QuestionDeck
+
+
+def build_manager(set_size: int) -> QuestionManager:
+    manager = QuestionManager()
+    rows = [(f"Question number {i}?", str(i), None, None) for i in range(set_size)]
+    manager._add_question_set("bench", "Bench", "Mixed", rows)
+    return manager
+
+
+def legacy_draw(manager: QuestionManager, used: set) -> int:
+    """The previous implementation: filter every index against the used set."""
+    question_count = manager.question_sets["bench"].question_count
+    available_indices = [i for i in range(question_count) if i not in used]
+    if not available_indices:
+        available_indices = list(range(question_count))
+    selected_index = random.choice(available_indices)
+    manager.get_questions("bench", selected_index, 1)
+    used.add(selected_index)
+    return selected_index
+
+
+def time_draws(draw, draws: int) -> float:
+    start = time.perf_counter()
+    dealt = [draw() for _ in range(draws)]
+    elapsed = time.perf_counter() - start
+    assert len(set(dealt)) == draws
+    return elapsed
+
+
+def run(set_size: int, draws: int, max_legacy: int):
+    manager = build_manager(set_size)
+    deck = QuestionDeck(seed=1)
+    deck_time = time_draws(lambda: manager.get_random_question("bench", deck)[1], draws)
+    print(f"set of {set_size:,} questions, {draws:,} draws")
+    print(f"{'deck':>8} {deck_time / draws * 1e6:>10.2f} us/draw")
+    if draws <= max_legacy:
+        used = set()
+        legacy_time = time_draws(lambda: legacy_draw(manager, used), draws)
+        print(f"{'legacy':>8} {legacy_time / draws * 1e6:>10.2f} us/draw "
+              f"({legacy_time / deck_time:,.0f}x slower)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--set-size", type=int, default=100_000)
+    parser.add_argument("--draws", type=int, default=1000)
+    parser.add_argument("--max-legacy", type=int, default=5000,
+                        help="most draws to time with the linear legacy scan")
+    args = parser.parse_args()
+    run(args.set_size, args.draws, args.max_legacy)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark for filling a room with players.
+
+Compares the legacy pseudonym check (lowercasing every existing pseudonym on
+each join) against the normalized pseudonym index, one join at a time and
+through the bulk add_players API used to pre-register class rosters.
+
+Run from the backend directory:
+    python -m benchmarks.roster_benchmark
+"""
+import argparse
+import time
+
+from app.models.session import GameSession
+
+
+def legacy_add_player(session: GameSession, pseudonym: str):
+    """The previous implementation: scan every player before each join."""
+    if any(player.pseudonym.lower() == pseudonym.lower() for player in session.players.values()):
+        raise ValueError(f"Pseudonym '{pseudonym}' is already taken")
+    # Skip the index so only the legacy scan is measured
+    session._pseudonym_index = None
+    session.roster_version += 1
+    session._register_player(pseudonym, pseudonym.lower())
+    session._pseudonym_index = None
+
+
+def time_fill(fill, size: int) -> float:
+    session = GameSession.create_new("Host")
+    pseudonyms = [f"Student {i}" for i in range(size)]
+    start = time.perf_counter()
+    fill(session, pseudonyms)
+    elapsed = time.perf_counter() - start
+    assert len(session.players) == size + 1
+    return elapsed
+
+
+def run(room_sizes, max_legacy: int):
+    print(f"{'players':>8} {'legacy ms':>12} {'indexed ms':>12} {'bulk ms':>10} {'speedup':>9}")
+    for size in room_sizes:
+        indexed = time_fill(lambda session, names: [session.add_player(name) for name in names], size)
+        bulk = time_fill(lambda session, names: session.add_players(names), size)
+        if size <= max_legacy:
+            legacy = time_fill(lambda session, names: [legacy_add_player(session, name) for name in names], size)
+            print(f"{size:>8} {legacy * 1000:>12.1f} {indexed * 1000:>12.1f} {bulk * 1000:>10.1f} "
+                  f"{legacy / indexed:>8.1f}x")
+        else:
+            print(f"{size:>8} {'-':>12} {indexed * 1000:>12.1f} {bulk * 1000:>10.1f} {'-':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--max-legacy", type=int, default=10000,
+                        help="largest room to time with the quadratic legacy check")
+    args = parser.parse_args()
+    run(args.sizes, args.max_legacy)
+
+
+if __name__ == "__main__":
+    main()
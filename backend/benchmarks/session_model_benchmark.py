@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for the in-memory session models.
+
+Builds sessions the way a game does (joins, one question, a fake answer and a
+vote from every player, scoring) and reports the memory each session holds
+and how many submissions and votes per second the models sustain.
+
+Run from the backend directory:
+    python -m benchmarks.session_model_benchmark
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.models.session import GameSession
+
+
+def play_round(session: GameSession, player_ids):
+    session.start_question_phase("Which planet has the most moons?", "Saturn")
+    for i, player_id in enumerate(player_ids):
+        session.submit_fake_answer(player_id, f"Planet number {i}")
+    session.start_voting_phase()
+    for i, player_id in enumerate(player_ids):
+        session.submit_vote(player_id, (i * 7) % len(session.current_question.answer_order))
+    session.calculate_scores()
+
+
+def build_session(room_size: int) -> GameSession:
+    session = GameSession.create_new("Host")
+    player_ids = [session.add_player(f"Player {i}").player_id for i in range(room_size)]
+    play_round(session, player_ids)
+    return session
+
+
+def memory_per_session(room_size: int, sessions: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = [build_session(room_size) for _ in range(sessions)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(built) == sessions
+    return (after - before) / sessions
+
+
+def ops_per_second(room_size: int, rounds: int) -> dict:
+    session = GameSession.create_new("Host")
+    player_ids = [session.add_player(f"Player {i}").player_id for i in range(room_size)]
+    submit_time = vote_time = 0.0
+    for _ in range(rounds):
+        session.start_question_phase("Which planet has the most moons?", "Saturn")
+        start = time.perf_counter()
+        for i, player_id in enumerate(player_ids):
+            session.submit_fake_answer(player_id, f"Planet number {i}")
+        submit_time += time.perf_counter() - start
+
+        session.start_voting_phase()
+        answer_count = len(session.current_question.answer_order)
+        start = time.perf_counter()
+        for i, player_id in enumerate(player_ids):
+            session.submit_vote(player_id, (i * 7) % answer_count)
+        vote_time += time.perf_counter() - start
+        session.calculate_scores()
+        session.reset_for_next_round()
+
+    operations = room_size * rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        GameSession.create_new("Host").add_players([f"Player {i}" for i in range(room_size)])
+    join_time = time.perf_counter() - start
+    return {
+        "submits/s": operations / submit_time,
+        "votes/s": operations / vote_time,
+        "joins/s": operations / join_time,
+    }
+
+
+def run(room_sizes, sessions: int, rounds: int):
+    print(f"{'players':>8} {'KB/session':>11} {'submits/s':>11} {'votes/s':>11} {'joins/s':>11}")
+    for size in room_sizes:
+        memory = memory_per_session(size, sessions)
+        rates = ops_per_second(size, rounds)
+        print(f"{size:>8} {memory / 1024:>11.1f} {rates['submits/s']:>11,.0f} "
+              f"{rates['votes/s']:>11,.0f} {rates['joins/s']:>11,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 50, 500])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.sessions, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Load test: thousands of spectator sockets on a single worker.
+
+Starts one uvicorn worker, opens N spectator WebSockets to one session, then
+plays a round: the question and voting broadcasts must reach every
+spectator, and a burst of audience votes must arrive as a handful of
+AUDIENCE_TALLY frames. Reports fan-out latency and the worker's memory.
+
+Run from the backend directory (each socket needs two file descriptors):
+    python -m benchmarks.spectator_load_test --spectators 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+
+def worker_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Spectator:
+    """A spectator socket that records when each event type first arrived."""
+    
+    def __init__(self, socket):
+        self.socket = socket
+        self.received = {}
+        self.counts = {}
+    
+    async def listen(self):
+        try:
+            async for frame in self.socket:
+                message_type = json.loads(frame)["type"]
+                self.received.setdefault(message_type, time.perf_counter())
+                self.counts[message_type] = self.counts.get(message_type, 0) + 1
+        except websockets.ConnectionClosed:
+            pass
+
+
+async def wait_for(spectators, message_type: str, started: float, timeout: float = 60.0) -> float:
+    """Wait until every spectator got a message type; return the slowest delivery in seconds."""
+    deadline = time.perf_counter() + timeout
+    while not all(message_type in spectator.received for spectator in spectators):
+        if time.perf_counter() > deadline:
+            missing = sum(message_type not in spectator.received for spectator in spectators)
+            raise RuntimeError(f"{missing} spectators never received {message_type}")
+        await asyncio.sleep(0.05)
+    return max(spectator.received[message_type] for spectator in spectators) - started
+
+
+async def run(count: int, votes: int, port: int):
+    env = dict(os.environ, AUDIENCE_FLUSH_INTERVAL="0.5")
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/health")
+                    break
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.1)
+            baseline_mb = worker_rss_mb(worker.pid)
+            
+            created = (await client.post("/sessions", json={"game_master_pseudonym": "Host"})).json()
+            session_id, gm_id = created["session_id"], created["player_id"]
+            player_id = (await client.post(f"/sessions/{session_id}/join", json={"pseudonym": "Player"})).json()["player_id"]
+            
+            # Open the spectator sockets in batches to avoid overflowing the listen backlog
+            started = time.perf_counter()
+            spectators = []
+            for offset in range(0, count, 250):
+                batch = await asyncio.gather(*(
+                    websockets.connect(f"ws://127.0.0.1:{port}/ws/{session_id}/audience/viewer-{i}", max_queue=None)
+                    for i in range(offset, min(count, offset + 250))
+                ))
+                spectators.extend(Spectator(socket) for socket in batch)
+            connect_time = time.perf_counter() - started
+            listeners = [asyncio.create_task(spectator.listen()) for spectator in spectators]
+            
+            health = (await client.get("/health")).json()
+            connected_mb = worker_rss_mb(worker.pid)
+            print(f"{len(spectators)} spectators connected in {connect_time:.1f}s "
+                  f"(worker reports {health['websocket']['spectators']}); "
+                  f"worker RSS {baseline_mb:.0f} MB -> {connected_mb:.0f} MB "
+                  f"(~{(connected_mb - baseline_mb) * 1024 / max(1, count):.1f} KB per spectator)")
+            
+            started = time.perf_counter()
+            await client.post(f"/sessions/{session_id}/questions", params={"player_id": gm_id},
+                              json={"question": "Capital of Australia?", "answer": "Canberra"})
+            print(f"QUESTION_SUBMITTED reached all spectators in {await wait_for(spectators, 'QUESTION_SUBMITTED', started) * 1000:.0f} ms")
+            
+            started = time.perf_counter()
+            await client.post(f"/sessions/{session_id}/answers", params={"player_id": player_id},
+                              json={"fake_answer": "Sydney"})
+            print(f"VOTING_PHASE_STARTED reached all spectators in {await wait_for(spectators, 'VOTING_PHASE_STARTED', started) * 1000:.0f} ms")
+            
+            # Per-player chatter (ANSWER_SUBMITTED, ROSTER_DELTA) must not reach spectators
+            leaked = sum(1 for spectator in spectators if "ANSWER_SUBMITTED" in spectator.counts)
+            print(f"spectators that received per-player events: {leaked}")
+            
+            started = time.perf_counter()
+            semaphore = asyncio.Semaphore(100)
+            
+            async def vote(i: int):
+                async with semaphore:
+                    await client.post(f"/sessions/{session_id}/audience-votes",
+                                      params={"spectator_id": f"viewer-{i}"}, json={"answer_index": i % 2})
+            
+            await asyncio.gather(*(vote(i) for i in range(votes)))
+            vote_time = time.perf_counter() - started
+            await asyncio.sleep(1.0)
+            tallies = max(spectator.counts.get("AUDIENCE_TALLY", 0) for spectator in spectators)
+            final = (await client.get(f"/sessions/{session_id}/state")).json()
+            print(f"{votes} audience votes in {vote_time:.1f}s became {tallies} AUDIENCE_TALLY broadcasts; "
+                  f"results need {len(final['players'])} roster entries")
+            
+            for spectator in spectators:
+                await spectator.socket.close()
+            await asyncio.gather(*listeners, return_exceptions=True)
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spectators", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8501)
+    args = parser.parse_args()
+    asyncio.run(run(args.spectators, args.votes, args.port))
+
+
+if __name__ == "__main__":
+    main()
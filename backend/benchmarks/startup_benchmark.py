@@ -0,0 +1,63 @@
+"""
+Startup benchmark for a fresh worker process.
+
+Times `import app.main` in new interpreters, then the first use of the default
+question pack, loaded from its precompiled pack and from the bundled CSV.
+
+Run from the backend directory:
+    python -m benchmarks.startup_benchmark
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from app.services.question_pack import DEFAULT_CSV_PATH, compile_pack, pack_path
+
+
+# Runs in a new interpreter and prints its timings as JSON
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from app.models import questions
+if sys.argv[1] == "csv":
+    questions.load_pack = lambda csv_path: None
+questions.question_manager.list_question_sets()
+print(json.dumps({"import": imported - start, "first_use": time.perf_counter() - imported}))
+"""
+
+
+def probe(mode: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", PROBE, mode], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int):
+    compiled = os.path.exists(pack_path(DEFAULT_CSV_PATH))
+    if not compiled:
+        compile_pack(DEFAULT_CSV_PATH)
+    try:
+        print(f"{'default pack':>14} {'import ms':>10} {'first use ms':>13}")
+        for mode in ("csv", "pack"):
+            samples = [probe(mode) for _ in range(runs)]
+            print(f"{mode:>14} {statistics.median(s['import'] for s in samples) * 1000:>10.1f} "
+                  f"{statistics.median(s['first_use'] for s in samples) * 1000:>13.2f}")
+    finally:
+        if not compiled:
+            os.remove(pack_path(DEFAULT_CSV_PATH))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    run(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ function GameRoom() {
   const navigate = useNavigate();
   const [showAutoSetup, setShowAutoSetup] = useState(false);
   const [autoModeProgress, setAutoModeProgress] = useState(null);
+  const [phaseDeadline, setPhaseDeadline] = useState(null);
 
   useEffect(() => {
     // If no session info, redirect to home
@@ -39,8 +40,18 @@ function GameRoom() {
         const message = JSON.parse(event.data);
         
         if (message.type === 'AUTO_MODE_PROGRESS') {
+          setPhaseDeadline(null);
           setAutoModeProgress(message.data);
+        } else if (message.type === 'PHASE_DEADLINE') {
+          // Translate the server deadline into local time to absorb clock skew
+          const clockOffset = message.data.server_time * 1000 - Date.now();
+          setPhaseDeadline({
+            currentPhase: message.data.current_phase,
+            totalTime: message.data.total_time,
+            localDeadline: message.data.deadline * 1000 - clockOffset
+          });
         } else if (message.type === 'AUTO_TIMER_CANCELLED') {
+          setPhaseDeadline(null);
           setAutoModeProgress(null);
           showInfo(message.data.message);
         }
@@ -53,6 +64,26 @@ function GameRoom() {
     }
   }, [state.websocket, showInfo]);
 
+  // Count down locally towards the announced phase deadline
+  useEffect(() => {
+    if (!phaseDeadline) {
+      return undefined;
+    }
+
+    const tick = () => {
+      const remaining = Math.max(0, Math.ceil((phaseDeadline.localDeadline - Date.now()) / 1000));
+      setAutoModeProgress({
+        current_phase: phaseDeadline.currentPhase,
+        time_remaining: remaining,
+        total_time: phaseDeadline.totalTime
+      });
+    };
+
+    tick();
+    const interval = setInterval(tick, 1000);
+    return () => clearInterval(interval);
+  }, [phaseDeadline]);
+
   if (!state.sessionId) {
     return (
       <div className="loading">
@@ -113,6 +144,7 @@ function GameRoom() {
       });
 
       if (response.ok) {
+        setPhaseDeadline(null);
         setAutoModeProgress(null);
       }
     } catch (error) {
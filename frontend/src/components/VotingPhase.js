@@ -12,12 +12,12 @@ function VotingPhase() {
   const { state, actions } = useGame();
   const { showSuccess, showError } = useNotification();
 
-  const handleVote = async (answer) => {
+  const handleVote = async (answer, index) => {
     if (voted || submitting) return;
     
     setSubmitting(true);
     try {
-      await actions.submitVote(answer);
+      await actions.submitVote(index);
       setSelectedAnswer(answer);
       setVoted(true);
       showSuccess('🗳️ Your vote has been recorded!', { 
@@ -152,7 +152,7 @@ function VotingPhase() {
                 <AnimatedTransition key={index} type="slideUp" delay={0.1 * index}>
                   <button
                     className={`answer-option touch-target ${selectedAnswer === answer ? 'selected' : ''}`}
-                    onClick={() => handleVote(answer)}
+                    onClick={() => handleVote(answer, index)}
                     disabled={voted || submitting}
                     style={{
                       opacity: voted && selectedAnswer !== answer ? 0.6 : 1,
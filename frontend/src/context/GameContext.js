@@ -1,8 +1,11 @@
-import React, { createContext, useContext, useReducer, useEffect } from 'react';
+import React, { createContext, useContext, useReducer, useEffect, useRef } from 'react';
 import { apiConfig } from '../config/api';
 
 const GameContext = createContext();
 
+// How long a game action sent over the socket waits for its ACK
+const ACTION_ACK_TIMEOUT = 10000;
+
 const initialState = {
   sessionId: null,
   playerId: null,
@@ -10,6 +13,7 @@ const initialState = {
   isGameMaster: false,
   gameState: 'waiting_for_players',
   players: [],
+  rosterVersion: 0,
   scores: {},
   currentQuestion: null,
   answers: [],
@@ -21,6 +25,12 @@ const initialState = {
   loading: false
 };
 
+// Append players not already listed; roster pages and deltas may overlap
+function mergePlayers(players, added) {
+  const known = new Set(players.map(p => p.player_id));
+  return [...players, ...added.filter(p => !known.has(p.player_id))];
+}
+
 function gameReducer(state, action) {
   switch (action.type) {
     case 'SET_LOADING':
@@ -59,12 +69,32 @@ function gameReducer(state, action) {
         results: action.payload.results || state.results
       };
 
-    case 'PLAYER_JOINED':
+    case 'SET_ROSTER':
       return {
         ...state,
-        players: [...state.players, action.payload.player]
+        players: mergePlayers(state.players, action.payload.players),
+        rosterVersion: Math.max(state.rosterVersion, action.payload.version)
       };
 
+    case 'ROSTER_DELTA': {
+      const { added = [], removed = [], connected = [], disconnected = [], version } = action.payload;
+      const gone = new Set(removed);
+      let players = mergePlayers(state.players.filter(p => !gone.has(p.player_id)), added);
+      if (connected.length || disconnected.length) {
+        const online = new Set(connected);
+        const offline = new Set(disconnected);
+        players = players.map(p => (
+          online.has(p.player_id) ? { ...p, connected: true }
+            : offline.has(p.player_id) ? { ...p, connected: false } : p
+        ));
+      }
+      return {
+        ...state,
+        players,
+        rosterVersion: Math.max(state.rosterVersion, version)
+      };
+    }
+
     case 'QUESTION_SUBMITTED':
       console.log('Reducer QUESTION_SUBMITTED:', action.payload);  // Debug log
       const newState = {
@@ -112,6 +142,64 @@ function gameReducer(state, action) {
 
 export function GameProvider({ children }) {
   const [state, dispatch] = useReducer(gameReducer, initialState);
+  // Read by socket callbacks, which outlive the render they were created in
+  const rosterVersionRef = useRef(0);
+  rosterVersionRef.current = state.rosterVersion;
+  const socketRef = useRef(null);
+  // request_id -> { resolve, reject, timer } for actions waiting on their ACK
+  const pendingActions = useRef(new Map());
+  const nextRequestId = useRef(0);
+
+  const settleAction = (requestId, settle) => {
+    const pending = pendingActions.current.get(requestId);
+    if (!pending) {
+      return;
+    }
+    clearTimeout(pending.timer);
+    pendingActions.current.delete(requestId);
+    settle(pending);
+  };
+
+  // Send a game action over the socket; REST is only used when the socket is not open,
+  // since an action that was sent may already have been applied
+  const sendAction = (type, data, restFallback) => {
+    const ws = socketRef.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+      return restFallback();
+    }
+
+    const requestId = `${Date.now()}-${nextRequestId.current++}`;
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        settleAction(requestId, pending => pending.reject(new Error('No response from server')));
+      }, ACTION_ACK_TIMEOUT);
+      pendingActions.current.set(requestId, { resolve, reject, timer });
+      ws.send(JSON.stringify({ type, request_id: requestId, data }));
+    });
+  };
+
+  // Fetch the roster changes missed while the socket was not connected
+  const syncRoster = async (sessionId) => {
+    try {
+      const delta = await apiCall(`/sessions/${sessionId}/roster?since=${rosterVersionRef.current}`);
+      dispatch({ type: 'ROSTER_DELTA', payload: delta });
+    } catch (error) {
+      console.error('Failed to sync roster:', error);
+    }
+  };
+
+  // Fetch the rest of the roster page by page, starting at offset
+  const loadRosterPages = async (sessionId, offset) => {
+    try {
+      while (offset !== null && offset !== undefined) {
+        const page = await apiCall(`/sessions/${sessionId}/roster?offset=${offset}`);
+        dispatch({ type: 'SET_ROSTER', payload: page });
+        offset = page.next_offset;
+      }
+    } catch (error) {
+      console.error('Failed to load roster:', error);
+    }
+  };
 
   // WebSocket connection management
   const connectWebSocket = (sessionId, playerId) => {
@@ -122,10 +210,12 @@ export function GameProvider({ children }) {
     const wsUrl = `${apiConfig.wsUrl}/ws/${sessionId}/${playerId}`;
     console.log('Connecting to WebSocket:', wsUrl);
     const ws = new WebSocket(wsUrl);
+    socketRef.current = ws;
 
     ws.onopen = () => {
       console.log('WebSocket connected successfully to:', wsUrl);
       dispatch({ type: 'SET_CONNECTED', payload: true });
+      syncRoster(sessionId);
     };
 
     ws.onmessage = (event) => {
@@ -140,6 +230,9 @@ export function GameProvider({ children }) {
     ws.onclose = () => {
       console.log('WebSocket disconnected');
       dispatch({ type: 'SET_CONNECTED', payload: false });
+      for (const requestId of [...pendingActions.current.keys()]) {
+        settleAction(requestId, pending => pending.reject(new Error('Connection lost')));
+      }
 
       // Attempt to reconnect after 3 seconds
       setTimeout(() => {
@@ -165,8 +258,20 @@ export function GameProvider({ children }) {
         dispatch({ type: 'CLEAR_ERROR' });
         break;
 
-      case 'PLAYER_JOINED':
-        dispatch({ type: 'PLAYER_JOINED', payload: message.data });
+      case 'ROSTER_DELTA':
+        dispatch({ type: 'ROSTER_DELTA', payload: message.data });
+        break;
+
+      case 'PING':
+        if (socketRef.current && socketRef.current.readyState === WebSocket.OPEN) {
+          socketRef.current.send(JSON.stringify({ type: 'PONG' }));
+        }
+        break;
+
+      case 'ACK':
+        settleAction(message.data.request_id, pending => (
+          message.data.ok ? pending.resolve(message.data.result) : pending.reject(new Error(message.data.error))
+        ));
         break;
 
       case 'QUESTION_SUBMITTED':
@@ -260,6 +365,7 @@ export function GameProvider({ children }) {
         });
 
         connectWebSocket(response.session_id, response.player_id);
+        loadRosterPages(response.session_id, 0);
         return response;
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
@@ -288,7 +394,12 @@ export function GameProvider({ children }) {
         });
 
         dispatch({ type: 'UPDATE_GAME_STATE', payload: response.session_state });
+        dispatch({
+          type: 'SET_ROSTER',
+          payload: { players: response.session_state.players, version: response.session_state.roster_version }
+        });
         connectWebSocket(sessionId, response.player_id);
+        loadRosterPages(sessionId, response.session_state.next_offset);
         return response;
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
@@ -300,10 +411,12 @@ export function GameProvider({ children }) {
 
     submitQuestion: async (question, correctAnswer) => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/questions?player_id=${state.playerId}`, {
-          method: 'POST',
-          body: JSON.stringify({ question, answer: correctAnswer })
-        });
+        await sendAction('SUBMIT_QUESTION', { question, answer: correctAnswer }, () => (
+          apiCall(`/sessions/${state.sessionId}/questions?player_id=${state.playerId}`, {
+            method: 'POST',
+            body: JSON.stringify({ question, answer: correctAnswer })
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;
@@ -312,22 +425,26 @@ export function GameProvider({ children }) {
 
     submitAnswer: async (fakeAnswer) => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/answers?player_id=${state.playerId}`, {
-          method: 'POST',
-          body: JSON.stringify({ fake_answer: fakeAnswer })
-        });
+        await sendAction('SUBMIT_ANSWER', { fake_answer: fakeAnswer }, () => (
+          apiCall(`/sessions/${state.sessionId}/answers?player_id=${state.playerId}`, {
+            method: 'POST',
+            body: JSON.stringify({ fake_answer: fakeAnswer })
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;
       }
     },
 
-    submitVote: async (votedAnswer) => {
+    submitVote: async (answerIndex) => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/votes?player_id=${state.playerId}`, {
-          method: 'POST',
-          body: JSON.stringify({ voted_answer: votedAnswer })
-        });
+        await sendAction('SUBMIT_VOTE', { answer_index: answerIndex }, () => (
+          apiCall(`/sessions/${state.sessionId}/votes?player_id=${state.playerId}`, {
+            method: 'POST',
+            body: JSON.stringify({ answer_index: answerIndex })
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;
@@ -336,9 +453,11 @@ export function GameProvider({ children }) {
 
     endVoting: async () => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/end-voting?player_id=${state.playerId}`, {
-          method: 'POST'
-        });
+        await sendAction('END_VOTING', {}, () => (
+          apiCall(`/sessions/${state.sessionId}/end-voting?player_id=${state.playerId}`, {
+            method: 'POST'
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;
@@ -347,9 +466,11 @@ export function GameProvider({ children }) {
 
     endSubmissionPhase: async () => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/end-submissions?player_id=${state.playerId}`, {
-          method: 'POST'
-        });
+        await sendAction('END_SUBMISSIONS', {}, () => (
+          apiCall(`/sessions/${state.sessionId}/end-submissions?player_id=${state.playerId}`, {
+            method: 'POST'
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;
@@ -358,9 +479,11 @@ export function GameProvider({ children }) {
 
     startNextRound: async () => {
       try {
-        await apiCall(`/sessions/${state.sessionId}/next-round?player_id=${state.playerId}`, {
-          method: 'POST'
-        });
+        await sendAction('NEXT_ROUND', {}, () => (
+          apiCall(`/sessions/${state.sessionId}/next-round?player_id=${state.playerId}`, {
+            method: 'POST'
+          })
+        ));
       } catch (error) {
         dispatch({ type: 'SET_ERROR', payload: error.message });
         throw error;